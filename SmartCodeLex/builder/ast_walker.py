@@ -0,0 +1,228 @@
+# builder/ast_walker.py
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# =================== Tree access ===================
+class DictTree:
+    """
+    Access to nested-dict ASTs: a node is a dict with "type", optional "value"
+    and "children". Collectors only go through this interface, so they also
+    work on other tree representations.
+    """
+    @staticmethod
+    def is_node(node: Any) -> bool:
+        return isinstance(node, dict)
+
+    @staticmethod
+    def type_of(node: Any) -> Optional[str]:
+        return node.get("type") if isinstance(node, dict) else None
+
+    @staticmethod
+    def value_of(node: Any) -> Any:
+        return node.get("value") if isinstance(node, dict) else None
+
+    @staticmethod
+    def children(node: Any) -> Sequence:
+        return node.get("children", []) if isinstance(node, dict) else []
+
+    @staticmethod
+    def metadata(node: Any, include_raw: bool = True) -> Dict[str, Any]:
+        return collect_metadata(node, include_raw)
+
+DICT_TREE = DictTree()
+
+# =================== Collectors ===================
+class Collector:
+    """
+    Base class of the walk collectors. visit() is called for every node whose
+    type is in node_types, or for every node if node_types is None.
+    """
+    node_types: Optional[Tuple[str, ...]] = ()
+
+    def visit(self, tree, node):
+        raise NotImplementedError
+
+class CallCollector(Collector):
+    """Names called by Call nodes."""
+    node_types = ("Call",)
+
+    def __init__(self):
+        self.calls = set()
+
+    def visit(self, tree, node):
+        for child in tree.children(node):
+            if tree.type_of(child) in {"NameLoad", "AttributeLoad"}:
+                value = tree.value_of(child)
+                if isinstance(value, str):
+                    self.calls.add(value)
+
+class ValueSetCollector(Collector):
+    """String values of the given node types (variables, keywords, ...)."""
+    def __init__(self, node_types: Tuple[str, ...]):
+        self.node_types = node_types
+        self.values = set()
+
+    def visit(self, tree, node):
+        value = tree.value_of(node)
+        if isinstance(value, str):
+            self.values.add(value)
+
+class ParamCollector(Collector):
+    """Number of parameters of arguments nodes: arg children, or the children of an args node (py150)."""
+    node_types = ("arguments",)
+
+    def __init__(self):
+        self.count = 0
+
+    def visit(self, tree, node):
+        for child in tree.children(node):
+            child_type = tree.type_of(child)
+            if child_type == "arg":
+                self.count += 1
+            elif child_type == "args":
+                self.count += len(tree.children(child))
+
+class ReturnCollector(Collector):
+    """Type of the last node returned (last Return in walk order wins)."""
+    node_types = ("Return",)
+
+    def __init__(self):
+        self.return_type = ""
+
+    def visit(self, tree, node):
+        for child in tree.children(node):
+            if tree.is_node(child):
+                self.return_type = tree.type_of(child) or ""
+
+class DocstringCollector(Collector):
+    """String of an Expr > Str statement longer than 10 characters (last one wins)."""
+    node_types = ("Expr",)
+
+    def __init__(self):
+        self.doc = ""
+
+    def visit(self, tree, node):
+        for child in tree.children(node):
+            if tree.type_of(child) == "Str":
+                value = tree.value_of(child)
+                if isinstance(value, str) and len(value.strip()) > 10:
+                    self.doc = value.strip()
+
+# =================== Walk engine ===================
+def dispatch_table(collectors: Iterable[Collector]) -> Tuple[Dict[str, List], List]:
+    by_type, every_node = {}, []
+    for collector in collectors:
+        if collector.node_types is None:
+            every_node.append(collector.visit)
+        else:
+            for node_type in collector.node_types:
+                by_type.setdefault(node_type, []).append(collector.visit)
+    return by_type, every_node
+
+def walk(root: Any, collectors: Iterable[Collector]) -> Tuple[int, int]:
+    """
+    Walks a nested-dict AST in pre-order with an explicit stack (no recursion
+    limit) and calls the collectors of each node in a single pass.
+
+    Depth counts the nesting of dicts and lists from the root (1), like the
+    recursive walkers it replaces.
+
+    Returns:
+        tuple: (maximum depth, number of dict nodes)
+    """
+    by_type, every_node = dispatch_table(collectors)
+    tree = DICT_TREE
+    max_depth, node_count = 0, 0
+    stack = [(root, 1)]
+    pop, push = stack.pop, stack.append
+
+    while stack:
+        node, depth = pop()
+        if depth > max_depth:
+            max_depth = depth
+
+        if isinstance(node, dict):
+            node_count += 1
+            for visit in every_node:
+                visit(tree, node)
+            node_type = node.get("type")
+            if isinstance(node_type, str) and node_type in by_type:
+                for visit in by_type[node_type]:
+                    visit(tree, node)
+            # Pushed in reverse so they are popped in document order. Lists
+            # are expanded here: their items share the list's depth
+            child_depth = depth + 1
+            for child in reversed(node.values()):
+                if isinstance(child, dict):
+                    push((child, child_depth))
+                elif isinstance(child, list):
+                    if child_depth > max_depth:
+                        max_depth = child_depth
+                    for item in reversed(child):
+                        if isinstance(item, (dict, list)):
+                            push((item, child_depth))
+
+        elif isinstance(node, list):
+            # Root list or list nested in a list; scalars cannot go deeper
+            for item in reversed(node):
+                if isinstance(item, (dict, list)):
+                    push((item, depth))
+
+    return max_depth, node_count
+
+def statements(tree, node) -> List:
+    """
+    Statement children of a node: its children, with those of a "body" child
+    (py150 puts a function's statements under a body node) spliced in.
+    """
+    result = []
+    for child in tree.children(node):
+        if tree.type_of(child) == "body":
+            result.extend(tree.children(child))
+        else:
+            result.append(child)
+    return result
+
+# =================== Example metadata ===================
+def metadata_collectors() -> Dict[str, Collector]:
+    return {
+        "calls": CallCollector(),
+        "vars": ValueSetCollector(("NameLoad", "NameStore", "NameParam", "arg")),
+        "keywords": ValueSetCollector(("keyword",)),
+        "params": ParamCollector(),
+        "returns": ReturnCollector(),
+        "doc": DocstringCollector()
+    }
+
+def build_metadata(tree, root: Any, collectors: Dict[str, Collector], max_depth: int, node_count: int,
+                   default_type: str) -> Dict[str, Any]:
+    calls = collectors["calls"].calls
+    vars_ = collectors["vars"].values
+    keywords = collectors["keywords"].values
+    param_count = collectors["params"].count
+    node_type = tree.type_of(root)
+    value = tree.value_of(root)
+    return {
+        "type": default_type if node_type is None else node_type,
+        "value": "" if value is None else value,
+        "doc": collectors["doc"].doc,
+        "calls": sorted(calls),
+        "vars": sorted(vars_),
+        "keywords": sorted(keywords),
+        "param_count": param_count,
+        "return_type": collectors["returns"].return_type,
+        "depth": max_depth,
+        "child_count": node_count,
+        "complexity_score": len(calls) + len(vars_) + len(keywords) + param_count + max_depth
+    }
+
+def collect_metadata(example_json: Dict[str, Any], include_raw: bool = True, default_type: str = "") -> Dict[str, Any]:
+    """
+    Computes the metadata of an example (a nested-dict AST node) in one walk.
+    """
+    collectors = metadata_collectors()
+    max_depth, node_count = walk(example_json, collectors.values())
+    metadata = build_metadata(DICT_TREE, example_json, collectors, max_depth, node_count, default_type)
+    if include_raw:
+        metadata["raw"] = example_json
+    return metadata
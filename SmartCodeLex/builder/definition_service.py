@@ -0,0 +1,354 @@
+# builder/definition_service.py
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from SmartCodeLex.builder.definition_settings import (
+    BACKOFF_SECONDS, BATCH_SIZE, CACHE_PATH, DEFAULT_MODEL, MAX_CONCURRENCY, MAX_RETRIES, REQUESTS_PER_MINUTE
+)
+
+SYSTEM_PROMPT = "Briefly and clearly explain this programming term."
+BATCH_SYSTEM_PROMPT = (
+    "Briefly and clearly explain each of these programming terms. Answer only with a JSON object "
+    "mapping every term to its explanation."
+)
+TEMPERATURE = 0.2
+MAX_TOKENS_PER_TERM = 60
+
+# HTTP statuses worth retrying; any other 4xx (bad key, permissions, unknown model...) will not succeed later
+TRANSIENT_STATUSES = {408, 409, 429}
+# Exception class names of the openai package (>=1.0 and older) for transient failures
+TRANSIENT_ERRORS = {
+    "RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError",
+    "Timeout", "TryAgain", "ServiceUnavailableError"
+}
+
+class DefinitionError(Exception):
+    """
+    A definition request failed in a way retrying cannot fix (authentication,
+    permissions, bad request or model). Stops define_terms.
+    """
+
+def is_transient(error: BaseException) -> bool:
+    """
+    True for errors worth retrying: rate limits, timeouts, connection errors and 5xx answers.
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "http_status", None)
+    if isinstance(status, int):
+        return status in TRANSIENT_STATUSES or status >= 500
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+# =================== Backends ===================
+class DefinitionBackend:
+    """
+    Produces definitions for a batch of terms. Subclass it to plug in another
+    service or a local model; `model` is part of the cache key.
+    """
+    model: str = ""
+
+    async def define(self, terms: List[str]) -> Dict[str, str]:
+        """
+        Returns {term: definition} for the terms it could define. Missing terms
+        of a multi-term batch are retried one by one; transient exceptions
+        (see is_transient) are retried with backoff, any other stops the run.
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """Releases resources tied to the running event loop (called after every define_terms)."""
+        pass
+
+class StubBackend(DefinitionBackend):
+    """
+    Offline stand-in: answers every term from a template, after an optional
+    simulated latency. Used for tests and benchmarks.
+    """
+    def __init__(self, template: str = "{term}: programming term", delay: float = 0.0, model: str = "stub"):
+        self.template = template
+        self.delay = delay
+        self.model = model
+        self.requests = 0
+
+    async def define(self, terms: List[str]) -> Dict[str, str]:
+        self.requests += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {term: self.template.format(term=term) for term in terms}
+
+class OpenAIBackend(DefinitionBackend):
+    """
+    OpenAI chat completions. Works with openai>=1.0 (AsyncOpenAI) and with the
+    older module-level API (ChatCompletion.acreate). The library is imported
+    only when the backend is created.
+    """
+    def __init__(self, api_key: str, model: str = DEFAULT_MODEL):
+        import openai
+        self.model = model
+        self._openai = openai
+        self._api_key = api_key
+        # AsyncOpenAI clients belong to the event loop they were created in
+        self._client = None
+
+    async def _complete(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        if hasattr(self._openai, "AsyncOpenAI"):
+            if self._client is None:
+                self._client = self._openai.AsyncOpenAI(api_key=self._api_key)
+            res = await self._client.chat.completions.create(
+                model=self.model, messages=messages, temperature=TEMPERATURE, max_tokens=max_tokens
+            )
+        else:
+            res = await self._openai.ChatCompletion.acreate(
+                api_key=self._api_key, model=self.model, messages=messages, temperature=TEMPERATURE, max_tokens=max_tokens
+            )
+        return (res.choices[0].message.content or "").strip()
+
+    async def define(self, terms: List[str]) -> Dict[str, str]:
+        if len(terms) == 1:
+            text = await self._complete(
+                [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": terms[0]}],
+                MAX_TOKENS_PER_TERM
+            )
+            return {terms[0]: text} if text else {}
+
+        text = await self._complete(
+            [{"role": "system", "content": BATCH_SYSTEM_PROMPT}, {"role": "user", "content": json.dumps(terms)}],
+            MAX_TOKENS_PER_TERM * len(terms)
+        )
+        return parse_batch_answer(text, terms)
+
+    async def close(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.close()
+
+def parse_batch_answer(text: str, terms: List[str]) -> Dict[str, str]:
+    """
+    Reads the {term: definition} JSON object of a batch answer (possibly in a
+    code fence). Unknown keys and non-string values are ignored.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("{"):] if "{" in text else text
+    try:
+        answer = json.loads(text[:text.rfind("}") + 1])
+    except ValueError:
+        return {}
+    if not isinstance(answer, dict):
+        return {}
+    wanted = {term.lower(): term for term in terms}
+    definitions = {}
+    for key, value in answer.items():
+        term = wanted.get(str(key).lower())
+        if term is not None and isinstance(value, str) and value.strip():
+            definitions[term] = value.strip()
+    return definitions
+
+def make_backend(name: str, api_key: Optional[str] = None, model: str = DEFAULT_MODEL) -> Optional[DefinitionBackend]:
+    """
+    Backend by name: "openai" (None without a key or without the openai
+    package), "stub", or "none".
+    """
+    if name == "stub":
+        return StubBackend()
+    if name == "openai" and api_key:
+        try:
+            return OpenAIBackend(api_key, model)
+        except ImportError:
+            print("⚠️ openai is not installed – definitions are skipped.")
+    return None
+
+# =================== Cache ===================
+class DefinitionCache:
+    """
+    Definitions on disk, keyed by (model, term), so reruns do not ask again.
+    """
+    def __init__(self, path: str = CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS definitions (
+                model TEXT,
+                term TEXT,
+                definition TEXT,
+                created TEXT,
+                PRIMARY KEY (model, term)
+            )
+        """)
+        self.conn.commit()
+
+    def get_many(self, model: str, terms: Iterable[str]) -> Dict[str, str]:
+        terms = list(terms)
+        found = {}
+        # Stay under SQLite's default limit of 999 parameters
+        for start in range(0, len(terms), 900):
+            chunk = terms[start:start + 900]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT term, definition FROM definitions WHERE model = ? AND term IN ({placeholders})",
+                [model] + chunk
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, model: str, definitions: Dict[str, str]):
+        now = datetime.utcnow().isoformat()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO definitions (model, term, definition, created) VALUES (?, ?, ?, ?)",
+            [(model, term, definition, now) for term, definition in definitions.items()]
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+# =================== Service ===================
+class RateLimiter:
+    """
+    Spaces request starts at least 60 / requests_per_minute seconds apart.
+    """
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next = 0.0
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class DefinitionService:
+    """
+    Defines many terms concurrently: cached terms are answered from disk, the
+    rest are sent in batches of batch_size terms, with at most `concurrency`
+    requests in flight, rate limiting and retries with exponential backoff.
+
+    Only transient errors are retried; others raise DefinitionError (the
+    definitions received so far stay cached). Terms that still fail get no
+    definition and are not cached.
+    """
+    def __init__(self, backend: DefinitionBackend, cache_path: Optional[str] = CACHE_PATH,
+                 concurrency: int = MAX_CONCURRENCY, requests_per_minute: float = REQUESTS_PER_MINUTE,
+                 batch_size: int = BATCH_SIZE, max_retries: int = MAX_RETRIES, backoff: float = BACKOFF_SECONDS):
+        self.backend = backend
+        self.cache = DefinitionCache(cache_path) if cache_path else None
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.stats = {"cached": 0, "requests": 0, "retries": 0, "failed": 0}
+
+    async def _request(self, terms: List[str]) -> Optional[Dict[str, str]]:
+        """
+        The backend's answer for the terms, or None if it still failed after max_retries retries.
+        """
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                await self._limiter.acquire()
+                self.stats["requests"] += 1
+                try:
+                    return await self.backend.define(terms)
+                except Exception as e:
+                    if not is_transient(e):
+                        raise DefinitionError(f"{type(e).__name__}: {e}") from e
+                    if attempt == self.max_retries:
+                        print(f"⚠️ Definition request for {len(terms)} terms failed after "
+                              f"{self.max_retries} retries: {type(e).__name__}: {e}")
+                        return None
+            self.stats["retries"] += 1
+            await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+        return None
+
+    async def _define_batch(self, batch: List[str]) -> Dict[str, str]:
+        definitions = await self._request(batch)
+        if definitions is None:
+            # A batch that failed is not asked again term by term
+            self.stats["failed"] += len(batch)
+            return {}
+        if len(batch) > 1:
+            # Terms a batch answer left out are asked for one by one
+            missing = [term for term in batch if term not in definitions]
+            for single in await asyncio.gather(*(self._request([term]) for term in missing)):
+                definitions.update(single or {})
+        definitions = {term: text for term, text in definitions.items() if term in batch and text}
+        if self.cache and definitions:
+            self.cache.put_many(self.backend.model, definitions)
+        self.stats["failed"] += len(batch) - len(definitions)
+        return definitions
+
+    async def define_all(self, terms: Iterable[str]) -> Dict[str, str]:
+        """
+        Returns {term: definition} for every term that has one.
+        """
+        unique = list(dict.fromkeys(terms))
+        definitions = self.cache.get_many(self.backend.model, unique) if self.cache else {}
+        self.stats["cached"] += len(definitions)
+        missing = [term for term in unique if term not in definitions]
+
+        # Created here: they belong to the running event loop
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._limiter = RateLimiter(self.requests_per_minute)
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        for result in await asyncio.gather(*(self._define_batch(batch) for batch in batches)):
+            definitions.update(result)
+        return definitions
+
+    def define_terms(self, terms: Iterable[str]) -> Dict[str, str]:
+        """
+        Blocking version of define_all, for synchronous callers.
+        """
+        async def run():
+            try:
+                return await self.define_all(terms)
+            finally:
+                await self.backend.close()
+        return asyncio.run(run())
+
+    def close(self):
+        if self.cache:
+            self.cache.close()
+
+if __name__ == "__main__":
+    import tempfile
+
+    class FailingBackend(StubBackend):
+        def __init__(self, error: Exception):
+            super().__init__()
+            self.error = error
+
+        async def define(self, terms):
+            self.requests += 1
+            raise self.error
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = StubBackend(delay=0.01)
+        service = DefinitionService(backend, os.path.join(tmp, "cache.db"), batch_size=3)
+        print(service.define_terms(["parser", "socket", "thread", "queue"]))
+        print(service.define_terms(["parser", "socket", "lexer"]), service.stats, backend.requests)
+        service.close()
+
+        # A permanent error is not retried and stops the run
+        auth_error = Exception("invalid api key")
+        auth_error.status_code = 401
+        backend = FailingBackend(auth_error)
+        service = DefinitionService(backend, None, concurrency=1, batch_size=20)
+        try:
+            service.define_terms([f"term{i}" for i in range(400)])
+        except DefinitionError as e:
+            print(f"Stopped: {e} after {backend.requests} request(s)")
+
+        # A transient error is retried, then the batch fails without single-term requests
+        backend = FailingBackend(ConnectionError("reset"))
+        service = DefinitionService(backend, None, batch_size=3, backoff=0.001)
+        print(service.define_terms(["parser", "socket", "thread"]), service.stats, backend.requests)
@@ -0,0 +1,14 @@
+# builder/definition_settings.py
+
+# Defaults of the definition service, kept free of heavy imports so the command-line
+# tools can show them without loading asyncio or openai (see definition_service)
+from SmartCodeLex.paths import data_path
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+CACHE_PATH = data_path("knowledge", "definition_cache.db")
+
+MAX_CONCURRENCY = 8          # requests in flight at once
+REQUESTS_PER_MINUTE = 300    # 0 disables rate limiting
+BATCH_SIZE = 20              # terms per request
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0        # first retry delay, doubled on every attempt
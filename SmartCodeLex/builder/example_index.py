@@ -0,0 +1,133 @@
+# builder/example_index.py
+
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Set
+import numpy as np
+
+NGRAM_SIZE = 3
+FUZZY_THRESHOLD = 0.7
+MAX_MATCHES = 3
+
+def ngrams(text: str, n: int = NGRAM_SIZE) -> Set[str]:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+class ExampleIndex:
+    """
+    Index built once over an example bank ({eid: metadata}) that answers
+    match_examples queries without scanning the whole bank.
+
+    A term matches an example when it is a substring of the example's value,
+    joined calls or joined vars, or when SequenceMatcher(term, value).ratio()
+    is above FUZZY_THRESHOLD. Results are the first matches in bank order.
+
+    - Substring matches: character n-gram postings over the distinct field
+      texts give the candidates, which are then verified with `in`.
+    - Fuzzy matches: the ratio is at most 2 * (shared characters) / (total
+      length), so distinct values are filtered by length and character
+      counts (vectorized with numpy) before SequenceMatcher runs on the few
+      that can pass.
+    """
+
+    def __init__(self, bank: Dict[str, Dict]):
+        self.ids = list(bank)
+
+        # Distinct field texts, the bank positions they occur at, and n-gram postings
+        text_ids: Dict[str, int] = {}
+        self._texts: List[str] = []
+        self._text_positions: List[List[int]] = []
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+
+        # Bank positions of every distinct value, for the fuzzy step
+        value_positions: Dict[str, List[int]] = defaultdict(list)
+
+        for position, meta in enumerate(bank.values()):
+            value = str(meta.get("value", "")).lower()
+            value_positions[value].append(position)
+            fields = (value, " ".join(meta.get("calls", [])).lower(), " ".join(meta.get("vars", [])).lower())
+            for text in fields:
+                text_id = text_ids.get(text)
+                if text_id is None:
+                    text_id = text_ids[text] = len(self._texts)
+                    self._texts.append(text)
+                    self._text_positions.append([])
+                    for gram in ngrams(text):
+                        self._postings[gram].add(text_id)
+                positions = self._text_positions[text_id]
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+        # Distinct non-empty values as arrays: length, first position and
+        # per-character counts (one column per character seen in any value)
+        values = [value for value in value_positions if value]
+        self._values = values
+        self._value_positions = [value_positions[value] for value in values]
+        self._value_lengths = np.array([len(value) for value in values], dtype=np.int64)
+        self._value_first = np.array([positions[0] for positions in self._value_positions], dtype=np.int64)
+        self._char_columns: Dict[str, int] = {}
+        for value in values:
+            for char in value:
+                self._char_columns.setdefault(char, len(self._char_columns))
+        self._char_counts = np.zeros((len(values), max(1, len(self._char_columns))), dtype=np.int32)
+        for row, value in enumerate(values):
+            for char, count in Counter(value).items():
+                self._char_counts[row, self._char_columns[char]] = count
+
+    def _substring_positions(self, term: str) -> Set[int]:
+        if len(term) < NGRAM_SIZE:
+            # Too short for n-grams: check every distinct text
+            text_ids = [i for i, text in enumerate(self._texts) if term in text]
+        else:
+            postings = []
+            for gram in ngrams(term):
+                posting = self._postings.get(gram)
+                if not posting:
+                    return set()
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+            text_ids = [i for i in candidates if term in self._texts[i]]
+
+        positions = set()
+        for text_id in text_ids:
+            positions.update(self._text_positions[text_id])
+        return positions
+
+    def _fuzzy_positions(self, term: str, cutoff: int, exclude: Set[int]) -> Set[int]:
+        """
+        Positions before cutoff (and not in exclude) whose value is a fuzzy match.
+        """
+        la = len(term)
+        lengths = self._value_lengths
+        total = la + lengths
+        # Upper bounds of the ratio: from the lengths, then from shared characters
+        mask = (20 * np.minimum(la, lengths) >= 7 * total) & (self._value_first < cutoff)
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return set()
+        shared = np.zeros(len(rows), dtype=np.int64)
+        for char, count in Counter(term).items():
+            column = self._char_columns.get(char)
+            if column is not None:
+                shared += np.minimum(self._char_counts[rows, column], count)
+        rows = rows[20 * shared >= 7 * total[rows]]
+
+        positions = set()
+        for row in rows.tolist():
+            value_positions = self._value_positions[row]
+            wanted = [p for p in value_positions[:bisect_left(value_positions, cutoff)] if p not in exclude]
+            if wanted and SequenceMatcher(None, term, self._values[row]).ratio() > FUZZY_THRESHOLD:
+                positions.update(wanted)
+        return positions
+
+    def match(self, term: str, limit: int = MAX_MATCHES) -> List[str]:
+        """
+        Returns the IDs of the first `limit` examples (in bank order) matching the term.
+        """
+        t = term.lower()
+        exact = self._substring_positions(t)
+        # Only examples before the limit-th substring match can still make the result
+        cutoff = sorted(exact)[limit - 1] if len(exact) >= limit else len(self.ids)
+        fuzzy = self._fuzzy_positions(t, cutoff, exact)
+        return [self.ids[p] for p in sorted(exact | fuzzy)[:limit]]
@@ -0,0 +1,227 @@
+# builder/flat_tree.py
+
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from SmartCodeLex.builder.ast_walker import Collector, build_metadata, dispatch_table, metadata_collectors
+
+# =================== Flat trees ===================
+class FlatTree:
+    """
+    A py150 AST line (a list of nodes whose "children" are indices into the
+    list) stored as parallel arrays instead of a dict per node:
+
+    - types: type ID of every node, into the per-tree type_names table
+    - values: value of every node (None when missing)
+    - child_offsets / child_indices: children of node i are
+      child_indices[child_offsets[i]:child_offsets[i + 1]]
+    - parents: parent index of every node (-1 for the root)
+
+    Nodes are plain integer indices. The accessor methods (is_node, type_of,
+    value_of, children) are the same as DictTree's, so the collectors of
+    ast_walker run on flat trees unchanged.
+    """
+    __slots__ = ("type_names", "types", "values", "child_offsets", "child_indices", "parents")
+
+    def __init__(self, type_names: List[Optional[str]], types: array, values: List[Any],
+                 child_offsets: array, child_indices: array, parents: array):
+        self.type_names = type_names
+        self.types = types
+        self.values = values
+        self.child_offsets = child_offsets
+        self.child_indices = child_indices
+        self.parents = parents
+
+    @classmethod
+    def from_nodes(cls, nodes: Sequence[Dict[str, Any]]) -> "FlatTree":
+        """
+        Builds a flat tree from a parsed py150 line.
+
+        Raises:
+            ValueError: if a node is not a dict, or a child index is not an
+                integer after its parent (py150 lists nodes in pre-order, which
+                also rules out cycles).
+        """
+        count = len(nodes)
+        type_ids: Dict[Optional[str], int] = {}
+        type_names: List[Optional[str]] = []
+        types = array('I')
+        values = []
+        child_offsets = array('I', [0])
+        child_indices = array('I')
+        parents = array('i', [-1]) * count
+
+        for index, node in enumerate(nodes):
+            if not isinstance(node, dict):
+                raise ValueError(f"node {index} is not an object")
+            node_type = node.get("type")
+            if not isinstance(node_type, str):
+                node_type = None
+            type_id = type_ids.get(node_type)
+            if type_id is None:
+                type_id = type_ids[node_type] = len(type_names)
+                type_names.append(node_type)
+            types.append(type_id)
+            values.append(node.get("value"))
+
+            for child in node.get("children", ()):
+                if type(child) is not int or not index < child < count:
+                    raise ValueError(f"node {index} has an invalid child {child!r}")
+                child_indices.append(child)
+                parents[child] = index
+            child_offsets.append(len(child_indices))
+
+        return cls(type_names, types, values, child_offsets, child_indices, parents)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    # Tree access, see ast_walker.DictTree
+    def is_node(self, node: Any) -> bool:
+        return type(node) is int and 0 <= node < len(self.types)
+
+    def type_of(self, node: Any) -> Optional[str]:
+        return self.type_names[self.types[node]] if self.is_node(node) else None
+
+    def value_of(self, node: Any) -> Any:
+        return self.values[node] if self.is_node(node) else None
+
+    def children(self, node: Any) -> Sequence[int]:
+        if not self.is_node(node):
+            return ()
+        return self.child_indices[self.child_offsets[node]:self.child_offsets[node + 1]]
+
+    def metadata(self, node: int, include_raw: bool = True) -> Dict[str, Any]:
+        return collect_flat_metadata(self, node, include_raw)
+
+    # Subtrees
+    def subtree_indices(self, root: int) -> List[int]:
+        """
+        Indices of the subtree of root, in pre-order.
+        """
+        offsets, indices = self.child_offsets, self.child_indices
+        order, stack = [], [root]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(reversed(indices[offsets[node]:offsets[node + 1]]))
+        return order
+
+    def subtree_nodes(self, root: int) -> List[Dict[str, Any]]:
+        """
+        The subtree of root as a py150 node list (root first, children re-indexed).
+        """
+        order = self.subtree_indices(root)
+        position = {node: i for i, node in enumerate(order)}
+        offsets, indices = self.child_offsets, self.child_indices
+        nodes = []
+        for node in order:
+            json_node = {"type": self.type_names[self.types[node]]}
+            value = self.values[node]
+            if value is not None:
+                json_node["value"] = value
+            children = indices[offsets[node]:offsets[node + 1]]
+            if children:
+                json_node["children"] = [position[child] for child in children]
+            nodes.append(json_node)
+        return nodes
+
+class FlatSubtree:
+    """
+    Reference to a subtree of a FlatTree, kept as the "raw" of an example.
+    It is only expanded into py150 nodes when the bank is written
+    (json.dump(..., default=json_default)).
+    """
+    __slots__ = ("tree", "root")
+
+    def __init__(self, tree: FlatTree, root: int):
+        self.tree = tree
+        self.root = root
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        return self.tree.subtree_nodes(self.root)
+
+def json_default(obj: Any) -> Any:
+    """
+    default= hook of json.dump for banks that may hold FlatSubtree raws.
+    """
+    if isinstance(obj, FlatSubtree):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def is_flat_line(obj: Any) -> bool:
+    """
+    True if a parsed AST line is in py150's flat format: a list of nodes whose
+    children are integer indices (nested-dict lines have dict children).
+    """
+    if not isinstance(obj, list) or not obj or not isinstance(obj[0], dict):
+        return False
+    for node in obj:
+        children = node.get("children") if isinstance(node, dict) else None
+        if children:
+            return type(children[0]) is int
+    return True
+
+# =================== Walk engine ===================
+def walk_flat(tree: FlatTree, root: int, collectors: Iterable[Collector]) -> Tuple[int, int]:
+    """
+    Walks the subtree of root in pre-order with an explicit stack and calls
+    the collectors of each node, like ast_walker.walk() on nested dicts.
+
+    Returns:
+        tuple: (maximum depth, root being 1; number of nodes in the subtree)
+    """
+    by_type, every_node = dispatch_table(collectors)
+    # Collector lists per type ID, so dispatch never touches the type strings
+    type_visits = [by_type.get(name, ()) if name is not None else () for name in tree.type_names]
+    types, offsets, indices = tree.types, tree.child_offsets, tree.child_indices
+    max_depth, node_count = 0, 0
+    stack = [(root, 1)]
+    pop, push = stack.pop, stack.append
+
+    while stack:
+        node, depth = pop()
+        if depth > max_depth:
+            max_depth = depth
+        node_count += 1
+        for visit in every_node:
+            visit(tree, node)
+        for visit in type_visits[types[node]]:
+            visit(tree, node)
+        child_depth = depth + 1
+        for child in reversed(indices[offsets[node]:offsets[node + 1]]):
+            push((child, child_depth))
+
+    return max_depth, node_count
+
+def collect_flat_metadata(tree: FlatTree, root: int = 0, include_raw: bool = True,
+                          default_type: str = "") -> Dict[str, Any]:
+    """
+    Computes the metadata of the subtree of root, like ast_walker.collect_metadata().
+    With include_raw, "raw" is a FlatSubtree (see json_default).
+    """
+    collectors = metadata_collectors()
+    max_depth, node_count = walk_flat(tree, root, collectors.values())
+    metadata = build_metadata(tree, root, collectors, max_depth, node_count, default_type)
+    if include_raw:
+        metadata["raw"] = FlatSubtree(tree, root)
+    return metadata
+
+if __name__ == "__main__":
+    line = [
+        {"type": "Module", "children": [1]},
+        {"type": "FunctionDef", "value": "load_data", "children": [2, 5]},
+        {"type": "arguments", "children": [3]},
+        {"type": "args", "children": [4]},
+        {"type": "NameParam", "value": "path"},
+        {"type": "body", "children": [6]},
+        {"type": "Return", "children": [7]},
+        {"type": "Call", "children": [8, 9]},
+        {"type": "NameLoad", "value": "open"},
+        {"type": "NameLoad", "value": "path"}
+    ]
+    print(is_flat_line(line))
+    tree = FlatTree.from_nodes(line)
+    meta = collect_flat_metadata(tree, 1)
+    print(meta["calls"], meta["vars"], meta["param_count"], meta["return_type"], meta["depth"], meta["child_count"])
+    print(tree.subtree_nodes(7))
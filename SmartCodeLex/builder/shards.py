@@ -0,0 +1,36 @@
+# builder/shards.py
+
+import os
+from typing import Iterator, List, Tuple
+
+def split_shards(path: str, count: int) -> List[Tuple[str, int, int]]:
+    """
+    Splits a JSONL file into at most `count` byte ranges of similar size.
+
+    A line belongs to the shard in which it starts, so the ranges can be cut
+    anywhere and no line is read twice or lost (see iter_shard_lines).
+
+    Returns:
+        list: (path, start, end) tuples, in file order.
+    """
+    size = os.path.getsize(path)
+    count = max(1, min(count, size))
+    bounds = [size * i // count for i in range(count + 1)]
+    return [(path, start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+def iter_shard_lines(path: str, start: int, end: int) -> Iterator[bytes]:
+    """
+    Yields the raw lines that start inside [start, end).
+    """
+    with open(path, 'rb') as f:
+        if start > 0:
+            # Finish the line that contains byte start - 1; it belongs to the previous shard
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            yield line
+            position += len(line)
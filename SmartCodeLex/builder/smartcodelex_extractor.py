@@ -1,31 +1,46 @@
 # builder/smartcodelex_extractor.py (Final unified smart version)
+# Run from the repository root: python -m SmartCodeLex.builder.smartcodelex_extractor
+# Default inputs and outputs are under SmartCodeLex/ (languages/, knowledge/, core_units/, logs/, smartcodelex.db)
 
-import json, os, argparse, sqlite3, re
-from typing import Set, Any, List, Dict, Tuple
+# Heavy dependencies (tqdm, numpy via ExampleIndex, asyncio via the definition
+# service, multiprocessing, sqlite3) are imported by the functions that use them,
+# so --help and small runs do not pay for them
+import json, os, argparse
+from functools import partial
+from typing import TYPE_CHECKING, Set, Any, Iterable, List, Dict, Tuple
 from collections import Counter
-from tqdm import tqdm
-from difflib import SequenceMatcher
-from datetime import datetime
 
-try:
-    import openai
-except ImportError:
-    openai = None
+from core import metrics, normalizer
+from core.normalizer import clean_words
+from SmartCodeLex.builder import ast_walker, flat_tree, shards
+from SmartCodeLex.builder.definition_settings import (
+    BATCH_SIZE, CACHE_PATH, DEFAULT_MODEL, MAX_CONCURRENCY, REQUESTS_PER_MINUTE
+)
+from SmartCodeLex.builder.ast_walker import Collector, collect_metadata, statements, walk
+from SmartCodeLex.builder.flat_tree import FlatTree, is_flat_line, json_default, walk_flat
+from SmartCodeLex.builder.shards import iter_shard_lines, split_shards
+from SmartCodeLex.builder.stage_cache import CACHE_DIR, StageCache, code_fingerprint
+from SmartCodeLex.languages.python import build_corpus
+from SmartCodeLex.paths import data_path
+from SmartCodeLex.languages.python.build_corpus import corpus_files
+
+if TYPE_CHECKING:
+    from SmartCodeLex.builder.definition_service import DefinitionService
+    from SmartCodeLex.builder.example_index import ExampleIndex
 
 # =================== Paths ===================
-AST_INPUT = "languages/python/python100k_train.json"
-EXAMPLE_BANK_PATH = "knowledge/example_bank.json"
-EXAMPLE_ADVANCED_PATH = "knowledge/example_bank_advanced.json"
-CORE_UNITS_PATH = "core_units/core_units_python.json"
-DB_PATH = "smartcodelex.db"
+# Under the SmartCodeLex package directory (see SmartCodeLex.paths)
+AST_INPUT = data_path("languages", "python", "python100k_train.json")
+EXAMPLE_BANK_PATH = data_path("knowledge", "example_bank.json")
+EXAMPLE_ADVANCED_PATH = data_path("knowledge", "example_bank_advanced.json")
+CORE_UNITS_PATH = data_path("core_units", "core_units_python.json")
+DB_PATH = data_path("smartcodelex.db")
+METRICS_REPORT = data_path("logs", "metrics_pipeline.json")
 
-# =================== Helper Functions ===================
-def clean_word(word: str) -> str | None:
-    if not isinstance(word, str): return None
-    word = word.replace("_", " ").replace("-", " ").lower()
-    word = re.sub(r'[^a-z\s]', '', word)
-    return re.sub(r'\s+', ' ', word).strip() or None
+# Shards per worker for parallel ingestion, so slow shards do not leave workers idle
+SHARDS_PER_WORKER = 4
 
+# =================== Helper Functions ===================
 def is_garbage_like(term: str, threshold: float = 0.6) -> bool:
     if not term or len(term) < 5: return False
     freq = Counter(term)
@@ -34,91 +49,124 @@ def is_garbage_like(term: str, threshold: float = 0.6) -> bool:
 def suggest_concept_code(index: int) -> str:
     return f"C{str(index).zfill(4)}"
 
+def example_id(index: int) -> str:
+    return f"E{index:05}"
+
 # =================== Extract from AST ===================
-def extract_terms_examples_docstrings(node: Any, terms: Set[str], examples: Dict[str, str], docstrings: Dict[str, str]):
-    if isinstance(node, dict):
-        val = node.get("value")
-        node_type = node.get("type")
+class TermExampleCollector(Collector):
+    """Collects raw string values, examples (Call/FunctionDef) and function docstrings from every node."""
+    node_types = None
+
+    def __init__(self, values: Set[str], examples: Dict[str, Dict] | None, docstrings: Dict[str, str], include_raw: bool):
+        self.values, self.examples, self.docstrings, self.include_raw = values, examples, docstrings, include_raw
+
+    def visit(self, tree, node):
+        val = tree.value_of(node)
+        node_type = tree.type_of(node)
         if isinstance(val, str):
-            word = clean_word(val)
-            if word: terms.add(word)
+            self.values.add(val)
 
-        if node_type in {"Call", "FunctionDef"}:
-            eid = f"E{len(examples)+1:05}"
-            examples[eid] = json.dumps(node, ensure_ascii=False)
+        if self.examples is not None and node_type in {"Call", "FunctionDef"}:
+            eid = example_id(len(self.examples) + 1)
+            self.examples[eid] = tree.metadata(node, self.include_raw)
 
         if node_type == "FunctionDef":
-            for child in node.get("children", []):
-                if isinstance(child, dict) and child.get("type") == "Expr":
-                    for gc in child.get("children", []):
-                        if isinstance(gc, dict) and gc.get("type") == "Str":
-                            doc = gc.get("value")
+            for child in statements(tree, node):
+                if tree.type_of(child) == "Expr":
+                    for gc in tree.children(child):
+                        if tree.type_of(gc) == "Str":
+                            doc = tree.value_of(gc)
                             if isinstance(doc, str) and len(doc.strip()) > 10:
-                                docstrings[val] = doc.strip()
+                                self.docstrings[val] = doc.strip()
+
+def extract_terms_examples_docstrings(node: Any, values: Set[str], examples: Dict[str, Dict] | None, docstrings: Dict[str, str],
+                                      include_raw: bool = True):
+    """
+    Collects raw string values (cleaned later in one batch, see normalize_terms), examples and docstrings.
+    Example metadata is computed on the live node; with include_raw the node itself is kept as "raw" and
+    serialized only once, when the bank is written. Pass examples=None to skip examples.
+
+    A py150 flat line (list of nodes with index children) is loaded into a FlatTree and walked from its root.
+    """
+    collectors = [TermExampleCollector(values, examples, docstrings, include_raw)]
+    if is_flat_line(node):
+        walk_flat(FlatTree.from_nodes(node), 0, collectors)
+    else:
+        walk(node, collectors)
+
+def extract_lines(lines: Iterable, values: Set[str], examples: Dict[str, Dict] | None, docstrings: Dict[str, str],
+                  include_raw: bool = True):
+    """Runs extract_terms_examples_docstrings on every JSONL line, skipping lines that fail."""
+    for line in lines:
+        try:
+            with metrics.timer("ingest.json_decode"):
+                obj = json.loads(line)
+            with metrics.timer("ingest.walk"):
+                extract_terms_examples_docstrings(obj, values, examples, docstrings, include_raw)
+            metrics.count("ast_lines")
+        except:
+            metrics.count("ast_lines_failed")
+            continue
 
-        for v in node.values():
-            if isinstance(v, (list, dict)):
-                extract_terms_examples_docstrings(v, terms, examples, docstrings)
-    elif isinstance(node, list):
-        for item in node:
-            extract_terms_examples_docstrings(item, terms, examples, docstrings)
+def init_ingest_worker(collect_metrics: bool = False):
+    """Pool initializer: with collect_metrics, each shard's stage timers are sent back with its results."""
+    if collect_metrics:
+        metrics.enable()
+
+def ingest_shard(shard: Tuple[str, int, int], collect_examples: bool = True,
+                 include_raw: bool = True) -> Tuple[Set[str], List[Dict], Dict[str, str], Dict | None]:
+    """
+    Worker task: extracts one byte range of the AST file. Examples are returned in order, without IDs,
+    followed by the metrics measured for the shard (None when disabled, see metrics.drain()).
+    """
+    values, examples, docstrings = set(), {} if collect_examples else None, {}
+    with metrics.profiled():
+        extract_lines(iter_shard_lines(*shard), values, examples, docstrings, include_raw)
+    return values, list(examples.values()) if collect_examples else [], docstrings, metrics.drain()
+
+def ingest_ast(ast_file: str, workers: int = 1, collect_examples: bool = True,
+               include_raw: bool = True) -> Tuple[Set[str], Dict[str, Dict], Dict[str, str]]:
+    """
+    Extracts raw values, example metadata and docstrings from an AST JSONL file,
+    or from the JSONL shards of a corpus directory (see build_corpus), in order.
+    With several workers the files are split into byte-range shards extracted in
+    parallel; merging in shard order gives the same example IDs and docstrings
+    as the sequential pass.
+    """
+    from tqdm import tqdm
+
+    values, examples, docstrings = set(), {}, {}
+    files = corpus_files(ast_file)
+    if workers <= 1:
+        for path in files:
+            with open(path, 'rb') as f, metrics.profiled():
+                extract_lines(tqdm(f, desc=f"Parsing {os.path.basename(path)}"), values,
+                              examples if collect_examples else None, docstrings, include_raw)
+        return values, examples, docstrings
+
+    shards_per_file = max(1, workers * SHARDS_PER_WORKER // len(files)) if files else 1
+    shards = [shard for path in files for shard in split_shards(path, shards_per_file)]
+    from multiprocessing import Pool
+
+    task = partial(ingest_shard, collect_examples=collect_examples, include_raw=include_raw)
+    with Pool(workers, initializer=init_ingest_worker, initargs=(metrics.enabled(),)) as pool:
+        for shard_values, shard_examples, shard_docstrings, shard_metrics in tqdm(pool.imap(task, shards), total=len(shards), desc="Parsing JSONL shards"):
+            values |= shard_values
+            for meta in shard_examples:
+                examples[example_id(len(examples) + 1)] = meta
+            docstrings.update(shard_docstrings)
+            metrics.merge(shard_metrics)
+    return values, examples, docstrings
+
+def normalize_terms(values: Set[str]) -> Set[str]:
+    """Cleans every distinct raw value once and returns the non-empty terms."""
+    terms = set(clean_words(values))
+    terms.discard(None)
+    return terms
 
 # =================== Example Analysis ===================
-def extract_metadata(example_json: Dict[str, Any]) -> Dict[str, Any]:
-    calls, vars_, keywords = set(), set(), set()
-    doc, param_count, return_type, max_depth, total_children = "", 0, "", 0, 0
-
-    def recurse(node, depth=1):
-        nonlocal doc, param_count, return_type, max_depth, total_children
-        max_depth = max(max_depth, depth)
-        if isinstance(node, dict):
-            total_children += 1
-            typ = node.get("type")
-            if typ == "Call":
-                for c in node.get("children", []):
-                    if isinstance(c, dict) and c.get("type") in {"NameLoad", "AttributeLoad"}:
-                        if isinstance(c.get("value"), str):
-                            calls.add(c["value"])
-            elif typ in {"NameStore", "NameLoad", "arg"}:
-                if isinstance(node.get("value"), str):
-                    vars_.add(node["value"])
-            elif typ == "keyword":
-                if isinstance(node.get("value"), str):
-                    keywords.add(node["value"])
-            elif typ == "arguments":
-                param_count += sum(1 for arg in node.get("children", []) if isinstance(arg, dict) and arg.get("type") == "arg")
-            elif typ == "Return":
-                for c in node.get("children", []):
-                    if isinstance(c, dict):
-                        return_type = c.get("type", "")
-            elif typ == "Expr":
-                for gc in node.get("children", []):
-                    if isinstance(gc, dict) and gc.get("type") == "Str":
-                        val = gc.get("value")
-                        if isinstance(val, str) and len(val.strip()) > 10:
-                            doc = val.strip()
-            for child in node.values():
-                if isinstance(child, (list, dict)):
-                    recurse(child, depth + 1)
-        elif isinstance(node, list):
-            for item in node:
-                recurse(item, depth)
-
-    recurse(example_json)
-    return {
-        "type": example_json.get("type", ""),
-        "value": example_json.get("value", ""),
-        "doc": doc,
-        "calls": sorted(calls),
-        "vars": sorted(vars_),
-        "keywords": sorted(keywords),
-        "param_count": param_count,
-        "return_type": return_type,
-        "depth": max_depth,
-        "child_count": total_children,
-        "complexity_score": len(calls) + len(vars_) + len(keywords) + param_count + max_depth,
-        "raw": example_json
-    }
+def extract_metadata(example_json: Dict[str, Any], include_raw: bool = True) -> Dict[str, Any]:
+    return collect_metadata(example_json, include_raw)
 
 # =================== Classification and Linking ===================
 def classify_term(term: str, index: int, cache: Dict[str, Dict]) -> Dict:
@@ -133,82 +181,228 @@ def classify_term(term: str, index: int, cache: Dict[str, Dict]) -> Dict:
     cache[term] = analysis
     return analysis
 
-def match_examples(term: str, bank: Dict[str, Dict]) -> List[str]:
-    matches, t = [], term.lower()
-    for eid, meta in bank.items():
-        if t in meta["value"].lower() or t in " ".join(meta["calls"]).lower() or t in " ".join(meta["vars"]).lower():
-            matches.append(eid)
-        elif SequenceMatcher(None, t, meta["value"].lower()).ratio() > 0.7:
-            matches.append(eid)
-        if len(matches) >= 3: break
-    return matches
+def match_examples(term: str, bank: "Dict[str, Dict] | ExampleIndex") -> List[str]:
+    """Returns up to 3 example IDs for the term. Pass an ExampleIndex built once; a plain bank is indexed on every call."""
+    from SmartCodeLex.builder.example_index import ExampleIndex
+    index = bank if isinstance(bank, ExampleIndex) else ExampleIndex(bank)
+    return index.match(term)
 
 def gpt_definition(term: str, gpt_key: str | None) -> str:
-    if not gpt_key or not openai: return ""
+    """Single blocking definition (cached). run_pipeline defines all terms at once through DefinitionService."""
+    from SmartCodeLex.builder.definition_service import DefinitionService, make_backend
+    backend = make_backend("openai", gpt_key)
+    if not backend: return ""
+    service = DefinitionService(backend)
     try:
-        openai.api_key = gpt_key
-        res = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Briefly and clearly explain this programming term."},
-                {"role": "user", "content": term}
-            ],
-            temperature=0.2,
-            max_tokens=60
-        )
-        return res.choices[0].message.content.strip()
-    except: return ""
+        return service.define_terms([term]).get(term, "")
+    finally:
+        service.close()
+
+def define_units(concepts: List[Dict], service: "DefinitionService | None"):
+    """Fills the definition of the units that have no docstring, with all requests made concurrently."""
+    undefined = [unit["term"] for unit in concepts if not unit["definition"]]
+    if not undefined or service is None:
+        return
+    print(f"Defining {len(undefined)} terms...")
+    definitions = service.define_terms(undefined)
+    for unit in concepts:
+        if not unit["definition"]:
+            unit["definition"] = definitions.get(unit["term"], "")
+    print(f"Definitions: {service.stats}")
+
+def classify_terms(terms: Set[str]) -> List[Tuple[str, str]]:
+    """(term, suggested code) of every term classified as a concept, class or function, in term order."""
+    from tqdm import tqdm
+
+    classified, cache, idx = [], {}, 1
+    with metrics.profiled():
+        for term in tqdm(sorted(terms), desc="Classifying terms"):
+            with metrics.timer("units.classify"):
+                analysis = classify_term(term, idx, cache)
+            if analysis["suggested_code"]:
+                classified.append((term, analysis["suggested_code"]))
+                idx += 1
+    return classified
+
+def link_examples(classified: List[Tuple[str, str]], bank: Dict[str, Dict]) -> Dict[str, List[str]]:
+    """{term: example IDs} of every classified term, from an ExampleIndex built once over the bank."""
+    from tqdm import tqdm
+    from SmartCodeLex.builder.example_index import ExampleIndex
+
+    print("Indexing examples...")
+    with metrics.timer("example_index.build"):
+        example_index = ExampleIndex(bank)
+    links = {}
+    with metrics.profiled():
+        for term, _ in tqdm(classified, desc="Linking examples"):
+            with metrics.timer("units.match_examples"):
+                links[term] = match_examples(term, example_index)
+    return links
+
+# =================== Stage Cache ===================
+# Code each cached stage depends on, besides the stages before it: its source is part of the stage key
+STAGE_CODE = {
+    "ingest": (ast_walker, flat_tree, shards, build_corpus, TermExampleCollector, example_id,
+               extract_terms_examples_docstrings, extract_lines, ingest_shard, ingest_ast),
+    "normalize_terms": (normalizer, normalize_terms),
+    "classify": (classify_term, is_garbage_like, suggest_concept_code, classify_terms),
+    # By name: importing example_index loads numpy
+    "link": ("SmartCodeLex.builder.example_index", match_examples, link_examples)
+}
+
+def stage_keys(stage_cache: StageCache, ast_file: str, include_raw: bool = True,
+               code: Dict[str, Tuple] = STAGE_CODE) -> Dict[str, str]:
+    """
+    Cache key of every stage. Each key includes the keys of the stages it
+    depends on, so a change to the corpus or to a stage's code also changes
+    the keys of every stage downstream of it.
+    """
+    keys = {}
+    keys["ingest"] = stage_cache.key("ingest", stage_cache.files_fingerprint(corpus_files(ast_file)),
+                                     {"include_raw": include_raw}, code_fingerprint(*code["ingest"]))
+    keys["normalize_terms"] = stage_cache.key("normalize_terms", keys["ingest"],
+                                              code_fingerprint(*code["normalize_terms"]))
+    keys["classify"] = stage_cache.key("classify", keys["normalize_terms"], code_fingerprint(*code["classify"]))
+    keys["link"] = stage_cache.key("link", keys["classify"], keys["ingest"], code_fingerprint(*code["link"]))
+    return keys
 
 # =================== Pipeline Execution ===================
-def run_pipeline(ast_file: str, gpt_key: str | None):
+def run_pipeline(ast_file: str, gpt_key: str | None, workers: int = 1, include_raw: bool = True,
+                 definition_service: "DefinitionService | None" = None, stage_cache: StageCache | None = None):
+    """
+    Without a definition_service, definitions come from OpenAI when gpt_key is
+    given (with the default service settings), or are left empty.
+
+    Ingestion, term normalization, classification and example linking are
+    cached in stage_cache (default: a StageCache in CACHE_DIR), keyed on their
+    inputs and code: only the stages whose inputs changed run again, so
+    editing classify_term re-classifies and re-links without re-parsing the
+    AST corpus. Definitions have their own cache (see DefinitionService).
+    """
+    import sqlite3
+    from db.search import index_code
+    from SmartCodeLex.builder.definition_service import DefinitionService, make_backend
+
+    stage_cache = stage_cache or StageCache()
     print(f"Loading AST from {ast_file}...")
-    terms, examples_raw, docstrings = set(), {}, {}
-    with open(ast_file, 'r', encoding='utf-8') as f:
-        for line in tqdm(f, desc="Parsing JSONL"):
-            try:
-                obj = json.loads(line.strip())
-                extract_terms_examples_docstrings(obj, terms, examples_raw, docstrings)
-            except: continue
-
-    if not os.path.exists(EXAMPLE_ADVANCED_PATH):
-        print("Analyzing examples...")
-        example_advanced = {
-            eid: extract_metadata(json.loads(raw)) for eid, raw in tqdm(examples_raw.items())
-        }
-        with open(EXAMPLE_ADVANCED_PATH, 'w', encoding='utf-8') as f:
-            json.dump(example_advanced, f, indent=2, ensure_ascii=False)
-    else:
-        print("Found example_bank_advanced.json – will use it directly")
-        with open(EXAMPLE_ADVANCED_PATH, 'r', encoding='utf-8') as f:
+    with metrics.timer("stage_cache.keys"):
+        keys = stage_keys(stage_cache, ast_file, include_raw)
+    ingest_key = keys["ingest"]
+
+    # The example bank (with its raw ASTs) is stored once, as EXAMPLE_ADVANCED_PATH:
+    # the cached ingest output holds the terms and docstrings, and the bank is
+    # read back from its file when that file was written from this ingestion
+    example_advanced = None
+
+    def ingest():
+        nonlocal example_advanced
+        values, example_advanced, docstrings = ingest_ast(ast_file, workers, True, include_raw)
+        os.makedirs(os.path.dirname(EXAMPLE_ADVANCED_PATH), exist_ok=True)
+        with metrics.timer("example_bank.write"), open(EXAMPLE_ADVANCED_PATH, 'w', encoding='utf-8') as f:
+            json.dump(example_advanced, f, ensure_ascii=False, separators=(",", ":"), default=json_default)
+        stage_cache.mark_output(EXAMPLE_ADVANCED_PATH, ingest_key)
+        return values, docstrings
+
+    with metrics.timer("ingest"):
+        bank_current = stage_cache.output_is_current(EXAMPLE_ADVANCED_PATH, ingest_key)
+        values, docstrings = stage_cache.run("ingest", ingest_key, ingest, refresh=not bank_current)
+    if example_advanced is None:
+        with metrics.timer("example_bank.read"), open(EXAMPLE_ADVANCED_PATH, 'r', encoding='utf-8') as f:
             example_advanced = json.load(f)
+    with metrics.timer("normalize_terms"):
+        terms = stage_cache.run("normalize_terms", keys["normalize_terms"], lambda: normalize_terms(values))
 
     print("Building core units...")
-    concepts, cache, idx = [], {}, 1
-    for term in tqdm(sorted(terms)):
-        analysis = classify_term(term, idx, cache)
-        if analysis["suggested_code"]:
-            desc = docstrings.get(term, "") or gpt_definition(term, gpt_key)
-            unit = {
-                "id": analysis["suggested_code"],
-                "term": term,
-                "concept": term,
-                "definition": desc,
-                "example_ids": match_examples(term, example_advanced),
-                "language": "python",
-                "source": "py150"
-            }
-            concepts.append(unit)
-            idx += 1
+    with metrics.timer("classify"):
+        classified = stage_cache.run("classify", keys["classify"], lambda: classify_terms(terms))
+    with metrics.timer("link"):
+        links = stage_cache.run("link", keys["link"], lambda: link_examples(classified, example_advanced))
+    concepts = [{
+        "id": code,
+        "term": term,
+        "concept": term,
+        "definition": docstrings.get(term, ""),
+        "example_ids": links[term],
+        "language": "python",
+        "source": "py150"
+    } for term, code in classified]
+    metrics.count("stage_cache.hits", len(stage_cache.hits))
+
+    if definition_service is None:
+        backend = make_backend("openai", gpt_key)
+        definition_service = DefinitionService(backend) if backend else None
+    try:
+        with metrics.timer("definitions"):
+            define_units(concepts, definition_service)
+    finally:
+        # A DefinitionError (e.g. a rejected key) stops the run; definitions received so far stay cached
+        if definition_service:
+            definition_service.close()
 
     os.makedirs(os.path.dirname(CORE_UNITS_PATH), exist_ok=True)
-    with open(CORE_UNITS_PATH, 'w', encoding='utf-8') as f:
+    with metrics.timer("core_units.write"), open(CORE_UNITS_PATH, 'w', encoding='utf-8') as f:
         json.dump(concepts, f, indent=2, ensure_ascii=False)
     print(f"Saved {len(concepts)} core units in {CORE_UNITS_PATH}")
 
+    # Examples and docstrings become searchable with db.search.search_code
+    with metrics.timer("search_index"):
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            indexed = index_code(conn, example_advanced, docstrings)
+        finally:
+            conn.close()
+    print(f"Indexed {indexed} examples and docstrings for search in {DB_PATH}")
+
+    metrics.count("terms", len(terms))
+    metrics.count("examples", len(example_advanced))
+    metrics.count("core_units", len(concepts))
+
 # =================== Main ===================
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument('--input', type=str, default=AST_INPUT)
+    parser.add_argument('--input', type=str, default=AST_INPUT, help=f"AST JSONL file, or a directory of JSONL shards (default: {AST_INPUT})")
     parser.add_argument('--openai-key', type=str, help="OpenAI key for generating smart explanations")
+    parser.add_argument('--workers', type=int, default=1, help="Processes used to parse the AST file in shards")
+    parser.add_argument('--no-raw', action='store_true', help="Do not store the raw AST of each example")
+    parser.add_argument('--definitions', choices=["openai", "stub", "none"], default="openai",
+                        help="Backend for terms without a docstring (openai needs --openai-key)")
+    parser.add_argument('--model', type=str, default=DEFAULT_MODEL, help=f"Definition model (default: {DEFAULT_MODEL})")
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY,
+                        help=f"Definition requests in flight at once (default: {MAX_CONCURRENCY})")
+    parser.add_argument('--rpm', type=float, default=REQUESTS_PER_MINUTE,
+                        help=f"Definition requests per minute, 0: unlimited (default: {REQUESTS_PER_MINUTE})")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f"Terms per definition request (default: {BATCH_SIZE})")
+    parser.add_argument('--definition-cache', type=str, default=CACHE_PATH,
+                        help=f"Definition cache database (default: {CACHE_PATH})")
+    parser.add_argument('--cache-dir', type=str, default=CACHE_DIR, help="Directory of the stage cache")
+    parser.add_argument('--no-cache', action='store_true', help="Run every stage, without reading or writing the stage cache")
+    parser.add_argument('--clear-cache', action='store_true', help="Delete the cached stage outputs before running")
+    parser.add_argument('--metrics', action='store_true', help=f"Time every stage; report in {METRICS_REPORT} and the meta table of {DB_PATH}")
+    parser.add_argument('--profile', action='store_true', help="With --metrics, run cProfile over the ingestion and unit loops")
+    parser.add_argument('--sample', action='store_true', help="With --metrics, sample the running function every 5 ms")
     args = parser.parse_args()
-    run_pipeline(args.input, args.openai_key)
+
+    if args.metrics:
+        metrics.enable(profile=args.profile, sample=args.sample)
+
+    # Imported after parsing, so --help does not load asyncio
+    from SmartCodeLex.builder.definition_service import DefinitionService, make_backend
+
+    backend = make_backend(args.definitions, args.openai_key, args.model)
+    service = DefinitionService(backend, args.definition_cache, args.concurrency, args.rpm, args.batch_size) if backend else None
+    gpt_key = args.openai_key if args.definitions == "openai" else None
+    stage_cache = StageCache(args.cache_dir, enabled=not args.no_cache)
+    if args.clear_cache:
+        stage_cache.clear()
+    run_pipeline(args.input, gpt_key, args.workers, include_raw=not args.no_raw, definition_service=service,
+                 stage_cache=stage_cache)
+
+    if args.metrics:
+        import sqlite3
+        metrics.disable()
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            metrics.write_report(METRICS_REPORT, conn, "metrics_pipeline", extra={"workers": args.workers})
+        finally:
+            conn.close()
+        print(f"Metrics report saved to {METRICS_REPORT} (meta key metrics_pipeline in {DB_PATH})")
@@ -1,16 +1,30 @@
 # smartcodelex_prompt_exporter.py
+# Run from the repository root: python -m SmartCodeLex.builder.smartcodelex_prompt_exporter
 
+import argparse
+import json
 import sqlite3
 import os
+from typing import Dict, Iterator, List, Optional, Tuple
 
-DB_PATH = "smartcodelex.db"
-OUTPUT_PATH = "prompts/prompts.txt"
+from SmartCodeLex.paths import data_path
+
+DB_PATH = data_path("smartcodelex.db")
+OUTPUT_PATH = data_path("prompts", "prompts.txt")
 MAX_EXAMPLES = 3
 
+UNIT_BATCH_SIZE = 1000          # core units fetched per cursor round trip
+SQL_MAX_VARIABLES = 900         # stays under SQLite's default limit of 999 "?" per statement
+WRITE_BUFFER_SIZE = 1 << 20
+
 # ===============================
 # Fetch data from the database
 # ===============================
 def fetch_units_with_examples():
+    """
+    Loads every core unit and every example at once. Kept for callers that
+    need the whole set; export_prompts streams instead (see iter_unit_batches).
+    """
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
 
@@ -25,46 +39,137 @@ def fetch_units_with_examples():
     conn.close()
     return core_units, examples_map
 
+def parse_example_ids(example_ids_json) -> List:
+    try:
+        example_ids = json.loads(example_ids_json)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(example_ids, list):
+        return []
+    return [eid for eid in example_ids if isinstance(eid, (str, int))]
+
+def fetch_examples(conn: sqlite3.Connection, example_ids) -> Dict:
+    """
+    Contents of the given examples, with batched IN lookups.
+    """
+    example_ids = list(example_ids)
+    examples_map = {}
+    for start in range(0, len(example_ids), SQL_MAX_VARIABLES):
+        chunk = example_ids[start:start + SQL_MAX_VARIABLES]
+        placeholders = ",".join("?" * len(chunk))
+        for eid, content in conn.execute(f"SELECT id, content FROM examples WHERE id IN ({placeholders})", chunk):
+            examples_map[eid] = content.strip()
+    return examples_map
+
+def iter_unit_batches(conn: sqlite3.Connection, batch_size: int = UNIT_BATCH_SIZE) -> Iterator[Tuple[List, Dict]]:
+    """
+    Streams core units through a cursor, batch_size rows at a time, each batch
+    with the examples its units refer to. Memory does not grow with the table.
+
+    Yields:
+        tuple: ([(unit row, parsed example IDs)], {example id: content} for those units)
+    """
+    cursor = conn.execute("SELECT id, term, concept, definition, example_ids FROM core_units")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        units = [(row, parse_example_ids(row[4])) for row in rows]
+        wanted = set()
+        for _, example_ids in units:
+            wanted.update(example_ids)
+        yield units, fetch_examples(conn, wanted)
+
 # ===============================
 # Generate prompt from unit
 # ===============================
 def generate_prompt(unit, examples_map):
-    uid, term, concept, definition, example_ids_json = unit
-    example_ids = []
-    try:
-        example_ids = json.loads(example_ids_json)
-    except:
-        pass
+    return build_prompt(unit[2], unit[3], parse_example_ids(unit[4]), examples_map)
 
+def build_prompt(concept, definition, example_ids, examples_map):
     examples = [examples_map.get(eid) for eid in example_ids if eid in examples_map][:MAX_EXAMPLES]
 
-    prompt = f"[Concept] {concept}\n"
+    parts = [f"[Concept] {concept}\n"]
     if definition:
-        prompt += f"[Definition] {definition.strip()}\n"
+        parts.append(f"[Definition] {definition.strip()}\n")
     if examples:
-        prompt += f"[Examples]\n"
+        parts.append("[Examples]\n")
         for i, ex in enumerate(examples, 1):
-            prompt += f"- E{i:03}: {ex}\n"
-    prompt += "\n"
-    return prompt
+            parts.append(f"- E{i:03}: {ex}\n")
+    parts.append("\n")
+    return "".join(parts)
 
 # ===============================
-# Execute export
+# Write prompts
 # ===============================
-def export_prompts():
-    if not os.path.exists("prompts"):
-        os.makedirs("prompts")
+class PromptWriter:
+    """
+    Buffered prompt output. With max_shard_bytes, prompts go to numbered
+    shards (prompts_00000.txt, ...) of at most that many bytes each; a prompt
+    is never split, so one larger than the bound gets a shard of its own.
+    """
+    def __init__(self, output_path: str, max_shard_bytes: Optional[int] = None):
+        self.output_path = output_path
+        self.max_shard_bytes = max_shard_bytes
+        self.paths = []
+        self._file = None
+        self._size = 0
+
+    def _shard_path(self, index: int) -> str:
+        if not self.max_shard_bytes:
+            return self.output_path
+        root, ext = os.path.splitext(self.output_path)
+        return f"{root}_{index:05}{ext}"
+
+    def _open_next(self):
+        if self._file:
+            self._file.close()
+        path = self._shard_path(len(self.paths))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "wb", buffering=WRITE_BUFFER_SIZE)
+        self.paths.append(path)
+        self._size = 0
+
+    def write(self, prompt: str):
+        data = prompt.encode("utf-8")
+        if self._file is None or (self.max_shard_bytes and self._size and self._size + len(data) > self.max_shard_bytes):
+            self._open_next()
+        self._file.write(data)
+        self._size += len(data)
 
-    core_units, examples_map = fetch_units_with_examples()
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        for unit in core_units:
-            prompt = generate_prompt(unit, examples_map)
-            f.write(prompt)
+    def close(self):
+        if self._file is None:
+            # No prompts: still leave an (empty) output file
+            self._open_next()
+        self._file.close()
+
+# ===============================
+# Execute export
+# ===============================
+def export_prompts(db_path: str = DB_PATH, output_path: str = OUTPUT_PATH, max_shard_bytes: Optional[int] = None,
+                   batch_size: int = UNIT_BATCH_SIZE) -> int:
+    conn = sqlite3.connect(db_path)
+    writer = PromptWriter(output_path, max_shard_bytes)
+    count = 0
+    try:
+        for units, examples_map in iter_unit_batches(conn, batch_size):
+            for unit, example_ids in units:
+                writer.write(build_prompt(unit[2], unit[3], example_ids, examples_map))
+            count += len(units)
+    finally:
+        writer.close()
+        conn.close()
 
-    print(f"✅ Prompts generated for {len(core_units)} concepts.")
-    print(f"📁 Saved to: {OUTPUT_PATH}")
+    print(f"✅ Prompts generated for {count} concepts.")
+    print(f"📁 Saved to: {', '.join(writer.paths) if len(writer.paths) <= 3 else f'{len(writer.paths)} shards like {writer.paths[0]}'}")
+    return count
 
 # ===============================
 if __name__ == "__main__":
-    import json
-    export_prompts()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export core units and their examples as prompts")
+    parser.add_argument('--db', type=str, default=DB_PATH)
+    parser.add_argument('--output', type=str, default=OUTPUT_PATH)
+    parser.add_argument('--max-shard-bytes', type=int, help="Split the output into shards of at most this size")
+    parser.add_argument('--batch-size', type=int, default=UNIT_BATCH_SIZE, help="Core units read per batch")
+    args = parser.parse_args()
+    export_prompts(args.db, args.output, args.max_shard_bytes, args.batch_size)
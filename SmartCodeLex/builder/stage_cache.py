@@ -0,0 +1,241 @@
+# builder/stage_cache.py
+
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import pickle
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from SmartCodeLex.paths import data_path
+
+CACHE_DIR = data_path("knowledge", "stage_cache")
+FINGERPRINTS_FILE = "fingerprints.json"
+OUTPUTS_FILE = "outputs.json"
+
+# Bump to invalidate every cached output (e.g. after changing how outputs are stored)
+CACHE_FORMAT = 2
+# Outputs kept per stage; older ones are deleted when a new one is stored
+KEEP_PER_STAGE = 3
+
+def code_fingerprint(*objects: Any) -> str:
+    """
+    Hash of the source of functions, classes or modules, so a stage's key
+    changes with the code that computes it. Module names (str) are read from
+    their source file without being imported. Objects without retrievable
+    source fall back to their qualified name.
+    """
+    digest = hashlib.sha256()
+    for obj in objects:
+        try:
+            if isinstance(obj, str):
+                with open(importlib.util.find_spec(obj).origin, 'r', encoding='utf-8') as f:
+                    source = f.read()
+            else:
+                source = inspect.getsource(obj)
+        except (OSError, TypeError, AttributeError, ImportError):
+            source = f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))}"
+        digest.update(source.encode('utf-8'))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class StageCache:
+    """
+    On-disk cache of pipeline stage outputs, addressed by a hash of the
+    stage's inputs: input file contents, parameters, the source of the code
+    that computes it and the keys of the stages it depends on. A stage only
+    runs again when one of those changes, and a changed stage changes the key
+    of every stage downstream of it.
+
+    Outputs are pickled to <directory>/<stage>/<key>.pkl. Input files are
+    hashed once per (size, mtime) and the digests remembered in
+    fingerprints.json, so an unchanged AST corpus is not re-read to be hashed.
+
+    Parameters:
+        directory (str): Cache root.
+        enabled (bool): With False every stage runs and nothing is stored.
+    """
+    def __init__(self, directory: str = CACHE_DIR, enabled: bool = True):
+        self.directory = directory
+        self.enabled = enabled
+        self.hits: List[str] = []
+        self.misses: List[str] = []
+        self._fingerprints: Optional[Dict[str, List]] = None
+
+    # =================== Keys ===================
+    def file_fingerprint(self, path: str, save: bool = True) -> str:
+        """
+        SHA-256 of a file's content, recomputed only when its size or mtime changed.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        known = self._load_fingerprints().get(path)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self._fingerprints[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        if save and self.enabled:
+            self._save_fingerprints()
+        return digest.hexdigest()
+
+    def files_fingerprint(self, paths: Iterable[str]) -> List[Tuple[str, str]]:
+        """
+        (name, content hash) of each file, in order. Only base names are kept,
+        so moving a corpus does not invalidate its stages.
+        """
+        fingerprints = [(os.path.basename(path), self.file_fingerprint(path, save=False)) for path in paths]
+        if self.enabled:
+            self._save_fingerprints()
+        return fingerprints
+
+    def key(self, stage: str, *inputs: Any) -> str:
+        """
+        Key of a stage run from its JSON-serializable inputs (parameters,
+        fingerprints, upstream keys).
+        """
+        payload = json.dumps([CACHE_FORMAT, stage, inputs], sort_keys=True, separators=(",", ":"), default=repr)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    # =================== Outputs ===================
+    def path(self, stage: str, key: str) -> str:
+        return os.path.join(self.directory, stage, f"{key}.pkl")
+
+    def load(self, stage: str, key: str) -> Tuple[bool, Any]:
+        """
+        Returns (True, output) if the stage output is cached, else (False, None).
+        An unreadable entry counts as missing.
+        """
+        if not self.enabled:
+            return False, None
+        try:
+            with open(self.path(stage, key), 'rb') as f:
+                return True, pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            print(f"Ignoring unreadable cache entry {self.path(stage, key)}: {e}")
+            return False, None
+
+    def store(self, stage: str, key: str, value: Any):
+        """
+        Writes a stage output (atomically, so an interrupted run leaves no
+        partial entry) and prunes the stage's oldest outputs.
+        """
+        if not self.enabled:
+            return
+        path = self.path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._prune(stage, keep=path)
+
+    def run(self, stage: str, key: str, compute: Callable[[], Any], refresh: bool = False) -> Any:
+        """
+        Returns the cached output of the stage for key, or computes and stores
+        it. With refresh=True it is computed (and stored) even if cached.
+        """
+        hit, value = self.load(stage, key) if not refresh else (False, None)
+        if hit:
+            self.hits.append(stage)
+            print(f"Stage {stage}: cached ({key[:12]})")
+            return value
+        self.misses.append(stage)
+        value = compute()
+        self.store(stage, key, value)
+        return value
+
+    def output_is_current(self, path: str, key: str) -> bool:
+        """
+        True if the file at path exists and was last written from the stage
+        output with this key (see mark_output), so it need not be rewritten.
+        """
+        if not self.enabled or not os.path.exists(path):
+            return False
+        return self._read_json(OUTPUTS_FILE).get(os.path.abspath(path)) == key
+
+    def mark_output(self, path: str, key: str):
+        """
+        Records that the file at path was written from the stage output with key.
+        """
+        if not self.enabled:
+            return
+        outputs = self._read_json(OUTPUTS_FILE)
+        outputs[os.path.abspath(path)] = key
+        self._write_json(OUTPUTS_FILE, outputs)
+
+    def clear(self, stage: Optional[str] = None):
+        """
+        Deletes the cached outputs of one stage, or of every stage.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for name in [stage] if stage else os.listdir(self.directory):
+            directory = os.path.join(self.directory, name)
+            if os.path.isdir(directory):
+                for entry in os.listdir(directory):
+                    os.remove(os.path.join(directory, entry))
+
+    # =================== Internals ===================
+    def _prune(self, stage: str, keep: str):
+        directory = os.path.join(self.directory, stage)
+        entries = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".pkl")]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[KEEP_PER_STAGE:]:
+            if path != keep:
+                os.remove(path)
+
+    def _load_fingerprints(self) -> Dict[str, List]:
+        if self._fingerprints is None:
+            self._fingerprints = self._read_json(FINGERPRINTS_FILE)
+        return self._fingerprints
+
+    def _save_fingerprints(self):
+        self._write_json(FINGERPRINTS_FILE, self._load_fingerprints())
+
+    def _read_json(self, name: str) -> Dict:
+        try:
+            with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json(self, name: str, data: Dict):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(f"{path}.tmp", path)
+
+# Direct test
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "input.jsonl")
+        with open(source, 'w') as f:
+            f.write("[1, 2, 3]\n")
+
+        cache = StageCache(os.path.join(tmp, "cache"))
+        calls = []
+        def compute():
+            calls.append(1)
+            return {"values": {1, 2, 3}}
+
+        key = cache.key("ingest", cache.files_fingerprint([source]), {"include_raw": True})
+        assert cache.run("ingest", key, compute) == cache.run("ingest", key, compute) and len(calls) == 1
+        assert cache.key("ingest", cache.files_fingerprint([source]), {"include_raw": False}) != key
+        cache.mark_output(source, key)
+        assert cache.output_is_current(source, key) and not cache.output_is_current(source, "other")
+
+        with open(source, 'w') as f:
+            f.write("[4, 5, 6]\n")
+        os.utime(source, ns=(0, 0))
+        assert cache.key("ingest", cache.files_fingerprint([source]), {"include_raw": True}) != key
+        print(f"hits: {cache.hits}, misses: {cache.misses}")
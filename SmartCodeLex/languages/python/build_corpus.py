@@ -0,0 +1,129 @@
+# languages/python/build_corpus.py
+# Run from the repository root: python -m SmartCodeLex.languages.python.build_corpus <source dir> <output dir>
+
+import argparse
+import json
+import os
+from typing import Iterator, List, Optional, Tuple
+
+from SmartCodeLex.languages.python.parse_python import parse_source, read_file_to_bytes
+
+SHARD_LINES = 5000
+CHUNK_SIZE = 16
+EXCLUDED_DIRS = {".git", ".hg", ".svn", "__pycache__", "node_modules", ".tox", ".nox", ".venv", "venv"}
+
+FAILURES_LOG = "failures.jsonl"
+FILES_LIST = "files.txt"
+
+def iter_python_files(root: str, excluded_dirs=EXCLUDED_DIRS) -> Iterator[str]:
+    """
+    Yields the .py files under root (relative paths, sorted, so corpora are reproducible).
+    """
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in excluded_dirs)
+        for name in sorted(files):
+            if name.endswith(".py"):
+                yield os.path.relpath(os.path.join(directory, name), root)
+
+def encode_line(nodes: List) -> bytes:
+    line = json.dumps(nodes, separators=(',', ':'), ensure_ascii=False)
+    try:
+        return line.encode('utf-8')
+    except UnicodeEncodeError:
+        # Lone surrogates in string literals: only escaped JSON can carry them
+        return json.dumps(nodes, separators=(',', ':')).encode('ascii')
+
+def parse_path(task: Tuple[str, str]) -> Tuple[str, Optional[bytes], Optional[str]]:
+    """
+    Worker task: parses one file.
+
+    Returns:
+        tuple: (relative path, py150 JSON line (UTF-8) or None, error message or None)
+    """
+    root, path = task
+    try:
+        nodes = parse_source(read_file_to_bytes(os.path.join(root, path)), path)
+        return path, encode_line(nodes), None
+    except Exception as e:
+        # Any failure (including an AST node the encoder does not handle) is
+        # logged for this file; raised through pool.imap it would end the build
+        return path, None, f"{type(e).__name__}: {e}"
+
+def shard_path(output_dir: str, index: int) -> str:
+    return os.path.join(output_dir, f"ast_{index:05}.jsonl")
+
+def build_corpus(source_dir: str, output_dir: str, workers: int = 1, shard_lines: int = SHARD_LINES) -> Tuple[int, int]:
+    """
+    Parses every .py file under source_dir into py150 JSONL shards
+    (output_dir/ast_00000.jsonl, ...) of at most shard_lines lines each.
+
+    Lines are written in file order; files.txt lists the path of every line
+    in the same order (like py150's file lists). Files that do not parse
+    are written to failures.jsonl and skipped.
+
+    Returns:
+        tuple: (parsed files, failed files)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    # Shards of a previous build would be read as part of this corpus
+    for name in os.listdir(output_dir):
+        if name.startswith("ast_") and name.endswith(".jsonl"):
+            os.remove(os.path.join(output_dir, name))
+    tasks = [(source_dir, path) for path in iter_python_files(source_dir)]
+    parsed, failed = 0, 0
+    shard, shard_index = None, 0
+
+    from tqdm import tqdm
+
+    if workers > 1:
+        from multiprocessing import Pool
+        pool = Pool(workers)
+    else:
+        pool = None
+    try:
+        results = pool.imap(parse_path, tasks, CHUNK_SIZE) if pool else map(parse_path, tasks)
+        with open(os.path.join(output_dir, FILES_LIST), 'w', encoding='utf-8') as files_list, \
+             open(os.path.join(output_dir, FAILURES_LOG), 'w', encoding='utf-8') as failures:
+            for path, line, error in tqdm(results, total=len(tasks), desc="Parsing files"):
+                if line is None:
+                    failures.write(json.dumps({"path": path, "error": error}, ensure_ascii=False) + "\n")
+                    failed += 1
+                    continue
+                if shard is None or parsed % shard_lines == 0:
+                    if shard is not None:
+                        shard.close()
+                        shard_index += 1
+                    shard = open(shard_path(output_dir, shard_index), 'wb')
+                shard.write(line + b"\n")
+                files_list.write(path + "\n")
+                parsed += 1
+    finally:
+        if shard is not None:
+            shard.close()
+        if pool:
+            pool.close()
+            pool.join()
+
+    return parsed, failed
+
+def corpus_files(path: str) -> List[str]:
+    """
+    The JSONL files of a corpus: the file itself, or the shards of a corpus directory in order.
+    """
+    if not os.path.isdir(path):
+        return [path]
+    return [os.path.join(path, name) for name in sorted(os.listdir(path))
+            if name.endswith(".jsonl") and name != FAILURES_LOG]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a py150-style JSONL corpus from a Python source tree")
+    parser.add_argument('source', type=str, help="Directory to scan for .py files")
+    parser.add_argument('output', type=str, help="Directory for the JSONL shards")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Parser processes")
+    parser.add_argument('--shard-lines', type=int, default=SHARD_LINES, help="Files per JSONL shard")
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.shard_lines < 1:
+        parser.error("--workers and --shard-lines must be at least 1")
+    parsed, failed = build_corpus(args.source, args.output, args.workers, args.shard_lines)
+    print(f"Parsed {parsed} files into {args.output}, {failed} failed (see {os.path.join(args.output, FAILURES_LOG)})")
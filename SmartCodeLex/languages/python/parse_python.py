@@ -1,4 +1,10 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
+
+# Python 3 (3.10+) port of the py150 AST encoder. The output keeps the Python 2 node
+# vocabulary of the py150 dataset (Num/Str, NameParam, TryExcept/TryFinally,
+# single-item With, Index/ExtSlice slices), so corpora built from Python 3
+# code can be mixed with py150 lines. Constructs that only exist in Python 3
+# (f-strings, await, annotations on assignments, ...) keep their own names.
 
 import sys
 import json as json
@@ -12,136 +18,326 @@ Usage:
 """)
     exit(1)
 
-def read_file_to_string(filename):
-    f = open(filename, 'rt')
-    s = f.read()
-    f.close()
-    return s
+def read_file_to_bytes(filename):
+    # Bytes, so ast.parse applies the file's coding declaration
+    with open(filename, 'rb') as f:
+        return f.read()
+
+# Python 3 nodes written under their Python 2 (py150) names
+RENAMED_TYPES = {
+    'AsyncFunctionDef': 'FunctionDef',
+    'AsyncFor': 'For',
+    'AsyncWith': 'With',
+}
+
+# Constants that were names in Python 2
+NAME_CONSTANTS = {True: 'True', False: 'False', None: 'None'}
+
+def format_number(n):
+    """
+    unicode(n) of Python 2: floats keep 12 significant digits.
+    """
+    if isinstance(n, float):
+        s = '%.12g' % n
+        if s.lstrip('-').isdigit():
+            s += '.0'
+        return s
+    return str(n)
+
+AST = ast.AST
+NUMBER_TYPES = (int, float, complex)
+
+# Folded into the type of their parent (NameLoad, BinOpAdd, ...) instead of becoming children
+OPERATOR_TYPES = (ast.expr_context, ast.operator, ast.boolop, ast.unaryop, ast.cmpop)
+
+# Node classes with their own handling in traverse(); every other class goes
+# through the default handling
+NODE_KINDS = {
+    ast.Try: 'try', ast.With: 'with', ast.AsyncWith: 'with', ast.UnaryOp: 'unary',
+    ast.Name: 'name', ast.Constant: 'constant', ast.alias: 'alias',
+    ast.FunctionDef: 'function', ast.AsyncFunctionDef: 'function', ast.ClassDef: 'class',
+    ast.ImportFrom: 'import_from', ast.Global: 'global', ast.Nonlocal: 'global', ast.keyword: 'keyword',
+    ast.For: 'for', ast.AsyncFor: 'for', ast.If: 'if', ast.While: 'if', ast.arguments: 'arguments',
+    ast.ExceptHandler: 'handler', ast.Call: 'call', ast.Subscript: 'subscript', ast.JoinedStr: 'joined', ast.Attribute: 'attribute',
+}
+if hasattr(ast, 'TryStar'):
+    NODE_KINDS[ast.TryStar] = 'try'
+
+def parse_source(source, filename='<unknown>'):
+    """
+    Parses Python 3 source (str or bytes) into a py150 node list: dicts with
+    "type", optional "value" and "children" (indices into the list).
+
+    Raises:
+        SyntaxError, ValueError: the source does not parse.
+        RecursionError: the tree is too deep.
+    """
+    tree = ast.parse(source, filename)
+    # AST column offsets are UTF-8 byte offsets
+    source_lines = (source.encode('utf-8') if isinstance(source, str) else source).splitlines(True)
+
+    def source_between(start_line, start_col, end_line, end_col):
+        if start_line == end_line:
+            return source_lines[start_line - 1][start_col:end_col]
+        text = source_lines[start_line - 1][start_col:]
+        for line in source_lines[start_line:end_line - 1]:
+            text += line
+        return text + source_lines[end_line - 1][:end_col]
+
+    def has_empty_step(node):
+        # Python 2 wrote "x[a:b:]" with a Name('None') step; the Python 3 slice ends at that second colon
+        last = node.upper or node.lower
+        if last is None:
+            tail = source_between(node.lineno, node.col_offset, node.end_lineno, node.end_col_offset)
+        else:
+            tail = source_between(last.end_lineno, last.end_col_offset, node.end_lineno, node.end_col_offset)
+        return tail.count(b':') >= (1 if node.upper else 2)
 
-def parse_file(filename):
-    global c, d
-    tree = ast.parse(read_file_to_string(filename), filename)
-    
     json_tree = []
-    def gen_identifier(identifier, node_type = 'identifier'):
+    def new_node(node_type):
         pos = len(json_tree)
-        json_node = {}
+        json_node = {'type': node_type}
         json_tree.append(json_node)
-        json_node['type'] = node_type
+        return pos, json_node
+
+    def gen_identifier(identifier, node_type = 'identifier'):
+        pos, json_node = new_node(node_type)
         json_node['value'] = identifier
         return pos
-    
+
     def traverse_list(l, node_type = 'list'):
-        pos = len(json_tree)
-        json_node = {}
-        json_tree.append(json_node)
-        json_node['type'] = node_type
+        pos, json_node = new_node(node_type)
         children = []
         for item in l:
             children.append(traverse(item))
         if (len(children) != 0):
             json_node['children'] = children
         return pos
-        
+
+    def wrap(node_type, children):
+        pos, json_node = new_node(node_type)
+        if children:
+            json_node['children'] = children
+        return pos
+
+    def traverse_slice(node):
+        # Python 3 puts the expression itself in Subscript.slice
+        if isinstance(node, ast.Slice):
+            pos = traverse(node)
+            if node.step is None and has_empty_step(node):
+                json_tree[pos].setdefault('children', []).append(gen_identifier('None', 'NameLoad'))
+            return pos
+        if isinstance(node, ast.Constant) and node.value is Ellipsis:
+            return wrap('Ellipsis', [])
+        if isinstance(node, ast.Tuple) and any(isinstance(e, (ast.Slice, ast.Starred)) or
+                                               (isinstance(e, ast.Constant) and e.value is Ellipsis)
+                                               for e in node.elts):
+            pos = wrap('ExtSlice', [])
+            json_tree[pos]['children'] = [traverse_slice(e) for e in node.elts]
+            return pos
+        pos = wrap('Index', [])
+        json_tree[pos]['children'] = [traverse(node)]
+        return pos
+
+    def traverse_with(node, items):
+        # Python 2 had one context manager per With: "with a, b:" is nested
+        pos, json_node = new_node('With')
+        item = items[0]
+        children = [traverse(item.context_expr)]
+        if item.optional_vars:
+            children.append(traverse(item.optional_vars))
+        if len(items) > 1:
+            body_pos = wrap('body', [])
+            json_tree[body_pos]['children'] = [traverse_with(node, items[1:])]
+            children.append(body_pos)
+        else:
+            children.append(traverse_list(node.body, 'body'))
+        json_node['children'] = children
+        return pos
+
+    def traverse_try(node):
+        # Python 2 split try statements: TryFinally(body=[TryExcept(...)], finalbody)
+        if not node.finalbody:
+            return traverse_try_except(node)
+        pos, json_node = new_node('TryFinally')
+        if node.handlers:
+            body_pos = wrap('body', [])
+            json_tree[body_pos]['children'] = [traverse_try_except(node)]
+            children = [body_pos]
+        else:
+            children = [traverse_list(node.body, 'body')]
+        children.append(traverse_list(node.finalbody, 'finalbody'))
+        json_node['children'] = children
+        return pos
+
+    def traverse_try_except(node):
+        pos, json_node = new_node('TryExcept')
+        children = [traverse_list(node.body, 'body'), traverse_list(node.handlers, 'handlers')]
+        if node.orelse:
+            children.append(traverse_list(node.orelse, 'orelse'))
+        json_node['children'] = children
+        return pos
+
+    def traverse_params(args, node_type):
+        pos = wrap(node_type, [])
+        children = [gen_identifier(a.arg, 'NameParam') for a in args]
+        if children:
+            json_tree[pos]['children'] = children
+        return pos
+
     def traverse(node):
-        pos = len(json_tree)
-        json_node = {}
-        json_tree.append(json_node)
-        json_node['type'] = type(node).__name__
+        cls = type(node)
+        kind = NODE_KINDS.get(cls)
+        if kind == 'try':
+            return traverse_try(node)
+        if kind == 'with':
+            return traverse_with(node, node.items)
+        if kind == 'unary' and type(node.op) is ast.USub and type(node.operand) is ast.Constant \
+                and type(node.operand.value) in NUMBER_TYPES:
+            # Python 2 folded negative literals into the number
+            value = node.operand.value
+            return gen_identifier(format_number(complex(0.0, -value.imag) if type(value) is complex else -value), 'Num')
+
+        node_type = cls.__name__
+        pos, json_node = new_node(RENAMED_TYPES.get(node_type, node_type))
         children = []
-        if isinstance(node, ast.Name):
+        if kind is None or kind == 'unary':
+            pass
+        elif kind == 'name':
             json_node['value'] = node.id
-        elif isinstance(node, ast.Num):
-            json_node['value'] = unicode(node.n)
-        elif isinstance(node, ast.Str):
-            json_node['value'] = node.s.decode('utf-8')
-        elif isinstance(node, ast.alias):
-            json_node['value'] = unicode(node.name)
+        elif kind == 'constant':
+            value = node.value
+            value_type = type(value)
+            if value_type is bool or value is None:
+                json_node['type'] = 'NameLoad'
+                json_node['value'] = NAME_CONSTANTS[value]
+            elif value is Ellipsis:
+                json_node['type'] = 'Ellipsis'
+            elif value_type in NUMBER_TYPES:
+                json_node['type'] = 'Num'
+                json_node['value'] = format_number(value)
+            elif value_type is bytes:
+                # Python 2 dropped files with non-UTF-8 byte strings; keep them, escaped
+                json_node['type'] = 'Str'
+                json_node['value'] = value.decode('utf-8', 'backslashreplace')
+            else:
+                json_node['type'] = 'Str'
+                json_node['value'] = value
+        elif kind == 'alias':
+            json_node['value'] = node.name
             if node.asname:
                 children.append(gen_identifier(node.asname))
-        elif isinstance(node, ast.FunctionDef):
-            json_node['value'] = unicode(node.name)
-        elif isinstance(node, ast.ClassDef):
-            json_node['value'] = unicode(node.name)
-        elif isinstance(node, ast.ImportFrom):
+        elif kind == 'function' or kind == 'class':
+            json_node['value'] = node.name
+        elif kind == 'import_from':
             if node.module:
-                json_node['value'] = unicode(node.module)
-        elif isinstance(node, ast.Global):
+                json_node['value'] = node.module
+        elif kind == 'global':
             for n in node.names:
                 children.append(gen_identifier(n))
-        elif isinstance(node, ast.keyword):
-            json_node['value'] = unicode(node.arg)
-        
+        elif kind == 'keyword':
+            if node.arg is not None:
+                json_node['value'] = node.arg
 
         # Process children.
-        if isinstance(node, ast.For):
+        if kind == 'for':
             children.append(traverse(node.target))
             children.append(traverse(node.iter))
             children.append(traverse_list(node.body, 'body'))
             if node.orelse:
                 children.append(traverse_list(node.orelse, 'orelse'))
-        elif isinstance(node, ast.If) or isinstance(node, ast.While):
+        elif kind == 'if':
             children.append(traverse(node.test))
             children.append(traverse_list(node.body, 'body'))
             if node.orelse:
                 children.append(traverse_list(node.orelse, 'orelse'))
-        elif isinstance(node, ast.With):
-            children.append(traverse(node.context_expr))
-            if node.optional_vars:
-                children.append(traverse(node.optional_vars))
-            children.append(traverse_list(node.body, 'body'))
-        elif isinstance(node, ast.TryExcept):
-            children.append(traverse_list(node.body, 'body'))
-            children.append(traverse_list(node.handlers, 'handlers'))
-            if node.orelse:
-                children.append(traverse_list(node.orelse, 'orelse'))
-        elif isinstance(node, ast.TryFinally):
-            children.append(traverse_list(node.body, 'body'))
-            children.append(traverse_list(node.finalbody, 'finalbody'))
-        elif isinstance(node, ast.arguments):
-            children.append(traverse_list(node.args, 'args'))
+        elif kind == 'arguments':
+            children.append(traverse_params(getattr(node, 'posonlyargs', []) + node.args, 'args'))
             children.append(traverse_list(node.defaults, 'defaults'))
             if node.vararg:
-                children.append(gen_identifier(node.vararg, 'vararg'))
+                children.append(gen_identifier(node.vararg.arg, 'vararg'))
+            if node.kwonlyargs:
+                children.append(traverse_params(node.kwonlyargs, 'kwonlyargs'))
+                children.append(traverse_list([d for d in node.kw_defaults if d is not None], 'kw_defaults'))
             if node.kwarg:
-                children.append(gen_identifier(node.kwarg, 'kwarg'))
-        elif isinstance(node, ast.ExceptHandler):
+                children.append(gen_identifier(node.kwarg.arg, 'kwarg'))
+        elif kind == 'handler':
             if node.type:
                 children.append(traverse_list([node.type], 'type'))
             if node.name:
-                children.append(traverse_list([node.name], 'name'))
+                name_pos = wrap('name', [])
+                json_tree[name_pos]['children'] = [gen_identifier(node.name, 'NameStore')]
+                children.append(name_pos)
             children.append(traverse_list(node.body, 'body'))
-        elif isinstance(node, ast.ClassDef):
-            children.append(traverse_list(node.bases, 'bases'))
+        elif kind == 'class':
+            # Class keywords (metaclass=...) are listed after the bases
+            children.append(traverse_list(node.bases + node.keywords, 'bases'))
             children.append(traverse_list(node.body, 'body'))
             children.append(traverse_list(node.decorator_list, 'decorator_list'))
-        elif isinstance(node, ast.FunctionDef):
+        elif kind == 'function':
             children.append(traverse(node.args))
             children.append(traverse_list(node.body, 'body'))
             children.append(traverse_list(node.decorator_list, 'decorator_list'))
-        else:
-            # Default handling: iterate over children.
-            for child in ast.iter_child_nodes(node):
-                if isinstance(child, ast.expr_context) or isinstance(child, ast.operator) or isinstance(child, ast.boolop) or isinstance(child, ast.unaryop) or isinstance(child, ast.cmpop):
-                    # Directly include expr_context, and operators into the type instead of creating a child.
-                    json_node['type'] = json_node['type'] + type(child).__name__
+        elif kind == 'call':
+            # Python 2 order: func, args, keywords, *starargs, **kwargs
+            children.append(traverse(node.func))
+            starred = []
+            for arg in node.args:
+                if type(arg) is ast.Starred:
+                    starred.append(arg.value)
+                else:
+                    children.append(traverse(arg))
+            kwargs = []
+            for keyword in node.keywords:
+                if keyword.arg is None:
+                    kwargs.append(keyword.value)
                 else:
-                    children.append(traverse(child))
-                
-        if isinstance(node, ast.Attribute):
+                    children.append(traverse(keyword))
+            for value in starred + kwargs:
+                children.append(traverse(value))
+        elif kind == 'joined':
+            # Python 3.12+ also writes empty string parts in f-strings
+            for part in node.values:
+                if not (type(part) is ast.Constant and part.value == ''):
+                    children.append(traverse(part))
+        elif kind == 'subscript':
+            children.append(traverse(node.value))
+            children.append(traverse_slice(node.slice))
+            json_node['type'] = json_node['type'] + type(node.ctx).__name__
+        else:
+            # Default handling: iterate over children (the fields of ast.iter_child_nodes).
+            for field in cls._fields:
+                value = getattr(node, field, None)
+                for child in (value if isinstance(value, list) else (value,)):
+                    if not isinstance(child, AST):
+                        continue
+                    if isinstance(child, OPERATOR_TYPES):
+                        # Directly include expr_context, and operators into the type instead of creating a child.
+                        json_node['type'] = json_node['type'] + type(child).__name__
+                    else:
+                        children.append(traverse(child))
+
+        if kind == 'attribute':
             children.append(gen_identifier(node.attr, 'attr'))
-                
+
         if (len(children) != 0):
             json_node['children'] = children
         return pos
-    
+
     traverse(tree)
+    return json_tree
+
+def parse_file(filename):
+    """
+    Parses a file into one py150 JSON line.
+    """
+    json_tree = parse_source(read_file_to_bytes(filename), filename)
     return json.dumps(json_tree, separators=(',', ':'), ensure_ascii=False)
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         PrintUsage()
     try:
-        print parse_file(sys.argv[1])
+        print(parse_file(sys.argv[1]))
     except (UnicodeEncodeError, UnicodeDecodeError):
         pass
@@ -0,0 +1,13 @@
+# paths.py
+
+import os
+
+# Data files of SmartCodeLex (corpus, knowledge/, core_units/, logs/, the database)
+# live in this package directory, whatever directory the tools are run from
+SMARTCODELEX_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def data_path(*parts: str) -> str:
+    """
+    Absolute path of a SmartCodeLex data file, e.g. data_path("knowledge", "example_bank.json").
+    """
+    return os.path.join(SMARTCODELEX_DIR, *parts)
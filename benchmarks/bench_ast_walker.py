@@ -0,0 +1,58 @@
+# benchmarks/bench_ast_walker.py
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict
+
+from SmartCodeLex.builder.ast_walker import collect_metadata
+from tests.legacy import recursive_metadata, synthetic_function
+
+def deep_tree(depth: int) -> Dict[str, Any]:
+    """A chain of nested Call nodes, deeper than the default recursion limit allows."""
+    node = {"type": "NameLoad", "value": "leaf"}
+    for _ in range(depth):
+        node = {"type": "Call", "children": [{"type": "NameLoad", "value": "f"}, node]}
+    return node
+
+def throughput(func, examples) -> float:
+    start = time.perf_counter()
+    for example in examples:
+        func(example)
+    elapsed = time.perf_counter() - start
+    return len(examples) / elapsed if elapsed else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark example metadata extraction")
+    parser.add_argument('--examples', type=int, help='Number of synthetic FunctionDef examples', default=20000)
+    parser.add_argument('--deep', type=int, help='Depth of the deep-tree case', default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    examples = [synthetic_function(rng, i) for i in range(args.examples)]
+
+    recursive = throughput(recursive_metadata, examples)
+    iterative = throughput(lambda e: collect_metadata(e, include_raw=False), examples)
+
+    deep = deep_tree(args.deep)
+    try:
+        recursive_metadata(deep)
+        recursive_deep = "ok"
+    except RecursionError:
+        recursive_deep = "RecursionError"
+    walker_deep = collect_metadata(deep, include_raw=False)["depth"]
+
+    print(json.dumps({
+        "examples": args.examples,
+        "recursive_examples_per_sec": round(recursive, 1),
+        "walker_examples_per_sec": round(iterative, 1),
+        "ratio": round(iterative / recursive, 2) if recursive else None,
+        "deep_tree_depth": args.deep,
+        "recursive_deep": recursive_deep,
+        "walker_deep_depth": walker_deep
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
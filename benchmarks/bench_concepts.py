@@ -0,0 +1,36 @@
+# benchmarks/bench_concepts.py
+
+import argparse
+import json
+import time
+
+from core.concept_extractor import ConceptExtractor
+from tests.legacy import definition_lists, legacy_extract_concept
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extract_concepts against the legacy extractor")
+    parser.add_argument('--words', type=int, help='Number of definition lists', default=150_000)
+    args = parser.parse_args()
+
+    lists = definition_lists(args.words)
+    results = {"words": args.words}
+    for compound in (True, False):
+        start = time.perf_counter()
+        legacy = [legacy_extract_concept(definitions, compound) for definitions in lists]
+        legacy_sec = time.perf_counter() - start
+        start = time.perf_counter()
+        # A fresh extractor, so its definition cache starts empty
+        batch = ConceptExtractor().extract_many(lists, compound)
+        batch_sec = time.perf_counter() - start
+        mismatches = sum(a != b for a, b in zip(legacy, batch))
+        results["compound" if compound else "single"] = {
+            "legacy_sec": round(legacy_sec, 3),
+            "extract_many_sec": round(batch_sec, 3),
+            "speedup": round(legacy_sec / batch_sec, 2) if batch_sec else None,
+            "mismatches": mismatches
+        }
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_core_builder.py
+
+import argparse
+import json
+import time
+
+from core.cleaner import clean_word
+from core.core_builder import build_core_unit
+from core.lookup import cache_stats, clear_caches
+
+SAMPLE_WORDS = [
+    "run", "running", "runs", "ran", "runner", "dog", "dogs", "cat", "cats",
+    "light", "lights", "lighting", "bank", "banks", "banking", "set", "sets",
+    "play", "played", "playing", "house", "houses", "housing", "signal",
+    "signals", "structure", "structures", "move", "moving", "movement"
+]
+
+def load_words(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def run_pass(words, per_word_clear: bool) -> float:
+    """
+    Builds every word once and returns the throughput in words per second.
+    With per_word_clear, caches are emptied before each word, so only the
+    lookups shared inside a single build are saved.
+    """
+    start = time.perf_counter()
+    for raw_word in words:
+        if per_word_clear:
+            clear_caches()
+        cleaned = clean_word(raw_word)
+        if cleaned:
+            build_core_unit(raw_word, cleaned)
+    elapsed = time.perf_counter() - start
+    return len(words) / elapsed if elapsed else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark build_core_unit with the shared lookup caches")
+    parser.add_argument('--words', type=str, help='JSON word list (e.g. brain/lexical_cores/a.json)', default=None)
+    parser.add_argument('--repeat', type=int, help='Times the word list is repeated', default=10)
+    args = parser.parse_args()
+
+    words = (load_words(args.words) if args.words else SAMPLE_WORDS) * args.repeat
+
+    # Warm up the WordNet corpus reader so its load time is not measured
+    build_core_unit("warmup", "warmup")
+
+    clear_caches()
+    cold = run_pass(words, per_word_clear=True)
+    clear_caches()
+    shared = run_pass(words, per_word_clear=False)
+
+    print(json.dumps({
+        "words": len(words),
+        "cold_words_per_sec": round(cold, 1),
+        "shared_words_per_sec": round(shared, 1),
+        "speedup": round(shared / cold, 2) if cold else None,
+        "cache": cache_stats()
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# benchmarks/bench_corpus.py
+
+import argparse
+import json
+import os
+import sysconfig
+import tempfile
+import time
+
+from SmartCodeLex.languages.python.build_corpus import build_corpus
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the py150 corpus builder on a Python source tree")
+    parser.add_argument('--source', type=str, default=sysconfig.get_paths()["stdlib"], help="Directory to parse (default: the standard library)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--target-files', type=int, default=50000, help="Corpus size to extrapolate the run time to")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output:
+        start = time.perf_counter()
+        parsed, failed = build_corpus(args.source, output, args.workers)
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(output, name)) for name in os.listdir(output))
+
+    files_per_sec = (parsed + failed) / elapsed if elapsed else 0.0
+    print(json.dumps({
+        "source": args.source,
+        "workers": args.workers,
+        "parsed": parsed,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "files_per_sec": round(files_per_sec, 1),
+        "corpus_mb": round(size / 1e6, 1),
+        "estimated_minutes_for_target": round(args.target_files / files_per_sec / 60, 1) if files_per_sec else None
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
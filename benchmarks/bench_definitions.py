@@ -0,0 +1,41 @@
+# benchmarks/bench_definitions.py
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from SmartCodeLex.builder.definition_service import BATCH_SIZE, MAX_CONCURRENCY, DefinitionService, StubBackend
+
+def timed_run(terms, latency: float, cache_path, concurrency: int, batch_size: int):
+    backend = StubBackend(delay=latency)
+    service = DefinitionService(backend, cache_path, concurrency, requests_per_minute=0, batch_size=batch_size)
+    start = time.perf_counter()
+    definitions = service.define_terms(terms)
+    elapsed = time.perf_counter() - start
+    service.close()
+    return {"seconds": round(elapsed, 3), "requests": backend.requests, "defined": len(definitions)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the definition service against one request per term")
+    parser.add_argument('--terms', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=0.05, help="Simulated seconds per request")
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    terms = [f"term_{i}" for i in range(args.terms)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "definitions.db")
+        results = {
+            # What gpt_definition did: one blocking request per term, no cache
+            "sequential": timed_run(terms, args.latency, None, 1, 1),
+            "service": timed_run(terms, args.latency, cache_path, args.concurrency, args.batch_size),
+            "service_cached_rerun": timed_run(terms, args.latency, cache_path, args.concurrency, args.batch_size)
+        }
+    results["speedup"] = round(results["sequential"]["seconds"] / results["service"]["seconds"], 1)
+    print(json.dumps({"terms": args.terms, "latency": args.latency, **results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/bench_flat_tree.py
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import List
+
+from SmartCodeLex.builder.flat_tree import FlatTree, collect_flat_metadata
+from tests.legacy import flatten, synthetic_function
+
+def synthetic_line(rng: random.Random, functions: int) -> str:
+    module = {"type": "Module", "children": [synthetic_function(rng, i) for i in range(functions)]}
+    return json.dumps(flatten(module))
+
+def traced_size(build, lines: List[str]) -> int:
+    tracemalloc.start()
+    kept = [build(line) for line in lines]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flat (array-backed) py150 trees against a dict per node")
+    parser.add_argument('--lines', type=int, help='Number of synthetic py150 lines', default=500)
+    parser.add_argument('--functions', type=int, help='Functions per line', default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lines = [synthetic_line(rng, args.functions) for _ in range(args.lines)]
+    nodes = sum(len(json.loads(line)) for line in lines)
+
+    dict_bytes = traced_size(json.loads, lines)
+    flat_bytes = traced_size(lambda line: FlatTree.from_nodes(json.loads(line)), lines)
+
+    trees = [FlatTree.from_nodes(json.loads(line)) for line in lines]
+    start = time.perf_counter()
+    for tree in trees:
+        collect_flat_metadata(tree, 0, include_raw=False)
+    walk_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "lines": args.lines,
+        "nodes": nodes,
+        "dict_bytes_per_node": round(dict_bytes / nodes, 1),
+        "flat_bytes_per_node": round(flat_bytes / nodes, 1),
+        "memory_ratio": round(dict_bytes / flat_bytes, 2) if flat_bytes else None,
+        "flat_metadata_nodes_per_sec": round(nodes / walk_seconds, 1) if walk_seconds else None
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_insert.py
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from db.database import create_database, finish_bulk_load
+from db.inserter import insert_unit, insert_units
+
+def synthetic_units(count: int):
+    """
+    Yields CoreUnit-shaped dicts with realistic field sizes.
+    """
+    for i in range(count):
+        stem = f"word{i}"
+        yield {
+            "id": f"{stem.upper()}_N_CORE",
+            "stem": stem,
+            "concept": f"concept{i % 500}",
+            "pos": ["noun", "verb"],
+            "main_pos": "noun",
+            "definition_set": [
+                {"definition": f"a synthetic definition number {i}", "example": "", "source": "wordnet"}
+            ] * 3,
+            "related": [f"rel{i % 97}", f"rel{i % 89}"],
+            "source": "wordnet",
+            "last_updated": "2024-01-01T00:00:00"
+        }
+
+def time_row_by_row(path: str, count: int) -> float:
+    conn = create_database(db_path=path)
+    start = time.perf_counter()
+    for unit in synthetic_units(count):
+        insert_unit(conn, unit, commit=False)
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+def time_bulk(path: str, count: int, batch_size: int) -> float:
+    conn = create_database(db_path=path, bulk_load=True, defer_indexes=True)
+    start = time.perf_counter()
+    insert_units(conn, synthetic_units(count), batch_size=batch_size)
+    finish_bulk_load(conn)
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark core_units insert paths")
+    parser.add_argument('--units', type=int, help='Number of synthetic units', default=100_000)
+    parser.add_argument('--batch-size', type=int, help='insert_units batch size', default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        row_by_row = time_row_by_row(os.path.join(tmp, "row.db"), args.units)
+        bulk = time_bulk(os.path.join(tmp, "bulk.db"), args.units, args.batch_size)
+
+    per_100k = 100_000 / args.units
+    print(json.dumps({
+        "units": args.units,
+        "insert_unit_sec_per_100k": round(row_by_row * per_100k, 3),
+        "insert_units_bulk_sec_per_100k": round(bulk * per_100k, 3),
+        "speedup": round(row_by_row / bulk, 2) if bulk else None
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
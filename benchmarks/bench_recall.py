@@ -0,0 +1,107 @@
+# benchmarks/bench_recall.py
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_insert import synthetic_units
+from core.recall import RecallEngine
+from db.database import create_database, finish_bulk_load
+from db.inserter import insert_units
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+def word(i: int) -> str:
+    """
+    Letters-only name of unit i ("baa", "bab", ...): the query tokenizer drops digits.
+    """
+    name = ""
+    while True:
+        i, r = divmod(i, 26)
+        name = LETTERS[r] + name
+        if not i:
+            return "b" + name
+
+def recall_units(count: int):
+    for i, unit in enumerate(synthetic_units(count)):
+        stem = word(i)
+        unit["id"] = f"{stem.upper()}_N_CORE"
+        unit["stem"] = stem
+        unit["concept"] = f"concept {word(i % 500)}"
+        yield unit
+
+def make_queries(count: int, units: int, seed: int = 0):
+    """
+    A mix of term lists, code snippets and concept queries over random units.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for n in range(count):
+        a, b, c = (word(rng.randrange(units)) for _ in range(3))
+        kind = n % 3
+        if kind == 0:
+            queries.append([a, b])
+        elif kind == 1:
+            queries.append(f"def {a}_{b}(self, {c}):\n    return self.{a}.get({c})\n")
+        else:
+            queries.append(f"concept {word(rng.randrange(500))}")
+    return queries
+
+def time_queries(engine: RecallEngine, queries, k: int):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        engine.recall(query, k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 3),
+        "max_ms": round(latencies[-1], 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RecallEngine query latency")
+    parser.add_argument('--units', type=int, help='Number of synthetic units', default=1_000_000)
+    parser.add_argument('--queries', type=int, help='Queries per pass', default=3000)
+    parser.add_argument('--k', type=int, help='Units returned per query', default=10)
+    parser.add_argument('--working-set', type=int, help='Working set size', default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recall.db")
+        conn = create_database(db_path=path, bulk_load=True, defer_indexes=True)
+        start = time.perf_counter()
+        insert_units(conn, recall_units(args.units))
+        finish_bulk_load(conn)
+        build = time.perf_counter() - start
+
+        engine = RecallEngine(conn, working_set_size=args.working_set)
+        queries = make_queries(args.queries, args.units)
+        cold = time_queries(engine, queries, args.k)
+        # Same queries again: recalled units are now hot and activated
+        warm = time_queries(engine, queries, args.k)
+        start = time.perf_counter()
+        engine.close()
+        flush = time.perf_counter() - start
+        stats = dict(engine.stats)
+        conn.close()
+
+    print(json.dumps({
+        "units": args.units,
+        "queries": args.queries,
+        "k": args.k,
+        "build_sec": round(build, 2),
+        "cold_pass": cold,
+        "warm_pass": warm,
+        "final_flush_sec": round(flush, 3),
+        "stats": stats
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
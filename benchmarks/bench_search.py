@@ -0,0 +1,74 @@
+# benchmarks/bench_search.py
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_recall import word
+from benchmarks.bench_insert import synthetic_units
+from db.database import create_database, finish_bulk_load
+from db.inserter import insert_units
+from db.search import search_units
+
+def search_units_corpus(count: int):
+    """
+    Synthetic units whose definitions mix a few words from a vocabulary of
+    5000, so queries match a realistic share of the lexicon.
+    """
+    rng = random.Random(0)
+    for unit in synthetic_units(count):
+        words = [word(rng.randrange(5000)) for _ in range(8)]
+        unit["definition_set"] = [{"definition": " ".join(words), "example": " ".join(words[:3]), "source": "wordnet"}]
+        yield unit
+
+def time_queries(conn, queries, limit: int, match_all: bool):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search_units(conn, query, limit, match_all=match_all)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 3),
+        "max_ms": round(latencies[-1], 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full-text definition search")
+    parser.add_argument('--units', type=int, help='Number of synthetic units', default=150_000)
+    parser.add_argument('--queries', type=int, help='Queries per pass', default=2000)
+    parser.add_argument('--limit', type=int, help='Results per query', default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    queries = [" ".join(word(rng.randrange(5000)) for _ in range(rng.randint(1, 3))) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search.db")
+        conn = create_database(db_path=path, bulk_load=True, defer_indexes=True)
+        start = time.perf_counter()
+        insert_units(conn, search_units_corpus(args.units))
+        finish_bulk_load(conn)
+        build = time.perf_counter() - start
+
+        all_words = time_queries(conn, queries, args.limit, match_all=True)
+        any_word = time_queries(conn, queries, args.limit, match_all=False)
+        conn.close()
+
+    print(json.dumps({
+        "units": args.units,
+        "queries": args.queries,
+        "limit": args.limit,
+        "build_sec": round(build, 2),
+        "all_words": all_words,
+        "any_word": any_word
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_similarity.py
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+
+from core.similarity import SimilarityIndex
+
+def synthetic_vocabulary(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(size)]
+
+def synthetic_texts(count: int, vocabulary, seed: int = 1):
+    """
+    Concept plus three definitions of 8-14 words, drawn with a Zipf-like skew
+    like real definitions (a few words are very common).
+    """
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    for _ in range(count):
+        words = rng.choices(vocabulary, weights, k=rng.randint(24, 42))
+        yield " ".join(words[:2] * 2 + words)
+
+def latencies_ms(calls):
+    timings = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95)], 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SimilarityIndex build and top-k queries")
+    parser.add_argument('--units', type=int, help='Number of synthetic units', default=150_000)
+    parser.add_argument('--vocabulary', type=int, help='Distinct words in definitions', default=30_000)
+    parser.add_argument('--queries', type=int, help='Queries per measurement', default=500)
+    parser.add_argument('--batch', type=int, help='Queries per batched call', default=64)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    vocabulary = synthetic_vocabulary(args.vocabulary)
+    texts = list(synthetic_texts(args.units, vocabulary))
+    ids = [f"UNIT{i}_N_CORE" for i in range(args.units)]
+
+    start = time.perf_counter()
+    index = SimilarityIndex(compact_rows=args.units + 1)
+    for lo in range(0, args.units, 5000):
+        index.add(ids[lo:lo + 5000], texts[lo:lo + 5000])
+    index.compact()
+    build = time.perf_counter() - start
+
+    rng = random.Random(2)
+    query_texts = [" ".join(rng.sample(vocabulary[:5000], 4)) for _ in range(args.queries)]
+    query_ids = [rng.choice(ids) for _ in range(args.queries)]
+    single_text = latencies_ms([lambda q=q: index.query([q], args.k) for q in query_texts])
+    single_unit = latencies_ms([lambda u=u: index.neighbours([u], args.k) for u in query_ids])
+
+    start = time.perf_counter()
+    for lo in range(0, args.queries, args.batch):
+        index.neighbours(query_ids[lo:lo + args.batch], args.k)
+    batched_per_query = (time.perf_counter() - start) * 1000 / args.queries
+
+    # Incremental additions stay queryable before compaction
+    new_texts = list(synthetic_texts(1000, vocabulary, seed=3))
+    start = time.perf_counter()
+    index.add([f"NEW{i}_N_CORE" for i in range(1000)], new_texts)
+    add = time.perf_counter() - start
+    with_pending = latencies_ms([lambda u=u: index.neighbours([u], args.k) for u in query_ids[:100]])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        index.save(tmp)
+        save = time.perf_counter() - start
+        start = time.perf_counter()
+        SimilarityIndex.load(tmp)
+        load = time.perf_counter() - start
+
+    print(json.dumps({
+        "units": args.units,
+        "nnz": int(index.vectors.nnz),
+        "build_sec": round(build, 2),
+        "text_query": single_text,
+        "unit_query": single_unit,
+        "batched_unit_query_ms_per_query": round(batched_per_query, 3),
+        "add_1000_sec": round(add, 3),
+        "unit_query_with_1000_pending": with_pending,
+        "save_sec": round(save, 2),
+        "load_sec": round(load, 2)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_startup.py
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Command-line entry points, run with --help
+ENTRY_POINTS = {
+    "main": ["main.py"],
+    "extractor": ["-m", "SmartCodeLex.builder.smartcodelex_extractor"],
+    "prompt_exporter": ["-m", "SmartCodeLex.builder.smartcodelex_prompt_exporter"],
+    "example_linker": ["-m", "SmartCodeLex.builder.example_linker"],
+    "build_corpus": ["-m", "SmartCodeLex.languages.python.build_corpus"],
+    "lexicon_snapshot": ["-m", "core.lexicon_snapshot"]
+}
+
+# Modules a --help run should not load
+HEAVY_MODULES = ["numpy", "scipy", "sklearn", "nltk", "tqdm", "openai", "asyncio", "multiprocessing"]
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """
+    (module, cumulative microseconds) for each top-level import in -X importtime output.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented under the module that triggered them
+        if not name.startswith("  "):
+            imports.append((name.strip(), int(cumulative)))
+    return imports
+
+def loaded_modules(stderr: str) -> set:
+    return {line.rsplit("|", 1)[1].strip() for line in stderr.splitlines()
+            if line.startswith("import time:") and "cumulative" not in line}
+
+def time_entry_point(args: List[str], repeat: int, top: int) -> Dict:
+    walls, stderr = [], ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", *args, "--help"],
+                              cwd=ROOT, capture_output=True, text=True)
+        walls.append(time.perf_counter() - start)
+        stderr = proc.stderr
+    imports = sorted(parse_importtime(stderr), key=lambda item: item[1], reverse=True)
+    modules = loaded_modules(stderr)
+    return {
+        "returncode": proc.returncode,
+        "wall_min_ms": round(min(walls) * 1000, 1),
+        "wall_median_ms": round(statistics.median(walls) * 1000, 1),
+        "import_ms": round(sum(us for _, us in imports) / 1000, 1),
+        "top_imports_ms": {name: round(us / 1000, 1) for name, us in imports[:top]},
+        "heavy_modules": [name for name in HEAVY_MODULES if name in modules]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark command-line startup with -X importtime")
+    parser.add_argument('--entry', choices=sorted(ENTRY_POINTS), action='append', help='Entry points to run (default: all)')
+    parser.add_argument('--repeat', type=int, help='Runs per entry point', default=5)
+    parser.add_argument('--top', type=int, help='Slowest top-level imports reported', default=8)
+    args = parser.parse_args()
+
+    results = {name: time_entry_point(ENTRY_POINTS[name], args.repeat, args.top)
+               for name in (args.entry or ENTRY_POINTS)}
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# benchmarks/suite.py
+# Run from the repository root: python -m benchmarks.suite [--baseline results/old.json]
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks import synthetic
+from core.cleaner import clean_word
+from core.core_builder import build_core_unit
+from core.lookup import clear_caches, get_provider, set_provider
+from db.database import create_database
+from db.inserter import insert_unit
+from SmartCodeLex.builder.example_linker import extract_metadata
+from SmartCodeLex.builder.smartcodelex_prompt_exporter import export_prompts
+
+RESULTS_DIR = "benchmarks/results"
+TOLERANCE = 0.2   # relative slowdown (or memory growth) reported as a regression
+
+# Items per stage at --scale 1
+BASE_SIZES = {
+    "clean_word": 200_000,
+    "build_core_unit": 5_000,
+    "insert_unit": 20_000,
+    "extract_terms_examples_docstrings": 100,
+    "extract_metadata": 10_000,
+    "match_examples": 2_000,
+    "export_prompts": 50_000
+}
+
+# =================== Stages ===================
+# Each stage prepares its input and returns (items, run); only run() is measured.
+Stage = Callable[[int, int, str], Tuple[int, Callable[[], None]]]
+
+def stage_clean_word(size: int, seed: int, tmp: str):
+    words = synthetic.word_list(size, seed)
+
+    def run():
+        for word in words:
+            clean_word(word)
+    return len(words), run
+
+def stage_build_core_unit(size: int, seed: int, tmp: str):
+    words = [(raw, clean_word(raw)) for raw in synthetic.word_list(size, seed)]
+    words = [(raw, cleaned) for raw, cleaned in words if cleaned]
+
+    def run():
+        clear_caches()
+        for raw, cleaned in words:
+            build_core_unit(raw, cleaned)
+    return len(words), run
+
+def stage_insert_unit(size: int, seed: int, tmp: str):
+    units = synthetic.core_units(size)
+    path = os.path.join(tmp, f"insert_{time.perf_counter_ns()}.db")
+
+    def run():
+        conn = create_database(db_path=path)
+        for unit in units:
+            insert_unit(conn, unit, commit=False)
+        conn.commit()
+        conn.close()
+    return len(units), run
+
+def stage_extract_terms(size: int, seed: int, tmp: str):
+    # Imported here, so stages not using the extractor run without its dependencies
+    from SmartCodeLex.builder.smartcodelex_extractor import extract_lines
+
+    lines = synthetic.py150_lines(size, seed=seed)
+
+    def run():
+        values, examples, docstrings = set(), {}, {}
+        extract_lines(lines, values, examples, docstrings, include_raw=True)
+    return len(lines), run
+
+def stage_extract_metadata(size: int, seed: int, tmp: str):
+    examples = synthetic.functions(size, seed)
+
+    def run():
+        for example in examples:
+            extract_metadata(example, include_raw=False)
+    return len(examples), run
+
+def stage_match_examples(size: int, seed: int, tmp: str):
+    # ExampleIndex needs numpy; imported here, so the other stages run without it
+    from SmartCodeLex.builder.example_index import ExampleIndex
+    from SmartCodeLex.builder.smartcodelex_extractor import match_examples
+
+    bank = synthetic.example_bank(size * 5, seed)
+    terms = synthetic.bank_terms(size, seed)
+
+    def run():
+        index = ExampleIndex(bank)
+        for term in terms:
+            match_examples(term, index)
+    return len(terms), run
+
+def stage_export_prompts(size: int, seed: int, tmp: str):
+    db_path = synthetic.prompt_db(os.path.join(tmp, "prompts.db"), size, seed)
+    output = os.path.join(tmp, "prompts", "prompts.txt")
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            export_prompts(db_path, output)
+    return size, run
+
+STAGES: Dict[str, Stage] = {
+    "clean_word": stage_clean_word,
+    "build_core_unit": stage_build_core_unit,
+    "insert_unit": stage_insert_unit,
+    "extract_terms_examples_docstrings": stage_extract_terms,
+    "extract_metadata": stage_extract_metadata,
+    "match_examples": stage_match_examples,
+    "export_prompts": stage_export_prompts
+}
+
+# =================== Measurement ===================
+def measure(stage: Stage, size: int, seed: int, tmp: str) -> Dict[str, float]:
+    """
+    Times one run of the stage, then runs it again on fresh input under
+    tracemalloc for the peak of Python allocations (timings would be skewed
+    by tracing, so the two are separate runs).
+    """
+    items, run = stage(size, seed, tmp)
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+
+    _, run = stage(size, seed, tmp)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "items": items,
+        "seconds": round(seconds, 4),
+        "items_per_sec": round(items / seconds, 1) if seconds else None,
+        "peak_mb": round(peak / 2 ** 20, 2)
+    }
+
+def compare(results: Dict, baseline: Dict, tolerance: float = TOLERANCE) -> List[Dict]:
+    """
+    Regressions of results against a baseline run: stages whose throughput
+    dropped, or whose peak memory grew, by more than tolerance.
+    """
+    regressions = []
+    for name, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(name)
+        if not previous:
+            continue
+        before, after = previous.get("items_per_sec"), current.get("items_per_sec")
+        if before and after and after < before * (1 - tolerance):
+            regressions.append({"stage": name, "metric": "items_per_sec", "baseline": before, "current": after,
+                                "change": round(after / before - 1, 3)})
+        before, after = previous.get("peak_mb"), current.get("peak_mb")
+        if before and after and after > before * (1 + tolerance):
+            regressions.append({"stage": name, "metric": "peak_mb", "baseline": before, "current": after,
+                                "change": round(after / before - 1, 3)})
+    return regressions
+
+def run_suite(stages: List[str], scale: float = 1.0, seed: int = 0, provider: str = "stub") -> Dict:
+    set_provider(provider)
+    results = {
+        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "provider": provider,
+        "scale": scale,
+        "seed": seed,
+        "stages": {}
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in stages:
+            size = max(1, int(BASE_SIZES[name] * scale))
+            results["stages"][name] = measure(STAGES[name], size, seed, tmp)
+            print(f"{name}: {results['stages'][name]}", file=sys.stderr)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on reproducible synthetic inputs")
+    parser.add_argument('--stages', type=str, nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--scale', type=float, help='Multiplier of the default input sizes', default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--provider', type=str, choices=["stub", "wordnet"], default="stub",
+                        help='Lexicon used by build_core_unit (wordnet needs the NLTK data)')
+    parser.add_argument('--output', type=str, help='Results file (default: benchmarks/results/suite_<time>.json)')
+    parser.add_argument('--baseline', type=str, help='Earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Relative change flagged as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 if a regression is flagged')
+    args = parser.parse_args()
+
+    if args.provider == "wordnet" and "build_core_unit" in args.stages:
+        try:
+            set_provider("wordnet")
+            get_provider().ensure_loaded()
+        except LookupError as e:
+            parser.error(f"WordNet is not available (use --provider stub): {e}")
+
+    results = run_suite(args.stages, args.scale, args.seed, args.provider)
+
+    regressions: Optional[List[Dict]] = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        for key in ("scale", "provider"):
+            if baseline.get(key) != results[key]:
+                print(f"⚠️ Baseline {key} is {baseline.get(key)!r}, this run's is {results[key]!r}: "
+                      f"throughputs are not comparable", file=sys.stderr)
+        results["baseline"] = args.baseline
+        results["regressions"] = regressions = compare(results, baseline, args.tolerance)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite_{datetime.datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+    print(f"Results saved to {output}", file=sys.stderr)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/synthetic.py
+
+import json
+import os
+import random
+import sqlite3
+from typing import Any, Dict, List
+
+from benchmarks.bench_insert import synthetic_units
+from tests.legacy import SYLLABLES, bank_terms, example_bank, flatten, synthetic_function
+
+NOISE = ["", "", "", "-", "_", " ", "!", "1", "É"]
+
+def word_list(count: int, seed: int = 0) -> List[str]:
+    """
+    Raw words as found in the lexical core lists: mostly lowercase words of
+    2-5 syllables, some with capitals, digits, symbols or accents, and
+    about 10% repeats.
+    """
+    rng = random.Random(seed)
+    words = []
+    for _ in range(count):
+        if words and rng.random() < 0.1:
+            words.append(rng.choice(words))
+            continue
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+        if rng.random() < 0.1:
+            word = word.capitalize()
+        if rng.random() < 0.2:
+            cut = rng.randrange(1, len(word))
+            word = word[:cut] + rng.choice(NOISE) + word[cut:]
+        words.append(word)
+    return words
+
+def functions(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Nested-dict FunctionDef examples, as the extractor keeps them.
+    """
+    rng = random.Random(seed)
+    return [synthetic_function(rng, i) for i in range(count)]
+
+def py150_lines(count: int, functions_per_line: int = 20, seed: int = 0, flat: bool = True) -> List[str]:
+    """
+    JSONL lines of synthetic modules: py150's flat node lists, or nested
+    dicts with flat=False.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        module = {"type": "Module", "children": [synthetic_function(rng, i) for i in range(functions_per_line)]}
+        lines.append(json.dumps(flatten(module) if flat else module))
+    return lines
+
+def write_jsonl(path: str, lines: List[str]) -> str:
+    with open(path, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line + "\n")
+    return path
+
+def core_units(count: int) -> List[Dict[str, Any]]:
+    return list(synthetic_units(count))
+
+def prompt_db(path: str, units: int, seed: int = 0) -> str:
+    """
+    A SmartCodeLex database (core_units with example IDs, and examples), as
+    read by the prompt exporter.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE core_units (id TEXT PRIMARY KEY, term TEXT, concept TEXT, definition TEXT, example_ids TEXT)")
+    conn.execute("CREATE TABLE examples (id TEXT PRIMARY KEY, content TEXT)")
+    conn.executemany("INSERT INTO core_units VALUES (?, ?, ?, ?, ?)", (
+        (f"C{i:07}", f"term_{i}", f"concept {i % 997}", rng.choice(["", "A synthetic definition of the term."]),
+         json.dumps([f"E{rng.randrange(units):07}" for _ in range(rng.randint(0, 5))]))
+        for i in range(units)
+    ))
+    conn.executemany("INSERT INTO examples VALUES (?, ?)", (
+        (f"E{i:07}", f"def example_{i}(x):\n    return call_{i % 31}(x)" + " " * rng.randint(0, 200))
+        for i in range(units)
+    ))
+    conn.commit()
+    conn.close()
+    return path
@@ -1,25 +1,7 @@
 # core/cleaner.py
 
-import re
-from typing import Optional
-
-def clean_word(word: str) -> Optional[str]:
-    """
-    Cleans the word from symbols and non-alphabetic elements, preserving spaces.
-
-    - Converts to lowercase
-    - Replaces "_" and "-" with spaces
-    - Removes numbers and symbols
-    - Preserves spaces
-    - Returns None if the word becomes empty
-    """
-    if not isinstance(word, str):
-        return None
-
-    word = word.replace("_", " ").replace("-", " ").lower()
-    word = re.sub(r'[^a-z\s]', '', word)  # Remove numbers as well
-    word = re.sub(r'\s+', ' ', word).strip()
-    return word if word else None
+# The implementation lives in core/normalizer.py, shared with SmartCodeLex
+from core.normalizer import clean_word, clean_words
 
 # Direct test
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
+import json
 import re
-from typing import List
+from typing import Dict, Iterable, List, Optional, Sequence
 
 NON_CONCEPTS = {
     "a", "an", "the", "to", "of", "in", "on", "by", "at", "any", "one",
@@ -12,29 +13,140 @@ PRIORITY_KEYWORDS = {
     "tool", "device", "substance", "feature", "signal", "material", "system"
 }
 
-def extract_concept(definitions: List[str], compound: bool = True) -> str:
+# Words of a definition (same tokens as re.findall(r'\b\w+\b', ...))
+_TOKEN_RE = re.compile(r"\w+")
+_findall_tokens = _TOKEN_RE.findall
+_MISSING = object()
+
+# Definitions of a word considered for its concept
+MAX_DEFINITIONS = 3
+# Definitions whose concept is cached per extractor
+CACHE_SIZE = 200_000
+
+class ConceptExtractor:
     """
-    Extract the concept from the first 3 definitions.
-    Gives priority to strong indicative keywords.
-    Supports compound concepts if enabled.
+    Concept extraction with its keyword sets loaded once. Each definition is
+    lowercased and split once (whitespace split, with the regex tokenizer only
+    for pieces that hold punctuation), a single set test tells whether any
+    priority keyword occurs, and the concept a definition gives is cached:
+    WordNet shares a synset's definition between all its lemmas.
+
+    Parameters:
+        non_concepts (iterable): Words never taken as a concept.
+        priority_keywords (iterable): Strong indicative words, returned as
+            the concept as soon as a definition contains one.
+        cache_size (int): Definitions remembered before the cache is emptied.
     """
-    if not definitions:
+    def __init__(self, non_concepts: Iterable[str] = NON_CONCEPTS,
+                 priority_keywords: Iterable[str] = PRIORITY_KEYWORDS, cache_size: int = CACHE_SIZE):
+        self.non_concepts = frozenset(w.lower() for w in non_concepts)
+        # A keyword that is also a non-concept is filtered out before it can match
+        self.priority_keywords = frozenset(w.lower() for w in priority_keywords) - self.non_concepts
+        self.cache_size = cache_size
+        # compound flag -> {definition: concept, or None if it has no concept word}
+        self._cache: Dict[bool, Dict[str, Optional[str]]] = {True: {}, False: {}}
+
+    @classmethod
+    def from_file(cls, path: str) -> "ConceptExtractor":
+        """
+        Loads the keyword sets from a JSON file with "non_concepts" and/or
+        "priority_keywords" lists; a missing list keeps the default set.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config.get("non_concepts", NON_CONCEPTS), config.get("priority_keywords", PRIORITY_KEYWORDS))
+
+    def definition_concept(self, definition: str, compound: bool = True) -> Optional[str]:
+        """
+        Concept of a single definition, or None if all its words are non-concepts.
+        """
+        cache = self._cache[compound]
+        concept = cache.get(definition, _MISSING)
+        if concept is not _MISSING:
+            return concept
+
+        tokens = []
+        for piece in definition.lower().split():
+            # Same tokens as _TOKEN_RE.findall on the whole text: \w is isalnum() or "_"
+            if piece.isalnum():
+                tokens.append(piece)
+            else:
+                tokens.extend(_findall_tokens(piece))
+
+        concept = None
+        if not self.priority_keywords.isdisjoint(tokens):
+            priority = self.priority_keywords
+            concept = next(word for word in tokens if word in priority)
+        else:
+            non_concepts = self.non_concepts
+            for word in tokens:
+                if word in non_concepts:
+                    continue
+                if not compound:
+                    concept = word
+                    break
+                if concept is None:
+                    concept = word
+                else:
+                    concept = f"{concept} {word}"
+                    break
+
+        if len(cache) >= self.cache_size:
+            cache.clear()
+        cache[definition] = concept
+        return concept
+
+    def extract(self, definitions: Sequence[str], compound: bool = True) -> str:
+        """
+        Extract the concept from the first 3 definitions.
+        Gives priority to strong indicative keywords.
+        Supports compound concepts if enabled.
+        """
+        for definition in definitions[:MAX_DEFINITIONS]:
+            concept = self.definition_concept(definition, compound)
+            if concept is not None:
+                return concept
         return "unknown"
 
-    for definition in definitions[:3]:
-        words = re.findall(r'\b\w+\b', definition.lower())
-        filtered = [w for w in words if w not in NON_CONCEPTS]
+    def extract_many(self, definition_lists: Iterable[Sequence[str]], compound: bool = True) -> List[str]:
+        """
+        Batch version of extract: the concept of every definition list, in order.
+        """
+        extract = self.extract
+        return [extract(definitions, compound) for definitions in definition_lists]
 
-        for word in filtered:
-            if word in PRIORITY_KEYWORDS:
-                return word
+_default_extractor: Optional[ConceptExtractor] = None
 
-        if compound and len(filtered) >= 2:
-            return f"{filtered[0]} {filtered[1]}"
-        elif filtered:
-            return filtered[0]
+def get_extractor() -> ConceptExtractor:
+    """
+    The shared extractor with the default keyword sets, compiled on first use.
+    """
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = ConceptExtractor()
+    return _default_extractor
+
+def set_extractor(extractor: Optional[ConceptExtractor]):
+    """
+    Replaces the shared extractor (e.g. with ConceptExtractor.from_file);
+    None restores the default keyword sets.
+    """
+    global _default_extractor
+    _default_extractor = extractor
 
-    return "unknown"
+def extract_concept(definitions: List[str], compound: bool = True) -> str:
+    """
+    Extract the concept from the first 3 definitions.
+    Gives priority to strong indicative keywords.
+    Supports compound concepts if enabled.
+    """
+    return get_extractor().extract(definitions, compound)
+
+def extract_concepts(definition_lists: Iterable[Sequence[str]], compound: bool = True) -> List[str]:
+    """
+    Batch version of extract_concept over the definition lists of many words.
+    """
+    return get_extractor().extract_many(definition_lists, compound)
 
 # Direct test
 if __name__ == "__main__":
@@ -1,12 +1,14 @@
 # core/core_builder.py
 
 import datetime
-from nltk.corpus import wordnet as wn
-from typing import Optional
+from typing import Optional, Sequence
 
-from core.cleaner import clean_word
+from core.cleaner import clean_words
+from core.lookup import get_synsets
 from core.pos_utils import extract_stem, get_dominant_wordnet_pos
 from core.concept_extractor import extract_concept
+from core.core_unit import CoreUnit, Definition
+from core.metrics import timer
 
 POS_MAP = {
     "n": "noun",
@@ -16,7 +18,46 @@ POS_MAP = {
     "r": "adverb"
 }
 
-def build_core_unit(raw_word: str, cleaned_word: str, timestamp: Optional[str] = None) -> Optional[dict]:
+# Timestamp of every unit built in this run (see run_timestamp)
+_run_timestamp: Optional[str] = None
+
+def run_timestamp() -> str:
+    """
+    The last_updated value shared by the units of a run: taken once, so units
+    do not each hold their own timestamp string.
+    """
+    global _run_timestamp
+    if _run_timestamp is None:
+        _run_timestamp = datetime.datetime.utcnow().isoformat()
+    return _run_timestamp
+
+def set_run_timestamp(timestamp: Optional[str]):
+    """
+    Sets (or with None, resets) the run timestamp, e.g. in worker processes
+    so that they stamp units like the parent.
+    """
+    global _run_timestamp
+    _run_timestamp = timestamp
+
+def make_unit_id(stem: str, pos: str) -> str:
+    return f"{stem.upper()}_{pos.upper()}_CORE"
+
+def unit_key(cleaned_word: str, synsets: Optional[Sequence] = None) -> Optional[str]:
+    """
+    Computes the ID (<STEM>_<POS>_CORE) that build_core_unit would give the word,
+    using only the synset lookup and lemmatization, so duplicates can be
+    detected before the full build.
+
+    Returns None if the word has no synsets.
+    """
+    if synsets is None:
+        synsets = get_synsets(cleaned_word)
+    if not synsets:
+        return None
+    best_pos = get_dominant_wordnet_pos(cleaned_word, synsets)
+    return make_unit_id(extract_stem(cleaned_word, best_pos), best_pos)
+
+def build_core_unit(raw_word: str, cleaned_word: str, timestamp: Optional[str] = None) -> Optional[CoreUnit]:
     """
     Converts the word into a smart CoreUnit containing:
     - The stem of the word
@@ -25,9 +66,11 @@ def build_core_unit(raw_word: str, cleaned_word: str, timestamp: Optional[str] =
     - Brief definitions
     - Semantically related words
 
+    The unit is stamped with timestamp, or the run timestamp by default.
     Returns None if insufficient information is extracted.
     """
-    synsets = wn.synsets(cleaned_word)
+    with timer("build.synsets"):
+        synsets = get_synsets(cleaned_word)
     if not synsets:
         return None
 
@@ -36,40 +79,38 @@ def build_core_unit(raw_word: str, cleaned_word: str, timestamp: Optional[str] =
     related_words = set()
 
     for syn in synsets:
-        defn = syn.definition()
-        exs = syn.examples()
-        pos = POS_MAP.get(syn.pos(), syn.pos())
-        pos_tags.append(pos)
-        definition_set.append({
-            "definition": defn,
-            "example": exs[0] if exs else "",
-            "source": "wordnet"
-        })
-
-        for lemma in syn.lemmas():
-            lemma_clean = clean_word(lemma.name())
-            if lemma_clean:
-                stemmed = extract_stem(lemma_clean)
-                if stemmed:
-                    related_words.add(stemmed)
-
-    if not definition_set or all(d["definition"].strip() == "" for d in definition_set):
+        with timer("build.definitions"):
+            defn = syn.definition()
+            exs = syn.examples()
+            pos = POS_MAP.get(syn.pos(), syn.pos())
+            pos_tags.append(pos)
+            definition_set.append(Definition(defn, exs[0] if exs else "", "wordnet"))
+
+        with timer("build.related_lemmas"):
+            for lemma_clean in clean_words([lemma.name() for lemma in syn.lemmas()]):
+                if lemma_clean:
+                    stemmed = extract_stem(lemma_clean)
+                    if stemmed:
+                        related_words.add(stemmed)
+
+    if not definition_set or all(d.definition.strip() == "" for d in definition_set):
         return None
 
-    concept = extract_concept([d["definition"] for d in definition_set])
-    best_pos = get_dominant_wordnet_pos(cleaned_word)
-    stem = extract_stem(cleaned_word, best_pos)
-    pos_code = best_pos.upper()
-    unit_id = f"{stem.upper()}_{pos_code}_CORE"
-
-    return {
-        "id": unit_id,
-        "stem": stem,
-        "concept": concept,
-        "pos": sorted(set(pos_tags)),
-        "main_pos": POS_MAP.get(best_pos, best_pos),
-        "definition_set": definition_set[:3],
-        "related": sorted(list(related_words))[:5],
-        "source": "wordnet",
-        "last_updated": timestamp or datetime.datetime.utcnow().isoformat()
-    }
+    with timer("build.concept"):
+        concept = extract_concept([d.definition for d in definition_set])
+    with timer("build.stem"):
+        best_pos = get_dominant_wordnet_pos(cleaned_word, synsets)
+        stem = extract_stem(cleaned_word, best_pos)
+    unit_id = make_unit_id(stem, best_pos)
+
+    return CoreUnit(
+        unit_id,
+        stem,
+        concept,
+        sorted(set(pos_tags)),
+        POS_MAP.get(best_pos, best_pos),
+        definition_set[:3],
+        sorted(related_words)[:5],
+        "wordnet",
+        timestamp or run_timestamp()
+    )
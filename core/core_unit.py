@@ -0,0 +1,162 @@
+# core/core_unit.py
+
+import json
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+class _SlotMapping(Mapping):
+    """
+    Read-only dict view over the slots of a compact record: unit["stem"],
+    unit.get("pos"), dict(unit) and iteration work as on the dicts these
+    records replace. Subclasses list their fields in __slots__.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __contains__(self, key) -> bool:
+        return key in self.__slots__
+
+    def __eq__(self, other) -> bool:
+        # Compared in their JSON form, so tuples equal the lists of a CoreUnit dict
+        if isinstance(other, _SlotMapping):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+class Definition(_SlotMapping):
+    """
+    One entry of a unit's definition_set.
+    """
+    __slots__ = ("definition", "example", "source")
+
+    def __init__(self, definition: str, example: str = "", source: str = "wordnet"):
+        self.definition = definition
+        self.example = example
+        self.source = sys.intern(source)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"definition": self.definition, "example": self.example, "source": self.source}
+
+class CoreUnit(_SlotMapping):
+    """
+    Compact CoreUnit built by core_builder: slots instead of a per-unit dict,
+    tuples instead of lists, interned POS and source strings, and the run's
+    shared timestamp string. Reads like the CoreUnit dict (see _SlotMapping);
+    to_row() and to_dict() give the core_units row and the JSON form.
+    """
+    __slots__ = ("id", "stem", "concept", "pos", "main_pos", "definition_set", "related", "source", "last_updated")
+
+    def __init__(self, id: str, stem: str, concept: str, pos: Iterable[str], main_pos: str,
+                 definition_set: Iterable[Definition], related: Iterable[str], source: str, last_updated: str):
+        self.id = id
+        self.stem = stem
+        self.concept = concept
+        self.pos = tuple(sys.intern(p) for p in pos)
+        self.main_pos = sys.intern(main_pos)
+        self.definition_set = tuple(definition_set)
+        self.related = tuple(related)
+        self.source = sys.intern(source)
+        self.last_updated = last_updated
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The CoreUnit dict, as written to the processed log.
+        """
+        return {
+            "id": self.id,
+            "stem": self.stem,
+            "concept": self.concept,
+            "pos": list(self.pos),
+            "main_pos": self.main_pos,
+            "definition_set": [d.to_dict() for d in self.definition_set],
+            "related": list(self.related),
+            "source": self.source,
+            "last_updated": self.last_updated
+        }
+
+    def to_row(self) -> Tuple:
+        """
+        The row tuple of the core_units table (same values as db.inserter.unit_to_row on the dict).
+        """
+        return (
+            self.id,
+            self.stem,
+            self.concept,
+            json.dumps(self.pos),
+            self.main_pos,
+            json.dumps([d.to_dict() for d in self.definition_set]),
+            json.dumps(self.related),
+            self.source,
+            self.last_updated
+        )
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+def json_default(obj: Any) -> Any:
+    """
+    json.dumps default= hook for CoreUnit and Definition values nested in other data.
+    """
+    if isinstance(obj, (CoreUnit, Definition)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+# Direct test
+if __name__ == "__main__":
+    import datetime
+    import pickle
+    import tracemalloc
+
+    def as_dict(i):
+        return {
+            "id": f"WORD{i}_N_CORE", "stem": f"word{i}", "concept": "thing", "pos": ["noun", "verb"],
+            "main_pos": "noun",
+            "definition_set": [{"definition": "a thing", "example": "", "source": "wordnet"} for _ in range(3)],
+            "related": ["rel", "other"], "source": "wordnet",
+            "last_updated": datetime.datetime.utcnow().isoformat()
+        }
+
+    def as_unit(i, stamp="2024-01-01T00:00:00.000000"):
+        return CoreUnit(f"WORD{i}_N_CORE", f"word{i}", "thing", ("noun", "verb"), "noun",
+                        [Definition("a thing", "", "wordnet") for _ in range(3)], ("rel", "other"), "wordnet", stamp)
+
+    unit = as_unit(1)
+    assert unit == dict(as_dict(1), last_updated=unit.last_updated) and dict(unit)["pos"] == ("noun", "verb")
+    assert pickle.loads(pickle.dumps(unit)) == unit
+    print(unit.to_json()[:120])
+
+    for name, make in [("dict", as_dict), ("CoreUnit", as_unit)]:
+        tracemalloc.start()
+        units = [make(i) for i in range(100_000)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name}: {size / len(units):.0f} bytes per unit")
+        del units
@@ -0,0 +1,420 @@
+# core/lexicon_snapshot.py
+# Export once (needs NLTK and its WordNet data): python -m core.lexicon_snapshot --export
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.lookup import SNAPSHOT_PATH, LexiconProvider
+
+DEFAULT_SNAPSHOT_PATH = SNAPSHOT_PATH
+
+MAGIC = b"WNSNAP01"
+# Sections of the file, in order; the header holds (offset, length) of each
+SECTIONS = ("meta", "key_offsets", "keys", "slots", "pos_flags", "pos_bounds", "synset_ids", "synset_offsets", "synsets")
+HEADER = struct.Struct(f"<8s{2 * len(SECTIONS)}Q")
+
+# POS groups stored for every lemma, in this order (synsets() asks for n, v, a, r)
+POS_ORDER = ("n", "v", "a", "r", "s")
+POS_LIST = ("n", "v", "a", "r")
+_POS_BITS = {pos: 1 << bit for bit, pos in enumerate(POS_ORDER)}
+
+# Separators inside a synset record: fields, and lemma names
+FIELD_SEP = "\x1f"
+LEMMA_SEP = " "
+
+# =================== Synset records ===================
+class SnapshotLemma:
+    __slots__ = ("_name",)
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def name(self) -> str:
+        return self._name
+
+class SnapshotSynset:
+    """
+    The part of a WordNet synset the builder reads: pos(), definition(),
+    examples() (the first example only) and lemmas() with name().
+    """
+    __slots__ = ("_pos", "_definition", "_example", "_lemma_names")
+
+    def __init__(self, pos: str, definition: str, example: str, lemma_names: str):
+        self._pos = pos
+        self._definition = definition
+        self._example = example
+        self._lemma_names = lemma_names
+
+    def pos(self) -> str:
+        return self._pos
+
+    def definition(self) -> str:
+        return self._definition
+
+    def examples(self) -> List[str]:
+        return [self._example] if self._example else []
+
+    def lemmas(self) -> List[SnapshotLemma]:
+        return [SnapshotLemma(name) for name in self._lemma_names.split(LEMMA_SEP)]
+
+    def __repr__(self) -> str:
+        return f"SnapshotSynset({self._pos!r}, {self._definition!r})"
+
+def synset_record(synset) -> str:
+    examples = synset.examples()
+    return FIELD_SEP.join((
+        synset.pos(),
+        synset.definition(),
+        examples[0] if examples else "",
+        LEMMA_SEP.join(lemma.name() for lemma in synset.lemmas())
+    ))
+
+# =================== Export ===================
+def _u32(values) -> bytes:
+    data = array("I", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+def _slot_count(keys: int) -> int:
+    size = 8
+    while size < keys * 2:
+        size <<= 1
+    return size
+
+def key_hash(key: bytes) -> int:
+    return zlib.crc32(key)
+
+def export_snapshot(path: str = DEFAULT_SNAPSHOT_PATH, wordnet=None) -> Dict[str, int]:
+    """
+    Writes the WordNet data used by the core builder into a single
+    memory-mappable file: the synset offsets of every lemma per POS, the
+    pos, definition, first example and lemma names of every synset they
+    point to, and morphy's exception lists and suffix rules.
+
+    Parameters:
+        path (str): Output file.
+        wordnet: NLTK WordNet corpus reader (nltk.corpus.wordnet by default).
+
+    Returns:
+        dict: Number of lemmas and synsets written.
+    """
+    if wordnet is None:
+        from nltk.corpus import wordnet
+    wordnet.ensure_loaded()
+    # The lemma index and exception lists are what wordnet.synsets() and
+    # WordNetLemmatizer read internally; NLTK has no public API for them
+    index = wordnet._lemma_pos_offset_map
+    exceptions = {pos: wordnet._exception_map.get(pos, {}) for pos in POS_ORDER}
+    substitutions = {pos: list(wordnet.MORPHOLOGICAL_SUBSTITUTIONS.get(pos, ())) for pos in POS_ORDER}
+
+    lemmas = sorted(index)
+    encoded = [lemma.encode("utf-8") for lemma in lemmas]
+    synset_ids: Dict[Tuple[str, int], int] = {}
+    records: List[bytes] = []
+    pos_flags, pos_bounds, ids = bytearray(), [], []
+    for lemma in lemmas:
+        by_pos = index[lemma]
+        # A POS can be listed with no synsets (NLTK keeps empty satellite lists)
+        pos_flags.append(sum(1 << bit for bit, pos in enumerate(POS_ORDER) if pos in by_pos))
+        for pos in POS_ORDER:
+            pos_bounds.append(len(ids))
+            for offset in by_pos.get(pos, ()):
+                # Adjectives and satellites share data.adj, where offsets are unique
+                key = ("a" if pos == "s" else pos, offset)
+                sid = synset_ids.get(key)
+                if sid is None:
+                    sid = synset_ids[key] = len(records)
+                    records.append(synset_record(wordnet.synset_from_pos_and_offset(key[0], offset)).encode("utf-8"))
+                ids.append(sid)
+    pos_bounds.append(len(ids))
+
+    slots = [0] * _slot_count(len(encoded))
+    mask = len(slots) - 1
+    for i, key in enumerate(encoded):
+        slot = key_hash(key) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = i + 1
+
+    def offsets(blobs):
+        result, total = [0], 0
+        for blob in blobs:
+            total += len(blob)
+            result.append(total)
+        return result
+
+    meta = {
+        "wordnet_version": str(wordnet.get_version()) if hasattr(wordnet, "get_version") else "",
+        "lemmas": len(lemmas),
+        "synsets": len(records),
+        "exceptions": exceptions,
+        "substitutions": substitutions
+    }
+    sections = {
+        "meta": json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+        "key_offsets": _u32(offsets(encoded)),
+        "keys": b"".join(encoded),
+        "slots": _u32(slots),
+        "pos_flags": bytes(pos_flags),
+        "pos_bounds": _u32(pos_bounds),
+        "synset_ids": _u32(ids),
+        "synset_offsets": _u32(offsets(records)),
+        "synsets": b"".join(records)
+    }
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        position = HEADER.size
+        layout = []
+        for name in SECTIONS:
+            # 4-byte alignment, so the integer sections can be cast in place
+            position += -position % 4
+            layout.extend((position, len(sections[name])))
+            position += len(sections[name])
+        f.write(HEADER.pack(MAGIC, *layout))
+        for name in SECTIONS:
+            f.write(b"\0" * (-f.tell() % 4))
+            f.write(sections[name])
+    os.replace(tmp_path, path)
+    return {"lemmas": len(lemmas), "synsets": len(records)}
+
+# =================== Reader ===================
+class LexiconSnapshot:
+    """
+    Read-only view of a snapshot file. The file is memory-mapped, so opening
+    it costs only the small morphy tables, and pool workers forked after the
+    open share its pages. Lemmas are found through an open-addressing hash
+    table stored in the file.
+
+    Parameters:
+        path (str): Snapshot file.
+        wordnet_version (str): If given, the WordNet version the snapshot must
+            have been exported from (ValueError otherwise).
+    """
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH, wordnet_version: Optional[str] = None):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = HEADER.unpack_from(self._mmap, 0)
+        if header[0] != MAGIC:
+            raise ValueError(f"Not a lexicon snapshot: {path}")
+        self._views = [memoryview(self._mmap)]
+        self._sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = header[1 + 2 * i], header[2 + 2 * i]
+            self._sections[name] = (offset, length)
+
+        offset, length = self._sections["meta"]
+        meta = json.loads(self._mmap[offset:offset + length].decode("utf-8"))
+        self.wordnet_version = meta["wordnet_version"]
+        if wordnet_version is not None and self.wordnet_version != wordnet_version:
+            self.close()
+            raise ValueError(f"Snapshot {path} was exported from WordNet {self.wordnet_version or '(unknown)'}, "
+                             f"not {wordnet_version}: export it again")
+        self.lemma_count = meta["lemmas"]
+        self.synset_count = meta["synsets"]
+        self.exceptions: Dict[str, Dict[str, List[str]]] = meta["exceptions"]
+        self.substitutions: Dict[str, List[Tuple[str, str]]] = {
+            pos: [tuple(rule) for rule in rules] for pos, rules in meta["substitutions"].items()
+        }
+
+        # Strings are sliced straight from the mmap (one copy), at these bases
+        self._keys_base = self._sections["keys"][0]
+        self._records_base = self._sections["synsets"][0]
+        self._key_offsets = self._ints("key_offsets")
+        self._slots = self._ints("slots")
+        self._mask = len(self._slots) - 1
+        offset, length = self._sections["pos_flags"]
+        self._pos_flags = self._mmap[offset:offset + length]
+        self._pos_bounds = self._ints("pos_bounds")
+        self._synset_ids = self._ints("synset_ids")
+        self._synset_offsets = self._ints("synset_offsets")
+        # lemma -> key index (or -1), for the forms morphy tries repeatedly
+        self._index_cache: Dict[str, int] = {}
+
+    def _ints(self, name: str) -> Sequence[int]:
+        offset, length = self._sections[name]
+        if sys.byteorder == "little":
+            view = self._views[0][offset:offset + length].cast("I")
+            self._views.append(view)
+            return view
+        data = array("I", self._mmap[offset:offset + length])
+        data.byteswap()
+        return data
+
+    def close(self):
+        self._key_offsets = self._slots = self._pos_bounds = self._synset_ids = self._synset_offsets = None
+        # The mmap can only be closed once no view of it is left
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+
+    # ---------- Lemma index ----------
+    def lemma_index(self, lemma: str) -> int:
+        """
+        Position of a lemma in the snapshot, or -1 if WordNet does not have it.
+        """
+        cached = self._index_cache.get(lemma)
+        if cached is not None:
+            return cached
+        key = lemma.encode("utf-8")
+        slots, offsets, mask = self._slots, self._key_offsets, self._mask
+        data, base = self._mmap, self._keys_base
+        slot = key_hash(key) & mask
+        found = -1
+        while True:
+            entry = slots[slot]
+            if not entry:
+                break
+            start, end = offsets[entry - 1], offsets[entry]
+            if end - start == len(key) and data[base + start:base + end] == key:
+                found = entry - 1
+                break
+            slot = (slot + 1) & mask
+        self._index_cache[lemma] = found
+        return found
+
+    def synset_ids(self, index: int, pos: str) -> Sequence[int]:
+        k = index * len(POS_ORDER) + POS_ORDER.index(pos)
+        return self._synset_ids[self._pos_bounds[k]:self._pos_bounds[k + 1]]
+
+    def has_pos(self, index: int, pos: str) -> bool:
+        """
+        Whether the lemma has an entry for pos (like `pos in _lemma_pos_offset_map[lemma]`).
+        """
+        return index >= 0 and bool(self._pos_flags[index] & _POS_BITS[pos])
+
+    def synset(self, sid: int) -> SnapshotSynset:
+        base = self._records_base
+        start, end = base + self._synset_offsets[sid], base + self._synset_offsets[sid + 1]
+        return SnapshotSynset(*self._mmap[start:end].decode("utf-8").split(FIELD_SEP))
+
+    # ---------- NLTK behaviour ----------
+    def morphy(self, form: str, pos: str) -> List[str]:
+        """
+        Base forms of form for pos that WordNet has, as NLTK's wordnet._morphy.
+        """
+        exceptions = self.exceptions.get(pos, {})
+        if form in exceptions:
+            forms = exceptions[form]
+        else:
+            forms = [form[:-len(old)] + new for old, new in self.substitutions.get(pos, ()) if form.endswith(old)]
+        result = []
+        for candidate in [form] + forms:
+            if candidate not in result and self.has_pos(self.lemma_index(candidate), pos):
+                result.append(candidate)
+        return result
+
+    def synsets(self, word: str) -> List[SnapshotSynset]:
+        """
+        Synsets of a word in the order of NLTK's wordnet.synsets(word).
+        """
+        word = word.lower()
+        result = []
+        for pos in POS_LIST:
+            for form in self.morphy(word, pos):
+                for sid in self.synset_ids(self.lemma_index(form), pos):
+                    result.append(self.synset(sid))
+        return result
+
+    def lemmatize(self, word: str, pos: str = 'n') -> str:
+        """
+        Same result as NLTK's WordNetLemmatizer().lemmatize(word, pos).
+        """
+        lemmas = self.morphy(word, pos)
+        return min(lemmas, key=len) if lemmas else word
+
+class SnapshotProvider(LexiconProvider):
+    """
+    Lexicon provider reading an exported snapshot (see export_snapshot)
+    instead of NLTK, which is never imported. With wordnet_version, a
+    snapshot exported from another WordNet version is refused.
+    """
+    name = "snapshot"
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH, wordnet_version: Optional[str] = None):
+        self.path = path
+        self.wordnet_version = wordnet_version
+        self._snapshot: Optional[LexiconSnapshot] = None
+
+    @property
+    def snapshot(self) -> LexiconSnapshot:
+        if self._snapshot is None:
+            self._snapshot = LexiconSnapshot(self.path, self.wordnet_version)
+        return self._snapshot
+
+    def synsets(self, word: str) -> Sequence:
+        return self.snapshot.synsets(word)
+
+    def lemmatize(self, word: str, pos: str = 'n') -> str:
+        return self.snapshot.lemmatize(word, pos)
+
+    def ensure_loaded(self):
+        if not os.path.exists(self.path):
+            raise LookupError(f"No lexicon snapshot at {self.path} (run python -m core.lexicon_snapshot --export)")
+        self.snapshot
+
+# =================== Verification ===================
+def compare_with_wordnet(words: Sequence[str], path: str = DEFAULT_SNAPSHOT_PATH) -> Dict[str, Any]:
+    """
+    Checks the snapshot against NLTK on sample words: same synsets (pos,
+    definition, first example, lemma names) in the same order, and the same
+    lemma for every POS.
+    """
+    from nltk.corpus import wordnet
+    from nltk.stem import WordNetLemmatizer
+
+    snapshot = LexiconSnapshot(path)
+    lemmatizer = WordNetLemmatizer()
+    mismatches = []
+    for word in words:
+        expected = [synset_record(s) for s in wordnet.synsets(word)]
+        actual = [synset_record(s) for s in snapshot.synsets(word)]
+        if expected != actual:
+            mismatches.append({"word": word, "check": "synsets"})
+        for pos in POS_ORDER:
+            if lemmatizer.lemmatize(word, pos) != snapshot.lemmatize(word, pos):
+                mismatches.append({"word": word, "check": f"lemmatize/{pos}"})
+    snapshot.close()
+    return {"words": len(words), "mismatches": mismatches[:50], "mismatch_count": len(mismatches)}
+
+# Direct test
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Export or inspect the WordNet lexicon snapshot")
+    parser.add_argument('--path', type=str, default=DEFAULT_SNAPSHOT_PATH)
+    parser.add_argument('--export', action='store_true', help='Export the snapshot from NLTK WordNet')
+    parser.add_argument('--verify', type=int, default=0, help='Compare N lemmas against NLTK after export')
+    parser.add_argument('words', nargs='*', help='Words to look up in the snapshot')
+    args = parser.parse_args()
+
+    if args.export:
+        start = time.perf_counter()
+        stats = export_snapshot(args.path)
+        print(f"Exported {stats['lemmas']} lemmas and {stats['synsets']} synsets to {args.path} "
+              f"({os.path.getsize(args.path) / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
+    if args.verify:
+        from nltk.corpus import wordnet
+        names = sorted(wordnet.all_lemma_names())
+        sample = names[::max(1, len(names) // args.verify)][:args.verify]
+        # Inflected forms exercise the morphy rules and exception lists too
+        sample += [name + suffix for name in sample[:args.verify // 2] for suffix in ("s", "ed", "ing")]
+        print(json.dumps(compare_with_wordnet(sample, args.path), indent=2))
+
+    if args.words:
+        start = time.perf_counter()
+        snapshot = LexiconSnapshot(args.path)
+        print(f"Opened in {(time.perf_counter() - start) * 1000:.1f} ms (WordNet {snapshot.wordnet_version})")
+        for word in args.words:
+            print(word, "→", snapshot.lemmatize(word), [s.definition() for s in snapshot.synsets(word)][:3])
@@ -0,0 +1,192 @@
+# core/lookup.py
+
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Bounds for the shared caches (number of distinct entries kept)
+SYNSET_CACHE_SIZE = 65536
+LEMMA_CACHE_SIZE = 131072
+
+# =================== Providers ===================
+class LexiconProvider:
+    """
+    Source of synsets and lemmas for the core builder. A synset must offer
+    the WordNet methods the builder uses: definition(), examples(), pos()
+    and lemmas() (objects with name()).
+    """
+    name = ""
+
+    def synsets(self, word: str) -> Sequence:
+        raise NotImplementedError
+
+    def lemmatize(self, word: str, pos: str = 'n') -> str:
+        raise NotImplementedError
+
+    def ensure_loaded(self):
+        """Loads the data up front (called once per worker process)."""
+        pass
+
+class NLTKProvider(LexiconProvider):
+    """
+    NLTK's WordNet corpus and WordNetLemmatizer (the default provider).
+    """
+    name = "wordnet"
+
+    def __init__(self):
+        from nltk.corpus import wordnet
+        from nltk.stem import WordNetLemmatizer
+        self.wordnet = wordnet
+        self.lemmatizer = WordNetLemmatizer()
+
+    def synsets(self, word: str) -> Sequence:
+        return self.wordnet.synsets(word)
+
+    def lemmatize(self, word: str, pos: str = 'n') -> str:
+        return self.lemmatizer.lemmatize(word, pos=pos)
+
+    def ensure_loaded(self):
+        self.wordnet.ensure_loaded()
+
+class StubLemma:
+    __slots__ = ("_name",)
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def name(self) -> str:
+        return self._name
+
+class StubSynset:
+    __slots__ = ("_pos", "_definition", "_examples", "_lemmas")
+
+    def __init__(self, pos: str, definition: str, examples: List[str], lemmas: List[str]):
+        self._pos = pos
+        self._definition = definition
+        self._examples = examples
+        self._lemmas = [StubLemma(name) for name in lemmas]
+
+    def pos(self) -> str:
+        return self._pos
+
+    def definition(self) -> str:
+        return self._definition
+
+    def examples(self) -> List[str]:
+        return self._examples
+
+    def lemmas(self) -> List[StubLemma]:
+        return self._lemmas
+
+class StubProvider(LexiconProvider):
+    """
+    Offline stand-in for WordNet: every word gets 0 to max_synsets synthetic
+    synsets derived from a hash of the word, so runs are reproducible without
+    the WordNet data. Used by tests and benchmarks.
+    """
+    name = "stub"
+    POS_TAGS = ("n", "n", "v", "a", "s", "r")
+    GLOSS_WORDS = ("animal", "structure", "object", "movement", "tool", "device", "system",
+                   "small", "process", "used", "for", "with", "made", "of", "part", "signal")
+
+    def __init__(self, max_synsets: int = 4):
+        self.max_synsets = max_synsets
+
+    def synsets(self, word: str) -> List[StubSynset]:
+        seed = zlib.crc32(word.encode("utf-8"))
+        count = seed % (self.max_synsets + 1)
+        synsets = []
+        for i in range(count):
+            h = zlib.crc32(f"{word}#{i}".encode("utf-8"))
+            gloss = " ".join(self.GLOSS_WORDS[(h >> shift) % len(self.GLOSS_WORDS)] for shift in range(0, 24, 4))
+            synsets.append(StubSynset(
+                self.POS_TAGS[h % len(self.POS_TAGS)],
+                f"a {gloss} related to {word}",
+                [f"the {word} was {self.GLOSS_WORDS[h % len(self.GLOSS_WORDS)]}"] if h % 2 else [],
+                [word, f"{word}_{self.GLOSS_WORDS[(h >> 8) % len(self.GLOSS_WORDS)]}"]
+            ))
+        return synsets
+
+    def lemmatize(self, word: str, pos: str = 'n') -> str:
+        if pos == 'v' and word.endswith("ing") and len(word) > 5:
+            return word[:-3]
+        if word.endswith("ies") and len(word) > 4:
+            return word[:-3] + "y"
+        if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+            return word[:-1]
+        return word
+
+def snapshot_provider(path: Optional[str] = None) -> LexiconProvider:
+    """
+    Provider reading an exported WordNet snapshot (core/lexicon_snapshot.py);
+    imported on demand, and never imports NLTK.
+    """
+    from core.lexicon_snapshot import DEFAULT_SNAPSHOT_PATH, SnapshotProvider
+    return SnapshotProvider(path or DEFAULT_SNAPSHOT_PATH)
+
+PROVIDERS = {"wordnet": NLTKProvider, "snapshot": snapshot_provider, "stub": StubProvider}
+
+# Where the snapshot provider looks for an exported snapshot by default
+SNAPSHOT_PATH = "storage/wordnet.snapshot"
+
+_provider: Optional[LexiconProvider] = None
+
+def get_provider() -> LexiconProvider:
+    """
+    Returns the active provider, creating one on first use: NLTK's WordNet,
+    unless another source was chosen with set_provider (an exported snapshot
+    is only used when asked for, e.g. main.py --lexicon snapshot).
+    """
+    global _provider
+    if _provider is None:
+        _provider = NLTKProvider()
+    return _provider
+
+def set_provider(provider: LexiconProvider | str):
+    """
+    Switches the lexicon source ("wordnet", "snapshot", "stub", or a LexiconProvider) and
+    empties the caches filled by the previous one. Worker processes forked
+    afterwards inherit it.
+    """
+    global _provider
+    _provider = PROVIDERS[provider]() if isinstance(provider, str) else provider
+    clear_caches()
+
+# =================== Cached lookups ===================
+@lru_cache(maxsize=SYNSET_CACHE_SIZE)
+def get_synsets(word: str) -> Tuple:
+    """
+    Returns the synsets of a word, cached in a bounded LRU cache.
+
+    The result is a tuple so that a cached entry cannot be modified by a caller.
+    """
+    return tuple(get_provider().synsets(word))
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemmatize(word: str, pos: str = 'n') -> str:
+    """
+    Memoized lemmatization of a word for the given POS.
+    """
+    return get_provider().lemmatize(word, pos)
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Returns hit/miss counters and current size of the shared caches.
+    """
+    stats = {}
+    for name, cached in (("synsets", get_synsets), ("lemmas", lemmatize)):
+        info = cached.cache_info()
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize
+        }
+    return stats
+
+def clear_caches():
+    """
+    Empties the shared caches and resets their counters.
+    """
+    get_synsets.cache_clear()
+    lemmatize.cache_clear()
@@ -0,0 +1,285 @@
+# core/metrics.py
+
+import contextlib
+import datetime
+import json
+import os
+import signal
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import cProfile
+
+# Instrumentation is off unless a run enables it. While off, timer() returns a
+# shared no-op context and count() returns at once, so the hooks can stay in
+# the hot loops.
+_enabled = False
+_started: Optional[float] = None
+_timers: Dict[str, List[float]] = {}    # name -> [calls, seconds]
+_counters: Counter = Counter()
+_profiler: Optional["cProfile.Profile"] = None
+_profile_depth = 0
+_sampler: Optional["Sampler"] = None
+
+_NULL_TIMER = contextlib.nullcontext()
+
+PROFILE_TOP = 30              # functions listed in the report's profile section
+SAMPLE_INTERVAL = 0.005       # CPU seconds between two samples of the main thread
+
+def enabled() -> bool:
+    return _enabled
+
+def enable(profile: bool = False, sample: bool = False):
+    """
+    Starts collecting timers and counters.
+
+    Parameters:
+        profile (bool): Also run cProfile inside profiled() blocks (the hot loops).
+        sample (bool): Also sample the main thread's current function every
+            SAMPLE_INTERVAL seconds of CPU time (see Sampler).
+    """
+    global _enabled, _started, _profiler, _sampler
+    _enabled = True
+    if _started is None:
+        _started = time.perf_counter()
+    if profile and _profiler is None:
+        import cProfile
+        _profiler = cProfile.Profile()
+    if sample and _sampler is None:
+        _sampler = Sampler()
+        _sampler.start()
+
+def disable():
+    global _enabled, _sampler
+    _enabled = False
+    if _sampler is not None:
+        _sampler.stop()
+
+def reset():
+    """
+    Forgets everything collected so far (the enabled state is kept).
+    """
+    global _started, _profiler, _sampler
+    _timers.clear()
+    _counters.clear()
+    _started = time.perf_counter() if _enabled else None
+    _profiler = type(_profiler)() if _profiler is not None else None
+    if _sampler is not None:
+        _sampler.samples.clear()
+
+# =================== Timers and counters ===================
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        entry = _timers.get(self.name)
+        if entry is None:
+            _timers[self.name] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+        return False
+
+def timer(name: str):
+    """
+    Context manager adding the time of its block to the stage `name`.
+    Timers may be nested; each stage's time includes the stages inside it.
+    """
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+def timed(name: str) -> Callable:
+    """
+    Decorator version of timer().
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name: str, n: int = 1):
+    if _enabled:
+        _counters[name] += n
+
+# =================== Profiling hooks ===================
+class _Profiled:
+    __slots__ = ()
+
+    def __enter__(self):
+        global _profile_depth
+        if _profile_depth == 0:
+            _profiler.enable()
+        _profile_depth += 1
+
+    def __exit__(self, *exc):
+        global _profile_depth
+        _profile_depth -= 1
+        if _profile_depth == 0:
+            _profiler.disable()
+        return False
+
+_PROFILED = _Profiled()
+
+def profiled():
+    """
+    Context manager running cProfile over its block when profiling is
+    enabled (see enable(profile=True)); a no-op otherwise. Nested blocks
+    share one profile.
+    """
+    return _PROFILED if _enabled and _profiler is not None else _NULL_TIMER
+
+class Sampler:
+    """
+    Low-overhead statistical profile: counts the function the main thread is
+    running every `interval` seconds of CPU time, from a SIGPROF timer (the
+    handler runs in the main thread between two bytecodes, so samples are not
+    biased towards the points where the GIL is released). Unix only.
+    """
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.available = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+    def _sample(self, signum, frame):
+        if frame is not None:
+            code = frame.f_code
+            self.samples[f"{os.path.basename(code.co_filename)}:{code.co_name}"] += 1
+
+    def start(self):
+        if not self.available:
+            print("⚠️ Sampling needs SIGPROF timers in the main thread – skipped.")
+            return
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        if self.available:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+# =================== Worker processes ===================
+def snapshot() -> Dict[str, Any]:
+    """
+    Timers and counters collected so far, in a picklable form.
+    """
+    return {"timers": {name: list(entry) for name, entry in _timers.items()}, "counters": dict(_counters)}
+
+def drain() -> Optional[Dict[str, Any]]:
+    """
+    snapshot() then reset of the timers and counters. Workers return it with
+    their results, so the parent can merge() what they measured.
+    """
+    if not _enabled:
+        return None
+    data = snapshot()
+    _timers.clear()
+    _counters.clear()
+    return data
+
+def merge(data: Optional[Dict[str, Any]]):
+    if not data or not _enabled:
+        return
+    for name, (calls, seconds) in data["timers"].items():
+        entry = _timers.setdefault(name, [0, 0.0])
+        entry[0] += calls
+        entry[1] += seconds
+    _counters.update(data["counters"])
+
+# =================== Report ===================
+def profile_stats(limit: int = PROFILE_TOP) -> List[Dict[str, Any]]:
+    """
+    Functions with the most cumulative time in the profiled blocks.
+    """
+    if _profiler is None:
+        return []
+    _profiler.create_stats()
+    rows = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in _profiler.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "total_sec": round(total, 4),
+            "cumulative_sec": round(cumulative, 4)
+        })
+    rows.sort(key=lambda row: -row["cumulative_sec"])
+    return rows[:limit]
+
+def report(extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Machine-readable summary: wall time, every stage timer (slowest first,
+    inclusive of nested stages), counters, and the profile and samples if
+    they were collected.
+    """
+    wall = time.perf_counter() - _started if _started is not None else 0.0
+    stages = {
+        name: {
+            "calls": int(calls),
+            "seconds": round(seconds, 4),
+            "share": round(seconds / wall, 4) if wall else None,
+            "us_per_call": round(seconds / calls * 1e6, 2) if calls else None
+        }
+        for name, (calls, seconds) in sorted(_timers.items(), key=lambda item: -item[1][1])
+    }
+    result = {
+        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "wall_seconds": round(wall, 4),
+        "stages": stages,
+        "counters": dict(_counters)
+    }
+    if _profiler is not None:
+        result["profile"] = profile_stats()
+    if _sampler is not None and _sampler.samples:
+        total = sum(_sampler.samples.values())
+        result["samples"] = {name: round(n / total, 4) for name, n in _sampler.samples.most_common(PROFILE_TOP)}
+    if extra:
+        result.update(extra)
+    return result
+
+def write_report(path: str, conn=None, meta_key: Optional[str] = None,
+                 extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Writes the report as JSON to path and, with a connection, stores it in
+    the meta table under meta_key. With profiling, the raw profile is also
+    dumped next to the report (<path>.prof, readable with pstats).
+    """
+    from db.database import create_meta_table, update_meta
+
+    data = report(extra)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    if _profiler is not None:
+        _profiler.dump_stats(f"{os.path.splitext(path)[0]}.prof")
+    if conn is not None and meta_key:
+        create_meta_table(conn)
+        update_meta(conn, meta_key, json.dumps(data))
+    return data
+
+# Direct test
+if __name__ == "__main__":
+    def work(n):
+        return sum(i * i for i in range(n))
+
+    enable(profile=True)
+    for n in range(200):
+        with timer("outer"), profiled():
+            with timer("inner"):
+                work(2000)
+            count("items")
+    print(json.dumps(report(), indent=2)[:800])
@@ -0,0 +1,49 @@
+# core/normalizer.py
+
+from typing import Iterable, List, Optional
+
+class _CleanTable(dict):
+    """
+    str.translate table, filled lazily per character:
+    - keeps a-z and whitespace
+    - turns "_" and "-" into spaces
+    - deletes everything else (numbers, symbols, non-ASCII letters)
+    """
+    def __missing__(self, codepoint: int) -> Optional[str]:
+        char = chr(codepoint)
+        if 'a' <= char <= 'z' or char.isspace():
+            mapped = char
+        elif char in "_-":
+            mapped = " "
+        else:
+            mapped = None
+        self[codepoint] = mapped
+        return mapped
+
+_CLEAN_TABLE = _CleanTable()
+
+def clean_word(word: str) -> Optional[str]:
+    """
+    Cleans the word from symbols and non-alphabetic elements, preserving spaces.
+
+    - Converts to lowercase
+    - Replaces "_" and "-" with spaces
+    - Removes numbers and symbols
+    - Collapses runs of whitespace into single spaces
+    - Returns None if the word becomes empty
+    """
+    if not isinstance(word, str):
+        return None
+    # Lowercase first: some characters only become a-z once lowercased
+    return " ".join(word.lower().translate(_CLEAN_TABLE).split()) or None
+
+def clean_words(words: Iterable[str]) -> List[Optional[str]]:
+    """
+    Batch version of clean_word: returns the cleaned form of every word, in order.
+    """
+    table = _CLEAN_TABLE
+    join = " ".join
+    return [
+        (join(word.lower().translate(table).split()) or None) if isinstance(word, str) else None
+        for word in words
+    ]
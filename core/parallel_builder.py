@@ -0,0 +1,98 @@
+# core/parallel_builder.py
+
+from typing import Any, Container, Dict, Iterator, List, Optional, Tuple
+
+from core import metrics
+from core.cleaner import clean_word
+from core.core_builder import build_core_unit, set_run_timestamp, unit_key
+from core.core_unit import CoreUnit
+from core.lookup import get_provider
+
+# Upper bound on words sent to a worker in one task
+MAX_CHUNK_SIZE = 256
+
+# Keys of the units this worker process has built. Workers take chunks in
+# submission order, so a key found here was built for an earlier word and is
+# already in the writer's seen set by the time this word reaches it.
+_built_keys = set()
+
+def init_worker(collect_metrics: bool = False, timestamp: Optional[str] = None):
+    """
+    Pool initializer: loads the lexicon (the WordNet corpus by default) once
+    per worker process, so no word pays for the lazy corpus load. With
+    collect_metrics, the worker's stage timers are sent back with every chunk;
+    timestamp is the parent's run timestamp, given to every unit built.
+    """
+    if timestamp is not None:
+        set_run_timestamp(timestamp)
+    if collect_metrics:
+        metrics.enable()
+    get_provider().ensure_loaded()
+
+def build_word(raw_word: str, seen: Container[str] = ()) -> Tuple[Optional[str], Optional[CoreUnit]]:
+    """
+    Cleans a raw word and builds its CoreUnit, unless its ID is already in seen.
+
+    Returns:
+        tuple: (unit_id, unit). unit_id is None if the word is empty after
+        cleaning or has no WordNet data; unit is None if the ID was seen
+        (the full build was skipped) or the build found no definitions.
+    """
+    with metrics.timer("build.clean"):
+        cleaned = clean_word(raw_word)
+    if not cleaned:
+        metrics.count("words_empty")
+        return None, None
+    with metrics.timer("build.unit_key"):
+        key = unit_key(cleaned)
+    if key is None or key in seen:
+        return key, None
+    with metrics.timer("build.core_unit"):
+        return key, build_core_unit(raw_word, cleaned)
+
+def build_chunk(words: List[str]) -> Tuple[List[Tuple[str, Optional[str], Optional[CoreUnit]]], Optional[Dict[str, Any]]]:
+    """
+    Worker task: builds the units of a chunk of words, keeping their order.
+
+    Returns:
+        tuple: (results, metrics measured for the chunk or None), see metrics.drain()
+    """
+    results = []
+    for raw_word in words:
+        key, unit = build_word(raw_word, _built_keys)
+        if unit:
+            _built_keys.add(key)
+        results.append((raw_word, key, unit))
+    return results, metrics.drain()
+
+def chunk_size_for(word_count: int, workers: int) -> int:
+    """
+    Picks a chunk size that gives every worker several chunks per letter,
+    so the pool stays busy until the end of the letter.
+    """
+    return max(1, min(MAX_CHUNK_SIZE, word_count // (workers * 8)))
+
+def iter_built_units(words: List[str], seen: Container[str], pool=None,
+                     workers: int = 1) -> Iterator[Tuple[str, Optional[str], Optional[CoreUnit]]]:
+    """
+    Yields (raw_word, unit_id, unit) triples in the original word order.
+
+    Parameters:
+        words (list): Raw words of one letter.
+        seen (set): IDs already saved. Read lazily by the sequential path, so
+            units the caller saves between two items are taken into account.
+        pool (multiprocessing.Pool): Worker pool, or None to build in this process.
+        workers (int): Number of processes in the pool.
+    """
+    if pool is None:
+        for raw_word in words:
+            yield (raw_word, *build_word(raw_word, seen))
+        return
+
+    size = chunk_size_for(len(words), workers)
+    chunks = (words[i:i + size] for i in range(0, len(words), size))
+    # imap returns the chunks in submission order, so deduplication in the
+    # caller sees the words exactly as the sequential build does
+    for results, chunk_metrics in pool.imap(build_chunk, chunks):
+        metrics.merge(chunk_metrics)
+        yield from results
@@ -1,21 +1,19 @@
 # core/pos_utils.py
 
-from nltk.corpus import wordnet as wn
-from nltk.stem import WordNetLemmatizer
-from typing import Literal
+from typing import Literal, Optional, Sequence
+
+from core.lookup import get_synsets, lemmatize
 
 # WordNet POS tags
 WordNetPOS = Literal['n', 'v', 'a', 's', 'r']
 
-# Initialize the lemmatizer once at the file level
-lemmatizer = WordNetLemmatizer()
-
-def get_dominant_wordnet_pos(word: str) -> WordNetPOS:
+def get_dominant_wordnet_pos(word: str, synsets: Optional[Sequence] = None) -> WordNetPOS:
     """
     Infer the most common part of speech (noun, verb, adjective, ...) based on WordNet.
     
     Parameters:
         word (str): The input word
+        synsets (list): Synsets already fetched for the word, to avoid a second lookup
         
     Returns:
         str: The most frequent POS tag (n/v/a/r/s)
@@ -23,7 +21,8 @@ def get_dominant_wordnet_pos(word: str) -> WordNetPOS:
     if not isinstance(word, str) or not word.strip():
         return 'n'  # fallback
     
-    synsets = wn.synsets(word)
+    if synsets is None:
+        synsets = get_synsets(word)
     pos_counts = {"n": 0, "v": 0, "a": 0, "s": 0, "r": 0}
 
     for syn in synsets:
@@ -53,11 +52,12 @@ def extract_stem(word: str, pos: WordNetPOS = 'n') -> str:
     
     if pos not in {'n', 'v', 'a', 's', 'r'}:
         pos = 'n'
-    return lemmatizer.lemmatize(word, pos=pos)
+    return lemmatize(word, pos)
 
 
 # Direct test when running the file independently
 if __name__ == "__main__":
+    from nltk.corpus import wordnet as wn
     try:
         wn.synsets("test")
     except LookupError:
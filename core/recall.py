@@ -0,0 +1,269 @@
+# core/recall.py
+
+import heapq
+import re
+import sqlite3
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.normalizer import clean_words
+from db.database import create_activation_table
+from db.inserter import UNIT_COLUMNS, row_to_unit
+
+WORKING_SET_SIZE = 10000      # hot units kept in memory
+HALF_LIFE = 7 * 24 * 3600.0   # seconds for an activation to lose half its strength
+ACTIVATION_WEIGHT = 0.5       # share of the score that activation can add
+STEM_WEIGHT = 1.0             # relevance of a query term matching a unit's stem
+CONCEPT_WEIGHT = 0.5          # relevance of a query term matching a unit's concept
+FLUSH_EVERY = 1000            # pending activations written at once
+MIN_STRENGTH = 1e-3           # decayed strengths below this count as forgotten
+SQL_MAX_VARIABLES = 900       # stays under SQLite's default limit of 999 "?" per statement
+
+# Words of a code snippet that say nothing about what it does
+CODE_STOPWORDS = {
+    "and", "as", "assert", "async", "await", "break", "class", "cls", "continue", "def", "del",
+    "elif", "else", "except", "false", "finally", "for", "from", "global", "if", "import", "in",
+    "is", "lambda", "none", "nonlocal", "not", "or", "pass", "raise", "return", "self", "true",
+    "try", "while", "with", "yield", "the", "a", "an", "of", "to"
+}
+
+# Words inside identifiers: "parseHTTPResponse" → parse, HTTP, Response
+_WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+")
+
+def query_terms(query: str | Iterable[str], stemmer: Optional[Callable[[str], str]] = None) -> Dict[str, float]:
+    """
+    Turns a query (free text, a code snippet, or a list of terms) into weighted terms.
+
+    Identifiers are split into words, cleaned with the shared normalizer and
+    optionally stemmed; consecutive words are also paired, since concepts can
+    be compounds ("small creature"). A term's weight is its share of the query.
+
+    Parameters:
+        query (str | iterable): The query text or its terms.
+        stemmer (callable): Maps a cleaned word to the form stored in the stem
+            column, e.g. core.pos_utils.extract_stem.
+
+    Returns:
+        dict: {term: weight}, weights summing to 1 over the single words
+    """
+    texts = [query] if isinstance(query, str) else list(query)
+    words = []
+    for text in texts:
+        if isinstance(text, str):
+            words.extend(_WORD_RE.findall(text))
+    words = [w for w in clean_words(words) if w and len(w) > 1 and w not in CODE_STOPWORDS]
+    if stemmer:
+        words = [stemmer(w) for w in words]
+    if not words:
+        return {}
+
+    counts = Counter(words)
+    total = len(words)
+    terms = {word: count / total for word, count in counts.items()}
+    for first, second in zip(words, words[1:]):
+        pair = f"{first} {second}"
+        if pair not in terms:
+            terms[pair] = min(terms[first], terms[second])
+    return terms
+
+def decayed(strength: float, last_activated: float, now: float, half_life: float = HALF_LIFE) -> float:
+    """
+    Strength of an activation after the time elapsed since it was recorded.
+    """
+    if not strength:
+        return 0.0
+    value = strength * 0.5 ** (max(0.0, now - last_activated) / half_life)
+    return value if value >= MIN_STRENGTH else 0.0
+
+class _HotUnit:
+    __slots__ = ("unit", "strength", "last_activated")
+
+    def __init__(self, unit: Dict, strength: float, last_activated: float):
+        self.unit = unit
+        self.strength = strength
+        self.last_activated = last_activated
+
+class RecallEngine:
+    """
+    Recalls the core units most relevant to a query.
+
+    - Candidates are the units whose stem or concept is a query term, found
+      through idx_stem / idx_concept.
+    - Score = relevance + ACTIVATION_WEIGHT * a / (1 + a), where a is the
+      unit's activation strength decayed by its half-life. Decay is computed
+      when the strength is read; nothing is updated in the background.
+    - Recalled units are activated: their decayed strength grows by 1, so
+      frequent and recent units rank higher among equally relevant ones.
+    - The last working_set_size recalled units stay in memory (LRU) with their
+      rows and activations; the others are read from SQLite on demand.
+
+    With persist=True, activations are written to the unit_activations table
+    (every FLUSH_EVERY activations and on flush()/close()); otherwise they
+    only live in the working set and are forgotten on eviction.
+    """
+    def __init__(self, conn: sqlite3.Connection, working_set_size: int = WORKING_SET_SIZE,
+                 half_life: float = HALF_LIFE, activation_weight: float = ACTIVATION_WEIGHT,
+                 persist: bool = True, stemmer: Optional[Callable[[str], str]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.conn = conn
+        self.working_set_size = working_set_size
+        self.half_life = half_life
+        self.activation_weight = activation_weight
+        self.persist = persist
+        self.stemmer = stemmer
+        self.clock = clock
+        self.working_set: "OrderedDict[str, _HotUnit]" = OrderedDict()
+        # Activations not yet written: {unit_id: (strength, last_activated)}
+        self._pending: Dict[str, Tuple[float, float]] = {}
+        self.stats = {"queries": 0, "candidates": 0, "hot_hits": 0, "cold_reads": 0}
+        if persist:
+            create_activation_table(conn)
+            conn.commit()
+
+    # =================== Candidates ===================
+    def _candidates(self, terms: List[str]) -> List[Tuple[str, str, str, Optional[float], Optional[float]]]:
+        """
+        (id, stem, concept, stored strength, stored last activation) of every
+        unit whose stem or concept is one of the terms.
+        """
+        if self.persist:
+            sql = ("SELECT u.id, u.stem, u.concept, a.strength, a.last_activated FROM core_units u "
+                   "LEFT JOIN unit_activations a ON a.unit_id = u.id "
+                   "WHERE u.stem IN ({0}) OR u.concept IN ({0})")
+        else:
+            sql = ("SELECT id, stem, concept, NULL, NULL FROM core_units "
+                   "WHERE stem IN ({0}) OR concept IN ({0})")
+        rows = []
+        step = SQL_MAX_VARIABLES // 2
+        for start in range(0, len(terms), step):
+            chunk = terms[start:start + step]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(self.conn.execute(sql.format(placeholders), chunk + chunk))
+        return rows
+
+    def _strength(self, unit_id: str, stored_strength: Optional[float], stored_last: Optional[float],
+                  now: float) -> float:
+        hot = self.working_set.get(unit_id)
+        if hot is not None:
+            return decayed(hot.strength, hot.last_activated, now, self.half_life)
+        pending = self._pending.get(unit_id)
+        if pending is not None:
+            return decayed(pending[0], pending[1], now, self.half_life)
+        if stored_strength is None:
+            return 0.0
+        return decayed(stored_strength, stored_last, now, self.half_life)
+
+    # =================== Working set ===================
+    def _load_units(self, unit_ids: List[str]) -> Dict[str, Dict]:
+        units = {}
+        for start in range(0, len(unit_ids), SQL_MAX_VARIABLES):
+            chunk = unit_ids[start:start + SQL_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self.conn.execute(f"SELECT {UNIT_COLUMNS} FROM core_units WHERE id IN ({placeholders})", chunk):
+                units[row[0]] = row_to_unit(row)
+        return units
+
+    def _touch(self, unit_id: str, unit: Dict, strength: float, now: float, activate: bool):
+        hot = self.working_set.get(unit_id)
+        if hot is None:
+            hot = self.working_set[unit_id] = _HotUnit(unit, strength, now)
+            if len(self.working_set) > self.working_set_size:
+                self.working_set.popitem(last=False)
+        else:
+            self.working_set.move_to_end(unit_id)
+        if activate:
+            hot.strength = strength + 1.0
+            hot.last_activated = now
+            if self.persist:
+                self._pending[unit_id] = (hot.strength, now)
+        else:
+            hot.strength = strength
+            hot.last_activated = now
+
+    # =================== Recall ===================
+    def recall(self, query: str | Iterable[str], k: int = 10, activate: bool = True) -> List[Dict]:
+        """
+        Returns the k units that best match the query, best first.
+
+        Parameters:
+            query (str | iterable): Free text, a code snippet, or a list of terms.
+            k (int): Number of units to return.
+            activate (bool): Strengthen the returned units (False only reads).
+
+        Returns:
+            list: CoreUnit dicts with "score", "relevance" and "activation" added
+        """
+        self.stats["queries"] += 1
+        terms = query_terms(query, self.stemmer)
+        if not terms or k <= 0:
+            return []
+        now = self.clock()
+        rows = self._candidates(list(terms))
+        self.stats["candidates"] += len(rows)
+
+        scored = []
+        weight = self.activation_weight
+        for unit_id, stem, concept, stored_strength, stored_last in rows:
+            relevance = STEM_WEIGHT * terms.get(stem, 0.0) + CONCEPT_WEIGHT * terms.get(concept, 0.0)
+            strength = self._strength(unit_id, stored_strength, stored_last, now)
+            score = relevance + weight * strength / (1.0 + strength)
+            scored.append((score, relevance, strength, unit_id))
+        top = heapq.nlargest(k, scored)
+
+        cold = [unit_id for _, _, _, unit_id in top if unit_id not in self.working_set]
+        self.stats["hot_hits"] += len(top) - len(cold)
+        self.stats["cold_reads"] += len(cold)
+        loaded = self._load_units(cold) if cold else {}
+
+        results = []
+        for score, relevance, strength, unit_id in top:
+            hot = self.working_set.get(unit_id)
+            unit = hot.unit if hot is not None else loaded.get(unit_id)
+            if unit is None:
+                continue
+            self._touch(unit_id, unit, strength, now, activate)
+            results.append(dict(unit, score=round(score, 6), relevance=round(relevance, 6),
+                                activation=round(strength, 6)))
+
+        if len(self._pending) >= FLUSH_EVERY:
+            self.flush()
+        return results
+
+    def flush(self):
+        """
+        Writes the pending activations to unit_activations.
+        """
+        if not self._pending:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO unit_activations (unit_id, strength, last_activated) VALUES (?, ?, ?)",
+            [(unit_id, strength, last) for unit_id, (strength, last) in self._pending.items()]
+        )
+        self.conn.commit()
+        self._pending.clear()
+
+    def close(self):
+        if self.persist:
+            self.flush()
+
+# Direct test
+if __name__ == "__main__":
+    from db.database import create_database
+    from db.inserter import insert_units
+
+    conn = create_database(":memory:")
+    words = [("file", "record"), ("read", "look"), ("parse", "analyze"), ("socket", "device"),
+             ("response", "reply"), ("path", "course"), ("open", "affording"), ("buffer", "device")]
+    insert_units(conn, [{
+        "id": f"{stem.upper()}_N_CORE", "stem": stem, "concept": concept, "pos": ["noun"], "main_pos": "noun",
+        "definition_set": [{"definition": f"a {concept}", "example": "", "source": "wordnet"}],
+        "related": [], "source": "wordnet", "last_updated": "2024-01-01T00:00:00"
+    } for stem, concept in words])
+
+    engine = RecallEngine(conn, working_set_size=4)
+    print(query_terms("def readFile(path): return open(path).read()"))
+    for query in ["def readFile(path): return open(path).read()", ["socket", "buffer"], "device", "device"]:
+        print(query, "→", [(u["id"], u["score"], u["activation"]) for u in engine.recall(query, k=3)])
+    print(engine.stats, list(engine.working_set))
+    engine.close()
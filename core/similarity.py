@@ -0,0 +1,232 @@
+# core/similarity.py
+
+import json
+import os
+import sqlite3
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+N_FEATURES = 1 << 18          # hashed vocabulary size
+COMPACT_ROWS = 10000          # units added before the postings are rebuilt
+UNIT_BATCH_SIZE = 5000        # core units vectorized at once by build_index
+CONCEPT_REPEAT = 2            # the concept counts as much as two mentions
+
+VECTORS_FILE = "vectors.npz"
+IDS_FILE = "ids.json"
+
+def unit_text(concept: Optional[str], definition_set: Sequence[Dict[str, str]] | str | None) -> str:
+    """
+    Text a unit is indexed by: its concept and the definitions and examples
+    of its definition_set (a list, or its JSON as stored in core_units).
+    """
+    if isinstance(definition_set, str):
+        try:
+            definition_set = json.loads(definition_set)
+        except ValueError:
+            definition_set = []
+    parts = [concept or ""] * CONCEPT_REPEAT
+    for entry in definition_set or ():
+        if isinstance(entry, Mapping):
+            parts.append(entry.get("definition") or "")
+            parts.append(entry.get("example") or "")
+    return " ".join(parts)
+
+class SimilarityIndex:
+    """
+    Nearest units by cosine similarity of hashed term vectors.
+
+    Texts are vectorized with a stateless HashingVectorizer (English stop
+    words removed, L2-normalized), so new units never change the vectors of
+    existing ones and no vocabulary has to be stored.
+
+    - vectors: one CSR row per unit, used to query by unit ID and persisted
+    - postings: the transposed matrix (one CSR row per feature), so a query
+      only visits the units sharing one of its features
+    - units added since the last compaction are kept in a small side matrix
+      and scored by brute force; compact() merges them into the postings
+
+    A unit added again replaces its previous vector.
+    """
+    def __init__(self, n_features: int = N_FEATURES, compact_rows: int = COMPACT_ROWS):
+        self.n_features = n_features
+        self.compact_rows = compact_rows
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, alternate_sign=False, norm='l2', stop_words='english', dtype=np.float32
+        )
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.vectors = sparse.csr_matrix((0, n_features), dtype=np.float32)
+        self.postings = sparse.csr_matrix((n_features, 0), dtype=np.float32)
+        self._pending: List[sparse.csr_matrix] = []
+        self._pending_rows = 0
+        # Positions whose unit was added again (dropped by the next compaction)
+        self._replaced = np.zeros(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _pending_matrix(self) -> sparse.csr_matrix:
+        if len(self._pending) > 1:
+            self._pending = [sparse.vstack(self._pending, format='csr')]
+        return self._pending[0]
+
+    def vectorize(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        return self.vectorizer.transform(texts)
+
+    # =================== Adding units ===================
+    def add(self, unit_ids: Sequence[str], texts: Sequence[str]):
+        """
+        Adds (or replaces) units given their IDs and texts (see unit_text).
+        """
+        if len(unit_ids) != len(texts):
+            raise ValueError("unit_ids and texts must have the same length")
+        if not unit_ids:
+            return
+        start = len(self.ids)
+        replaced = [self.positions[unit_id] for unit_id in unit_ids if unit_id in self.positions]
+        self._replaced = np.concatenate([self._replaced, np.zeros(len(unit_ids), dtype=bool)])
+        self._replaced[replaced] = True
+        for offset, unit_id in enumerate(unit_ids):
+            if unit_id in self.positions and self.positions[unit_id] >= start:
+                # Repeated within this batch: the last occurrence wins
+                self._replaced[self.positions[unit_id]] = True
+            self.positions[unit_id] = start + offset
+        self.ids.extend(unit_ids)
+        self._pending.append(self.vectorize(texts))
+        self._pending_rows += len(unit_ids)
+        if self._pending_rows >= self.compact_rows:
+            self.compact()
+
+    def add_units(self, units: Iterable[Dict]):
+        """
+        Adds CoreUnit dicts (id, concept, definition_set).
+        """
+        units = list(units)
+        self.add([unit["id"] for unit in units], [unit_text(unit["concept"], unit["definition_set"]) for unit in units])
+
+    def compact(self):
+        """
+        Merges the pending units into the postings and drops replaced rows.
+        """
+        if not self._pending and not self._replaced.any():
+            return
+        vectors = sparse.vstack([self.vectors] + self._pending, format='csr')
+        if self._replaced.any():
+            keep = np.flatnonzero(~self._replaced)
+            vectors = vectors[keep]
+            self.ids = [self.ids[i] for i in keep]
+            self.positions = {unit_id: i for i, unit_id in enumerate(self.ids)}
+        self.vectors = vectors
+        self.postings = vectors.T.tocsr()
+        self._pending, self._pending_rows = [], 0
+        self._replaced = np.zeros(len(self.ids), dtype=bool)
+
+    # =================== Queries ===================
+    def _top_k(self, scores: sparse.csr_matrix, k: int, exclude: Optional[Sequence[int]]) -> List[List[Tuple[str, float]]]:
+        results = []
+        replaced = self._replaced
+        for row in range(scores.shape[0]):
+            lo, hi = scores.indptr[row], scores.indptr[row + 1]
+            positions, values = scores.indices[lo:hi], scores.data[lo:hi]
+            mask = ~replaced[positions]
+            if exclude is not None:
+                mask &= positions != exclude[row]
+            positions, values = positions[mask], values[mask]
+            if len(values) > k:
+                best = np.argpartition(-values, k)[:k]
+                positions, values = positions[best], values[best]
+            order = np.argsort(-values, kind='stable')
+            results.append([(self.ids[p], float(values[i])) for i, p in ((i, positions[i]) for i in order)])
+        return results
+
+    def query_vectors(self, queries: sparse.csr_matrix, k: int = 10,
+                      exclude: Optional[Sequence[int]] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k units for every row of a query matrix, as [(unit_id, cosine)], best first.
+        exclude gives, per row, a unit position to leave out (-1 for none).
+        """
+        scores = queries @ self.postings
+        if self._pending:
+            scores = sparse.hstack([scores, queries @ self._pending_matrix().T], format='csr')
+        scores.eliminate_zeros()
+        return self._top_k(scores, k, exclude)
+
+    def query(self, texts: Sequence[str], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k units for each query text (batched: one sparse product for all texts).
+        """
+        return self.query_vectors(self.vectorize(texts), k)
+
+    def neighbours(self, unit_ids: Sequence[str], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k units most similar to each given unit, the unit itself excluded.
+
+        Raises:
+            KeyError: if a unit is not in the index.
+        """
+        positions = [self.positions[unit_id] for unit_id in unit_ids]
+        compacted = self.vectors.shape[0]
+        if all(p < compacted for p in positions):
+            queries = self.vectors[positions]
+        else:
+            pending = self._pending_matrix()
+            queries = sparse.vstack([self.vectors[[p]] if p < compacted else pending[[p - compacted]]
+                                     for p in positions], format='csr')
+        return self.query_vectors(queries, k, exclude=np.array(positions))
+
+    # =================== Persistence ===================
+    def save(self, directory: str):
+        """
+        Writes the unit vectors (vectors.npz) and IDs (ids.json) to a directory.
+        """
+        self.compact()
+        os.makedirs(directory, exist_ok=True)
+        sparse.save_npz(os.path.join(directory, VECTORS_FILE), self.vectors)
+        with open(os.path.join(directory, IDS_FILE), 'w', encoding='utf-8') as f:
+            json.dump({"n_features": self.n_features, "ids": self.ids}, f)
+
+    @classmethod
+    def load(cls, directory: str, compact_rows: int = COMPACT_ROWS) -> "SimilarityIndex":
+        with open(os.path.join(directory, IDS_FILE), 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        index = cls(saved["n_features"], compact_rows)
+        index.vectors = sparse.load_npz(os.path.join(directory, VECTORS_FILE)).tocsr()
+        index.postings = index.vectors.T.tocsr()
+        index.ids = saved["ids"]
+        index.positions = {unit_id: i for i, unit_id in enumerate(index.ids)}
+        index._replaced = np.zeros(len(index.ids), dtype=bool)
+        return index
+
+def build_index(conn: sqlite3.Connection, n_features: int = N_FEATURES,
+                batch_size: int = UNIT_BATCH_SIZE) -> SimilarityIndex:
+    """
+    Builds the index of every unit of core_units, streaming the table batch_size rows at a time.
+    """
+    index = SimilarityIndex(n_features, compact_rows=float("inf"))
+    cursor = conn.execute("SELECT id, concept, definition_set FROM core_units")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        index.add([row[0] for row in rows], [unit_text(row[1], row[2]) for row in rows])
+    index.compact()
+    index.compact_rows = COMPACT_ROWS
+    return index
+
+# Direct test
+if __name__ == "__main__":
+    index = SimilarityIndex()
+    index.add_units([
+        {"id": "DOG_N_CORE", "concept": "animal", "definition_set": [{"definition": "a domesticated carnivorous mammal kept as a pet"}]},
+        {"id": "CAT_N_CORE", "concept": "animal", "definition_set": [{"definition": "a small domesticated feline mammal"}]},
+        {"id": "ROUTER_N_CORE", "concept": "device", "definition_set": [{"definition": "a device that forwards data packets between networks"}]},
+        {"id": "MODEM_N_CORE", "concept": "device", "definition_set": [{"definition": "an electronic device that converts signals for data transmission"}]},
+    ])
+    print(index.query(["a pet mammal", "network data device"], k=2))
+    index.compact()
+    index.add_units([{"id": "SWITCH_N_CORE", "concept": "device", "definition_set": [{"definition": "a networking device connecting segments"}]}])
+    print(index.neighbours(["ROUTER_N_CORE", "CAT_N_CORE"], k=2))
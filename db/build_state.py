@@ -0,0 +1,140 @@
+# db/build_state.py
+
+import hashlib
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from db.database import get_meta, update_meta
+from db.search import unindex_units
+
+def file_hash(path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def get_letter_checkpoint(conn: sqlite3.Connection, letter: str) -> Tuple[Optional[str], int]:
+    """
+    Returns the content hash of the word list last processed for a letter and
+    the offset of the first word not yet completed in that list.
+    """
+    digest = get_meta(conn, f"letter_{letter}_hash")
+    offset = get_meta(conn, f"letter_{letter}_offset")
+    return digest, int(offset) if offset else 0
+
+def set_letter_checkpoint(conn: sqlite3.Connection, letter: str, digest: Optional[str], offset: int,
+                          commit: bool = True):
+    """
+    Stores the checkpoint of a letter. Pass commit=False to make it part of
+    the transaction that writes the corresponding units.
+    """
+    update_meta(conn, f"letter_{letter}_hash", digest or "", commit=False)
+    update_meta(conn, f"letter_{letter}_offset", str(offset), commit=False)
+    if commit:
+        conn.commit()
+
+def load_letter_words(conn: sqlite3.Connection, letter: str) -> Dict[str, Optional[str]]:
+    """
+    Returns {word: unit_id} for every word of the letter already built.
+    """
+    rows = conn.execute("SELECT word, unit_id FROM letter_words WHERE letter = ?", (letter,))
+    return dict(rows.fetchall())
+
+def record_words(conn: sqlite3.Connection, letter: str,
+                 outcomes: Iterable[Tuple[str, Optional[str], int, bool]]):
+    """
+    Records the (word, unit_id, position, built) outcomes of built words,
+    where built is True for the word a unit was built from. Does not commit.
+    """
+    conn.executemany("""
+        INSERT OR REPLACE INTO letter_words (letter, word, unit_id, position, built)
+        VALUES (?, ?, ?, ?, ?)
+    """, ((letter, word, unit_id, position, int(built)) for word, unit_id, position, built in outcomes))
+
+def update_positions(conn: sqlite3.Connection, letter: str, positions: Dict[str, int]):
+    """
+    Stores the position of each word of a letter in its edited list. Does not commit.
+    """
+    conn.executemany("UPDATE letter_words SET position = ? WHERE letter = ? AND word = ?",
+                     ((position, letter, word) for word, position in positions.items()))
+
+def stale_units(conn: sqlite3.Connection, unit_ids: Iterable[str]) -> List[Tuple[str, str, str]]:
+    """
+    Finds the units not built from the first word (in letter, then list
+    order) that maps to them: a full build would build them from that word.
+
+    Returns:
+        list: (unit_id, letter, word) of each stale unit and the word to rebuild it from.
+    """
+    stale = []
+    for unit_id in unit_ids:
+        row = conn.execute("""
+            SELECT letter, word, built FROM letter_words WHERE unit_id = ?
+            ORDER BY letter, position, rowid LIMIT 1
+        """, (unit_id,)).fetchone()
+        if row and not row[2]:
+            stale.append((unit_id, row[0], row[1]))
+    return stale
+
+def set_builder(conn: sqlite3.Connection, unit_id: str, letter: str, word: str):
+    """
+    Marks the word a unit was (re)built from. Does not commit.
+    """
+    conn.execute("UPDATE letter_words SET built = (letter = ? AND word = ?) WHERE unit_id = ?",
+                 (letter, word, unit_id))
+
+def remove_words(conn: sqlite3.Connection, letter: str, words: Iterable[str]) -> Set[str]:
+    """
+    Forgets words removed from a letter's list and deletes the core units
+    that no remaining word (of any letter) maps to. Does not commit.
+
+    Returns:
+        set: IDs of the deleted core units.
+    """
+    cursor = conn.cursor()
+    unit_ids = set()
+    for word in words:
+        row = cursor.execute("SELECT unit_id FROM letter_words WHERE letter = ? AND word = ?",
+                             (letter, word)).fetchone()
+        cursor.execute("DELETE FROM letter_words WHERE letter = ? AND word = ?", (letter, word))
+        if row and row[0]:
+            unit_ids.add(row[0])
+
+    orphaned = {
+        unit_id for unit_id in unit_ids
+        if not cursor.execute("SELECT 1 FROM letter_words WHERE unit_id = ? LIMIT 1", (unit_id,)).fetchone()
+    }
+    cursor.executemany("DELETE FROM core_units WHERE id = ?", ((unit_id,) for unit_id in orphaned))
+    unindex_units(conn, orphaned)
+    return orphaned
+
+def reset_letter(conn: sqlite3.Connection, letter: str) -> Set[str]:
+    """
+    Drops all build state of a letter, so its next run rebuilds it from scratch.
+
+    Returns:
+        set: IDs of the deleted core units.
+    """
+    removed = remove_words(conn, letter, list(load_letter_words(conn, letter)))
+    set_letter_checkpoint(conn, letter, None, 0)
+    return removed
+
+def load_unit_ids(conn: sqlite3.Connection) -> Set[str]:
+    """
+    Returns the IDs of all core units already in the database.
+    """
+    return {row[0] for row in conn.execute("SELECT id FROM core_units")}
+
+def count_letter_units(conn: sqlite3.Connection, letter: str) -> int:
+    """
+    Returns the number of distinct core units the words of a letter map to.
+    """
+    row = conn.execute("""
+        SELECT COUNT(DISTINCT unit_id) FROM letter_words
+        WHERE letter = ? AND unit_id IS NOT NULL
+    """, (letter,)).fetchone()
+    return row[0]
@@ -5,18 +5,42 @@ from typing import Optional
 import datetime
 import os
 
+from db.search import create_search_tables
+
 DEFAULT_DB_PATH = "storage/core_units.db"
 
-def create_database(db_path: Optional[str] = None) -> sqlite3.Connection:
+# Secondary indexes on core_units, by name
+INDEXES = {
+    "idx_stem": "CREATE INDEX IF NOT EXISTS idx_stem ON core_units(stem);",
+    "idx_concept": "CREATE INDEX IF NOT EXISTS idx_concept ON core_units(concept);"
+}
+
+def create_database(db_path: Optional[str] = None, bulk_load: bool = False,
+                    defer_indexes: bool = False) -> sqlite3.Connection:
     """
     Creates an SQLite database with support for indexes and meta tables.
+
+    Parameters:
+        db_path (str): Database path.
+        bulk_load (bool): Tune the connection for a large build: WAL journaling
+            and relaxed synchronous writes. Call finish_bulk_load() at the end.
+        defer_indexes (bool): Drop the secondary indexes now and build them once
+            in finish_bulk_load(), instead of updating them on every row.
     """
     path = db_path or DEFAULT_DB_PATH
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
     conn = sqlite3.connect(path)
 
+    if bulk_load:
+        conn.execute("PRAGMA journal_mode = WAL;")
+        # NORMAL is still safe against corruption in WAL mode; only the last
+        # transactions may be lost on power failure
+        conn.execute("PRAGMA synchronous = NORMAL;")
+
     try:
-        conn.enable_load_extension(True)
+        # Not every Python build compiles in extension loading
+        if hasattr(conn, "enable_load_extension"):
+            conn.enable_load_extension(True)
         conn.execute("SELECT json('[]')")
     except sqlite3.OperationalError:
         print("⚠️ SQLite does not support JSON1 – some queries may not work.")
@@ -38,22 +62,102 @@ def create_database(db_path: Optional[str] = None) -> sqlite3.Connection:
         )
     """)
 
-    # Meta table
+    create_meta_table(conn)
+
+    # Outcome of every word already built, per letter (unit_id is NULL when
+    # the word produced no unit); used by incremental rebuilds. position is the
+    # word's index in its letter file, built marks the word a unit was built from
     cursor.execute("""
+        CREATE TABLE IF NOT EXISTS letter_words (
+            letter TEXT,
+            word TEXT,
+            unit_id TEXT,
+            position INTEGER,
+            built INTEGER DEFAULT 0,
+            PRIMARY KEY (letter, word)
+        )
+    """)
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(letter_words)")}
+    if "built" not in columns:
+        # Databases from before build order was tracked: the first word
+        # recorded for a unit is the one it was built from
+        cursor.execute("ALTER TABLE letter_words ADD COLUMN position INTEGER")
+        cursor.execute("ALTER TABLE letter_words ADD COLUMN built INTEGER DEFAULT 0")
+        cursor.execute("""
+            UPDATE letter_words SET built = 1 WHERE rowid IN (
+                SELECT MIN(rowid) FROM letter_words WHERE unit_id IS NOT NULL GROUP BY unit_id
+            )
+        """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_letter_words_unit ON letter_words(unit_id);")
+
+    create_activation_table(conn)
+
+    # Full-text index of definitions and examples, kept in sync by db/inserter.py
+    create_search_tables(conn)
+
+    # Indexes
+    if defer_indexes:
+        drop_indexes(conn)
+    else:
+        create_indexes(conn)
+
+    conn.commit()
+    return conn
+
+def create_meta_table(conn: sqlite3.Connection):
+    """
+    Creates the key/value meta table if it does not exist (also used for
+    databases that do not hold core units, e.g. to store metrics reports).
+    """
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS meta (
             key TEXT PRIMARY KEY,
             value TEXT
         )
     """)
 
-    # Indexes
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stem ON core_units(stem);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_concept ON core_units(concept);")
+def create_activation_table(conn: sqlite3.Connection):
+    """
+    Creates the table of unit activations used by core/recall.py: the
+    strength of a unit when it was last activated and the time of that
+    activation (Unix seconds). Decay is applied when the value is read.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS unit_activations (
+            unit_id TEXT PRIMARY KEY,
+            strength REAL,
+            last_activated REAL
+        )
+    """)
 
+def create_indexes(conn: sqlite3.Connection):
+    """
+    Creates the secondary indexes on core_units if they do not exist.
+    """
+    for sql in INDEXES.values():
+        conn.execute(sql)
     conn.commit()
-    return conn
 
-def update_meta(conn: sqlite3.Connection, key: str, value: str):
+def drop_indexes(conn: sqlite3.Connection):
+    """
+    Drops the secondary indexes on core_units (used before a bulk load).
+    """
+    for name in INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name};")
+    conn.commit()
+
+def finish_bulk_load(conn: sqlite3.Connection):
+    """
+    Ends a bulk load: builds any deferred indexes, folds the WAL back into
+    the database file and restores the default rollback journal and full
+    sync, so the finished database is a single self-contained file.
+    """
+    create_indexes(conn)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    conn.execute("PRAGMA journal_mode = DELETE;")
+    conn.execute("PRAGMA synchronous = FULL;")
+
+def update_meta(conn: sqlite3.Connection, key: str, value: str, commit: bool = True):
     """
     Updates or creates a value in the meta table.
     """
@@ -62,7 +166,15 @@ def update_meta(conn: sqlite3.Connection, key: str, value: str):
         INSERT OR REPLACE INTO meta (key, value)
         VALUES (?, ?)
     """, (key, value))
-    conn.commit()
+    if commit:
+        conn.commit()
+
+def get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    """
+    Reads a value from the meta table, or None if the key is not set.
+    """
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
 
 def initialize_meta(conn: sqlite3.Connection):
     """
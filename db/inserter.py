@@ -1,24 +1,29 @@
 # db/inserter.py
 
 import json
-from typing import Dict
+from typing import Dict, Iterable
 
-def insert_unit(conn, unit: Dict[str, str | list], commit: bool = True):
+from core.core_unit import CoreUnit
+from core.metrics import count, timer
+from db.search import UNIT_SEARCH_TABLE, has_table, index_unit_rows, unit_search_row
+
+# Rows sent to executemany at once by insert_units
+DEFAULT_BATCH_SIZE = 1000
+
+INSERT_SQL = """
+    INSERT OR REPLACE INTO core_units (
+        id, stem, concept, pos, main_pos,
+        definition_set, related, source, last_updated
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def unit_to_row(unit: CoreUnit | Dict[str, str | list]) -> tuple:
     """
-    Inserts the smart unit CoreUnit into the core_units table.
-    
-    Parameters:
-        conn (sqlite3.Connection): Database connection.
-        unit (dict): Unit representation.
-        commit (bool): Whether to commit changes immediately.
+    Converts a CoreUnit (or its dict form) into the row tuple of the core_units table.
     """
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT OR REPLACE INTO core_units (
-            id, stem, concept, pos, main_pos,
-            definition_set, related, source, last_updated
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+    if isinstance(unit, CoreUnit):
+        return unit.to_row()
+    return (
         unit["id"],
         unit["stem"],
         unit["concept"],
@@ -28,7 +33,88 @@ def insert_unit(conn, unit: Dict[str, str | list], commit: bool = True):
         json.dumps(unit["related"]),
         unit["source"],
         unit["last_updated"]
-    ))
+    )
+
+# Column order of unit_to_row, for SELECTs read back with row_to_unit
+UNIT_COLUMNS = "id, stem, concept, pos, main_pos, definition_set, related, source, last_updated"
+
+def row_to_unit(row: tuple) -> Dict[str, str | list]:
+    """
+    Converts a core_units row (columns in UNIT_COLUMNS order) back into a CoreUnit.
+    """
+    return {
+        "id": row[0],
+        "stem": row[1],
+        "concept": row[2],
+        "pos": json.loads(row[3]) if row[3] else [],
+        "main_pos": row[4],
+        "definition_set": json.loads(row[5]) if row[5] else [],
+        "related": json.loads(row[6]) if row[6] else [],
+        "source": row[7],
+        "last_updated": row[8]
+    }
+
+def insert_unit(conn, unit: CoreUnit | Dict[str, str | list], commit: bool = True):
+    """
+    Inserts the smart unit CoreUnit into the core_units table.
+    
+    Parameters:
+        conn (sqlite3.Connection): Database connection.
+        unit (dict): Unit representation.
+        commit (bool): Whether to commit changes immediately.
+    """
+    cursor = conn.cursor()
+    cursor.execute(INSERT_SQL, unit_to_row(unit))
+    if has_table(conn, UNIT_SEARCH_TABLE):
+        index_unit_rows(conn, [unit_search_row(unit)])
 
     if commit:
         conn.commit()
+
+def insert_units(conn, units: Iterable[CoreUnit | Dict[str, str | list]], batch_size: int = DEFAULT_BATCH_SIZE,
+                 commit: bool = True) -> int:
+    """
+    Inserts many CoreUnits with executemany, batch_size rows at a time, and
+    indexes them for full-text search (see db/search.py) in the same batches.
+    The iterable is consumed lazily, so it can be a generator.
+
+    Parameters:
+        conn (sqlite3.Connection): Database connection.
+        units (iterable): Unit representations.
+        batch_size (int): Number of rows per executemany call.
+        commit (bool): Whether to commit once all units are inserted.
+
+    Returns:
+        int: Number of inserted units.
+    """
+    cursor = conn.cursor()
+    searchable = has_table(conn, UNIT_SEARCH_TABLE)
+    batch, search_batch = [], []
+    inserted = 0
+
+    def flush():
+        with timer("sqlite.insert"):
+            cursor.executemany(INSERT_SQL, batch)
+        if searchable:
+            with timer("sqlite.search_index"):
+                index_unit_rows(conn, search_batch)
+
+    for unit in units:
+        with timer("sqlite.encode_rows"):
+            batch.append(unit_to_row(unit))
+            if searchable:
+                search_batch.append(unit_search_row(unit))
+        if len(batch) >= batch_size:
+            flush()
+            inserted += len(batch)
+            batch, search_batch = [], []
+
+    if batch:
+        flush()
+        inserted += len(batch)
+
+    if commit:
+        with timer("sqlite.commit"):
+            conn.commit()
+    count("units_inserted", inserted)
+    return inserted
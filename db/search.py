@@ -0,0 +1,288 @@
+# db/search.py
+
+import hashlib
+import json
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Full-text index of the core units: one document per unit, with its definitions
+# and examples flattened out of the definition_set JSON
+UNIT_SEARCH_TABLE = "unit_search"
+# Full-text index of SmartCodeLex examples and docstrings
+CODE_SEARCH_TABLE = "code_search"
+
+# bm25() weight of each indexed column (the unindexed unit_id counts as 0)
+UNIT_COLUMN_WEIGHTS = {"unit_id": 0.0, "stem": 4.0, "concept": 2.0, "definitions": 1.0, "examples": 0.5}
+CODE_COLUMN_WEIGHTS = {"kind": 0.0, "ref": 0.0, "term": 3.0, "text": 1.0}
+
+DEFAULT_LIMIT = 10
+SQL_MAX_VARIABLES = 900       # stays under SQLite's default limit of 999 "?" per statement
+
+# Words of a query; everything else (FTS5 operators, quotes, punctuation) is dropped
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """
+    Whether this SQLite build has the FTS5 extension.
+    """
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def create_search_tables(conn: sqlite3.Connection) -> bool:
+    """
+    Creates the FTS5 tables if they do not exist. Words are stemmed with the
+    porter tokenizer, so "running" finds "runs".
+
+    Returns:
+        bool: False if SQLite has no FTS5 (search is then disabled).
+    """
+    if not fts5_available(conn):
+        print("⚠️ SQLite does not support FTS5 – full-text search is disabled.")
+        return False
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {UNIT_SEARCH_TABLE} USING fts5(
+            unit_id UNINDEXED, stem, concept, definitions, examples,
+            tokenize = 'porter unicode61'
+        )
+    """)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {CODE_SEARCH_TABLE} USING fts5(
+            kind UNINDEXED, ref UNINDEXED, term, text,
+            tokenize = 'porter unicode61'
+        )
+    """)
+    return True
+
+def has_table(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+def doc_rowid(key: str) -> int:
+    """
+    Stable FTS rowid of a document key (a unit ID, or kind:ref for code), so
+    replacing or deleting a document is a rowid lookup instead of a scan.
+    """
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") & 0x7FFF_FFFF_FFFF_FFFF
+
+# =================== Core units ===================
+def unit_search_row(unit: Dict[str, Any]) -> tuple:
+    """
+    Converts a CoreUnit into the row of the unit_search table.
+    """
+    definitions, examples = [], []
+    for entry in unit.get("definition_set") or []:
+        if entry.get("definition"):
+            definitions.append(entry["definition"])
+        if entry.get("example"):
+            examples.append(entry["example"])
+    return (
+        doc_rowid(unit["id"]),
+        unit["id"],
+        unit.get("stem") or "",
+        unit.get("concept") or "",
+        "\n".join(definitions),
+        "\n".join(examples)
+    )
+
+def index_unit_rows(conn: sqlite3.Connection, rows: Iterable[tuple]):
+    """
+    Adds or replaces unit_search rows (see unit_search_row). Does not commit.
+    """
+    conn.executemany(f"""
+        INSERT OR REPLACE INTO {UNIT_SEARCH_TABLE} (rowid, unit_id, stem, concept, definitions, examples)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+
+def unindex_units(conn: sqlite3.Connection, unit_ids: Iterable[str]):
+    """
+    Removes units from the search index, if it exists. Does not commit.
+    """
+    if has_table(conn, UNIT_SEARCH_TABLE):
+        conn.executemany(f"DELETE FROM {UNIT_SEARCH_TABLE} WHERE rowid = ?",
+                         ((doc_rowid(unit_id),) for unit_id in unit_ids))
+
+def rebuild_unit_index(conn: sqlite3.Connection, batch_size: int = 1000) -> int:
+    """
+    Rebuilds unit_search from the core_units table, e.g. for a database
+    created before the index existed.
+
+    Returns:
+        int: Number of indexed units.
+    """
+    if not create_search_tables(conn):
+        return 0
+    conn.execute(f"DELETE FROM {UNIT_SEARCH_TABLE}")
+    cursor = conn.execute("SELECT id, stem, concept, definition_set FROM core_units")
+    indexed = 0
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        index_unit_rows(conn, [
+            unit_search_row({"id": row[0], "stem": row[1], "concept": row[2],
+                             "definition_set": json.loads(row[3]) if row[3] else []})
+            for row in rows
+        ])
+        indexed += len(rows)
+    conn.execute(f"INSERT INTO {UNIT_SEARCH_TABLE} ({UNIT_SEARCH_TABLE}) VALUES ('optimize')")
+    conn.commit()
+    return indexed
+
+# =================== SmartCodeLex examples and docstrings ===================
+def example_search_text(metadata: Dict[str, Any]) -> str:
+    """
+    Searchable text of an example's metadata: its docstring, then the names it calls and uses.
+    """
+    parts = [metadata.get("doc") or ""]
+    for key in ("calls", "vars", "keywords"):
+        parts.append(" ".join(str(name) for name in metadata.get(key) or []))
+    return "\n".join(part for part in parts if part)
+
+def index_code(conn: sqlite3.Connection, examples: Dict[str, Dict] | None = None,
+               docstrings: Dict[str, str] | None = None, commit: bool = True) -> int:
+    """
+    Adds or replaces SmartCodeLex examples ({example id: metadata}) and
+    docstrings ({function name: docstring}) in code_search.
+
+    Returns:
+        int: Number of indexed documents (0 without FTS5).
+    """
+    if not create_search_tables(conn):
+        return 0
+    rows = []
+    for eid, metadata in (examples or {}).items():
+        value = metadata.get("value")
+        rows.append((doc_rowid(f"example:{eid}"), "example", eid,
+                     value if isinstance(value, str) else "", example_search_text(metadata)))
+    for name, doc in (docstrings or {}).items():
+        rows.append((doc_rowid(f"docstring:{name}"), "docstring", name, name, doc))
+    conn.executemany(f"""
+        INSERT OR REPLACE INTO {CODE_SEARCH_TABLE} (rowid, kind, ref, term, text)
+        VALUES (?, ?, ?, ?, ?)
+    """, rows)
+    if commit:
+        conn.commit()
+    return len(rows)
+
+# =================== Queries ===================
+def match_expression(query: str, match_all: bool = True, prefix: bool = False) -> Optional[str]:
+    """
+    Turns free text into an FTS5 MATCH expression: every word is quoted, so
+    user input can never be read as FTS5 syntax.
+
+    Parameters:
+        query (str): Free text.
+        match_all (bool): Require every word (AND); otherwise any word (OR).
+        prefix (bool): Also match words starting with the last query word.
+
+    Returns:
+        str: The expression, or None if the query has no words.
+    """
+    words = _TOKEN_RE.findall(query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    if prefix:
+        terms[-1] += " *"
+    return (" AND " if match_all else " OR ").join(terms)
+
+def _bm25(table: str, weights: Dict[str, float]) -> str:
+    return f"bm25({table}, {', '.join(str(w) for w in weights.values())})"
+
+def search_units(conn: sqlite3.Connection, query: str, limit: int = DEFAULT_LIMIT, match_all: bool = True,
+                 prefix: bool = False, column: Optional[str] = None) -> List[Tuple[str, float]]:
+    """
+    Core units matching the query, best first.
+
+    Parameters:
+        query (str): Free text, e.g. "small domesticated animal".
+        limit (int): Maximum number of results.
+        match_all (bool): Require every query word; otherwise any of them.
+        prefix (bool): Treat the last word as a prefix (search-as-you-type).
+        column (str): Restrict matching to one column: stem, concept,
+            definitions or examples.
+
+    Returns:
+        list: (unit_id, score) pairs; a higher score is a better match.
+    """
+    expression = match_expression(query, match_all, prefix)
+    if expression is None or not has_table(conn, UNIT_SEARCH_TABLE):
+        return []
+    if column is not None:
+        if column not in UNIT_COLUMN_WEIGHTS or column == "unit_id":
+            raise ValueError(f"Unknown search column: {column}")
+        expression = f"{column} : ({expression})"
+    rank = _bm25(UNIT_SEARCH_TABLE, UNIT_COLUMN_WEIGHTS)
+    rows = conn.execute(f"""
+        SELECT unit_id, {rank} AS rank FROM {UNIT_SEARCH_TABLE}
+        WHERE {UNIT_SEARCH_TABLE} MATCH ?
+        ORDER BY rank LIMIT ?
+    """, (expression, limit))
+    # bm25() is lower for better matches; negate it so scores grow with relevance
+    return [(unit_id, -rank) for unit_id, rank in rows]
+
+def search_code(conn: sqlite3.Connection, query: str, limit: int = DEFAULT_LIMIT, kind: Optional[str] = None,
+                match_all: bool = True, prefix: bool = False) -> List[Tuple[str, str, float]]:
+    """
+    SmartCodeLex examples and docstrings matching the query, best first.
+
+    Parameters:
+        kind (str): "example" or "docstring" to search only one of them.
+
+    Returns:
+        list: (kind, ref, score) triples, ref being the example ID or the
+        function name of the docstring.
+    """
+    expression = match_expression(query, match_all, prefix)
+    if expression is None or not has_table(conn, CODE_SEARCH_TABLE):
+        return []
+    rank = _bm25(CODE_SEARCH_TABLE, CODE_COLUMN_WEIGHTS)
+    sql = f"SELECT kind, ref, {rank} AS rank FROM {CODE_SEARCH_TABLE} WHERE {CODE_SEARCH_TABLE} MATCH ?"
+    params: list = [expression]
+    if kind is not None:
+        sql += " AND kind = ?"
+        params.append(kind)
+    rows = conn.execute(sql + " ORDER BY rank LIMIT ?", params + [limit])
+    return [(row_kind, ref, -rank) for row_kind, ref, rank in rows]
+
+def fetch_units(conn: sqlite3.Connection, unit_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Loads the CoreUnits of search results, in the given order.
+    """
+    from db.inserter import UNIT_COLUMNS, row_to_unit
+
+    units = {}
+    for start in range(0, len(unit_ids), SQL_MAX_VARIABLES):
+        chunk = unit_ids[start:start + SQL_MAX_VARIABLES]
+        placeholders = ",".join("?" * len(chunk))
+        for row in conn.execute(f"SELECT {UNIT_COLUMNS} FROM core_units WHERE id IN ({placeholders})", chunk):
+            units[row[0]] = row_to_unit(row)
+    return [units[unit_id] for unit_id in unit_ids if unit_id in units]
+
+# Direct test
+if __name__ == "__main__":
+    import argparse
+    from db.database import DEFAULT_DB_PATH
+
+    parser = argparse.ArgumentParser(description="Full-text search over core units")
+    parser.add_argument('query', type=str)
+    parser.add_argument('--db-path', type=str, default=DEFAULT_DB_PATH)
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT)
+    parser.add_argument('--any', action='store_true', help='Match any query word instead of all of them')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the index from core_units first')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    if args.rebuild:
+        print(f"Indexed {rebuild_unit_index(conn)} units")
+    scores = dict(search_units(conn, args.query, args.limit, match_all=not args.any))
+    for unit in fetch_units(conn, list(scores)):
+        score = scores[unit["id"]]
+        definition = unit["definition_set"][0]["definition"] if unit["definition_set"] else ""
+        print(f"{score:8.3f}  {unit['id']}: {definition}")
+    conn.close()
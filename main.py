@@ -1,88 +1,235 @@
 import json
 import os
 import argparse
-from core.cleaner import clean_word
-from core.core_builder import build_core_unit
-from db.database import create_database, initialize_meta, update_meta
-from db.inserter import insert_unit
-
-SKIPPED_LOG = "logs/skipped.log"
-PROCESSED_LOG = "logs/processed.json"
+from collections import Counter
+from contextlib import nullcontext
+from core import metrics
+from core.core_builder import run_timestamp
+from core.core_unit import json_default
+from core.lookup import get_provider, set_provider
+from core.parallel_builder import build_word, init_worker, iter_built_units
+from db.build_state import (
+    count_letter_units, file_hash, get_letter_checkpoint, load_letter_words, load_unit_ids,
+    record_words, remove_words, reset_letter, set_builder, set_letter_checkpoint, stale_units,
+    update_positions
+)
+from db.database import create_database, finish_bulk_load, initialize_meta, update_meta
+from db.inserter import insert_units
+
+SKIPPED_LOG = "logs/skipped.jsonl"
+PROCESSED_LOG = "logs/processed.jsonl"
+METRICS_REPORT = "logs/metrics_build.json"
 CORE_DIR = "brain/lexical_cores"
+# Words built between two committed checkpoints
+CHECKPOINT_EVERY = 2000
 
 def load_words(file_path):
+    """
+    Returns the word list of a letter file, or None if it cannot be read
+    (an unreadable file leaves the letter's units untouched).
+    """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
         print(f"Failed to load {file_path}: {e}")
-        return []
-
-def log_skipped(skipped):
-    with open(SKIPPED_LOG, 'w', encoding='utf-8') as f:
-        for word in skipped:
-            f.write(f"{word}\n")
-
-def log_processed(units):
-    with open(PROCESSED_LOG, 'w', encoding='utf-8') as f:
-        json.dump(units, f, indent=2, ensure_ascii=False)
-
-def process_letter(letter, conn, global_seen, all_processed, all_skipped):
-    path = os.path.join(CORE_DIR, f"{letter}.json")
-    words = load_words(path)
-    print(f"\nProcessing {letter}.json — {len(words)} words")
-
-    for i, raw_word in enumerate(words):
-        cleaned = clean_word(raw_word)
-        if not cleaned:
-            all_skipped.append(raw_word)
+        return None
+
+def open_log(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Appended, so resumed and incremental runs extend the previous logs;
+    # line buffered, so every JSONL record is flushed as soon as it is written
+    return open(path, 'a', encoding='utf-8', buffering=1)
+
+def log_record(log, record):
+    with metrics.timer("logs.write"):
+        log.write(json.dumps(record, ensure_ascii=False, default=json_default) + "\n")
+
+def iter_new_units(words, global_seen, counts, outcomes, processed_log, skipped_log, pool=None, workers=1):
+    # Units are built by the pool (if any); this process is the single writer
+    # and deduplicates them in word order, exactly like the sequential build
+    for raw_word, unit_id, unit in iter_built_units(words, global_seen, pool, workers):
+        if unit_id is not None and unit_id in global_seen:
+            if unit is None:
+                # Duplicate detected from its ID alone: the full build was skipped
+                counts["avoided"] += 1
+            outcomes.append((raw_word, unit_id, False))
+            counts["skipped"] += 1
+            log_record(skipped_log, {"word": raw_word, "reason": "duplicate"})
             continue
 
-        unit = build_core_unit(raw_word, cleaned)
-        if not unit or unit["id"] in global_seen:
-            all_skipped.append(raw_word)
+        if not unit:
+            outcomes.append((raw_word, None, False))
+            counts["skipped"] += 1
+            log_record(skipped_log, {"word": raw_word, "reason": "no_unit"})
             continue
 
-        insert_unit(conn, unit, commit=False)
-        global_seen.add(unit["id"])
-        all_processed.append(unit)
-
-        if i % 500 == 0:
-            print(f"{i}/{len(words)} | Total: {len(global_seen)} saved")
+        outcomes.append((raw_word, unit_id, True))
+        global_seen.add(unit_id)
+        counts["saved"] += 1
+        log_record(processed_log, unit)
+        yield unit
+
+def rebuild_stale_units(conn, unit_ids, processed_log):
+    # A unit whose first word (in build order) was removed, or now follows an
+    # added word with the same ID, is rebuilt from the word a full build uses
+    for unit_id, letter, word in stale_units(conn, unit_ids):
+        key, unit = build_word(word)
+        if unit is None or key != unit_id:
+            continue
+        insert_units(conn, [unit], commit=False)
+        set_builder(conn, unit_id, letter, word)
+        log_record(processed_log, unit)
 
-    conn.commit()
-    update_meta(conn, f"letter_{letter}_count", str(len(all_processed)))
+def process_letter(letter, conn, global_seen, processed_log, skipped_log, pool=None, workers=1) -> Counter:
+    counts = Counter(saved=0, skipped=0, avoided=0)
+    path = os.path.join(CORE_DIR, f"{letter}.json")
+    with metrics.timer("load_words"):
+        words = load_words(path)
+    if words is None:
+        return counts
+
+    digest = file_hash(path)
+    stored_digest, offset = get_letter_checkpoint(conn, letter)
+    if not words:
+        if stored_digest != digest:
+            # Emptied word list: the units built from its previous words go too
+            built = load_letter_words(conn, letter)
+            removed = remove_words(conn, letter, list(built))
+            global_seen.difference_update(removed)
+            rebuild_stale_units(conn, set(built.values()) - removed - {None}, processed_log)
+            set_letter_checkpoint(conn, letter, digest, 0)
+            update_meta(conn, f"letter_{letter}_count", "0")
+            print(f"\n{letter}.json is empty — removed {len(removed)} units")
+        return counts
+    if stored_digest == digest and offset >= len(words):
+        print(f"\n{letter}.json unchanged — skipped")
+        return counts
+
+    positions = {}
+    for position, word in enumerate(words):
+        positions.setdefault(word, position)
+    built = load_letter_words(conn, letter)
+    if stored_digest != digest:
+        # New or edited word list: forget removed words, build only the added ones
+        removed = remove_words(conn, letter, set(built) - set(positions))
+        global_seen.difference_update(removed)
+        update_positions(conn, letter, {w: p for w, p in positions.items() if w in built})
+        rebuild_stale_units(conn, set(built.values()) - removed - {None}, processed_log)
+        set_letter_checkpoint(conn, letter, digest, 0)
+        offset = 0
+
+    resume = f", resuming at word {offset}" if offset else ""
+    print(f"\nProcessing {letter}.json — {len(words)} words{resume}")
+
+    while offset < len(words):
+        end = min(offset + CHECKPOINT_EVERY, len(words))
+        # Repeated words are built (and recorded) at their first position only
+        todo = [w for i, w in enumerate(words[offset:end], offset) if w not in built and positions[w] == i]
+        outcomes = []
+        new_units = iter_new_units(todo, global_seen, counts, outcomes, processed_log, skipped_log, pool, workers)
+        with metrics.profiled():
+            insert_units(conn, new_units, commit=False)
+        with metrics.timer("sqlite.checkpoint"):
+            record_words(conn, letter, [(w, unit_id, positions[w], b) for w, unit_id, b in outcomes])
+            rebuild_stale_units(conn, {unit_id for _, unit_id, b in outcomes if unit_id and not b}, processed_log)
+            # Units, word outcomes and the checkpoint are committed together
+            set_letter_checkpoint(conn, letter, digest, end)
+        metrics.count("words_processed", len(todo))
+        offset = end
+        print(f"{offset}/{len(words)} | Total: {len(global_seen)} saved")
+
+    update_meta(conn, f"letter_{letter}_count", str(count_letter_units(conn, letter)))
+    update_meta(conn, f"letter_{letter}_avoided", str(counts["avoided"]))
+    print(f"{counts['avoided']} duplicate builds avoided")
+    return counts
 
 def main():
     parser = argparse.ArgumentParser(description="Run Smart Lexical Core System")
     parser.add_argument('--letter', type=str, help='Specify a single letter to process (e.g. a or c)', default=None)
     parser.add_argument('--db-path', type=str, help='Database path', default="storage/core_units.db")
+    parser.add_argument('--workers', type=int, help='Number of worker processes building units (default: 1)', default=1)
+    parser.add_argument('--lexicon', choices=["wordnet", "snapshot"], default=None,
+                        help='WordNet source: NLTK (default), or the snapshot exported by core.lexicon_snapshot')
+    parser.add_argument('--rebuild', action='store_true', help='Ignore checkpoints and rebuild the letters from scratch')
+    parser.add_argument('--metrics', action='store_true', help=f'Time every stage; report in {METRICS_REPORT} and the meta table')
+    parser.add_argument('--profile', action='store_true', help='With --metrics, run cProfile over the build loop')
+    parser.add_argument('--sample', action='store_true', help='With --metrics, sample the running function every 5 ms')
     args = parser.parse_args()
 
-    conn = create_database(db_path=args.db_path)
-    initialize_meta(conn)
+    if args.metrics:
+        metrics.enable(profile=args.profile, sample=args.sample)
 
-    seen_ids = set()
-    processed_units = []
-    skipped_words = []
+    if args.workers < 1:
+        print("--workers must be at least 1")
+        return
 
     if args.letter:
-        letter = args.letter.lower()
-        if len(letter) != 1 or not letter.isalpha():
+        letters = args.letter.lower()
+        if len(letters) != 1 or not letters.isalpha():
             print("Please enter a single letter only, e.g.: --letter c")
             return
-        process_letter(letter, conn, seen_ids, processed_units, skipped_words)
     else:
-        for letter in 'abcdefghijklmnopqrstuvwxyz':
-            process_letter(letter, conn, seen_ids, processed_units, skipped_words)
+        letters = 'abcdefghijklmnopqrstuvwxyz'
+
+    if args.lexicon:
+        set_provider(args.lexicon)
+    if args.lexicon == "snapshot":
+        provider = get_provider()
+        try:
+            provider.ensure_loaded()
+        except (LookupError, ValueError) as e:
+            print(f"WordNet snapshot is not available: {e}")
+            return
+        # The snapshot is not checked against the installed NLTK data: say which WordNet it holds
+        print(f"Lexicon: {provider.path} (exported from WordNet {provider.snapshot.wordnet_version or 'unknown'})")
+
+    if args.workers > 1:
+        # Load WordNet before forking: workers inherit the loaded corpus (or
+        # the mapped snapshot), and a missing corpus fails here instead of in
+        # every pool initializer
+        try:
+            init_worker(args.metrics, run_timestamp())
+        except LookupError as e:
+            print(f"WordNet is not available: {e}")
+            return
 
-    print(f"\n{len(processed_units)} core units saved to the database.")
-    if skipped_words:
-        print(f"{len(skipped_words)} words skipped – see {SKIPPED_LOG}")
-        log_skipped(skipped_words)
+    # Indexes are dropped for the load and rebuilt once in finish_bulk_load
+    conn = create_database(db_path=args.db_path, bulk_load=True, defer_indexes=True)
+    initialize_meta(conn)
+
+    if args.rebuild:
+        for letter in letters:
+            reset_letter(conn, letter)
 
-    log_processed(processed_units)
-    update_meta(conn, "core_count", str(len(processed_units)))
+    # Units already in the database count as seen, so incremental runs only add new IDs
+    seen_ids = load_unit_ids(conn)
+    totals = Counter(saved=0, skipped=0, avoided=0)
+
+    if args.workers > 1:
+        # multiprocessing is only imported by runs that use it
+        from multiprocessing import Pool
+        pool_context = Pool(args.workers, initializer=init_worker, initargs=(args.metrics, run_timestamp()))
+    else:
+        pool_context = nullcontext()
+    with pool_context as pool, open_log(PROCESSED_LOG) as processed_log, open_log(SKIPPED_LOG) as skipped_log:
+        for letter in letters:
+            totals.update(process_letter(letter, conn, seen_ids, processed_log, skipped_log, pool, args.workers))
+
+    print(f"\n{totals['saved']} core units saved to the database – see {PROCESSED_LOG}")
+    if totals["skipped"]:
+        print(f"{totals['skipped']} words skipped – see {SKIPPED_LOG}")
+    if totals["avoided"]:
+        print(f"{totals['avoided']} duplicates detected from their ID before the full build")
+
+    update_meta(conn, "core_count", str(len(seen_ids)))
+    with metrics.timer("sqlite.finish_bulk_load"):
+        finish_bulk_load(conn)
+    if args.metrics:
+        for name, value in totals.items():
+            metrics.count(f"units_{name}", value)
+        metrics.write_report(METRICS_REPORT, conn, "metrics_build", extra={"workers": args.workers})
+        print(f"Metrics report saved to {METRICS_REPORT} (meta key metrics_build)")
     conn.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+# tests/legacy.py
+#
+# Frozen copies of the implementations the optimized code replaced, and of
+# the synthetic inputs the equivalence tests feed both. Tests compare against
+# these, so they must not change with the code under test; the benchmarks
+# import them from here.
+
+import random
+import re
+from difflib import SequenceMatcher
+from typing import Any, Dict, List
+
+from core.concept_extractor import NON_CONCEPTS, PRIORITY_KEYWORDS
+from SmartCodeLex.builder.ast_walker import collect_metadata
+
+def legacy_clean_word(word):
+    """
+    The regex implementation the three clean_word copies shared before core/normalizer.py.
+    """
+    if not isinstance(word, str):
+        return None
+    word = word.replace("_", " ").replace("-", " ").lower()
+    word = re.sub(r'[^a-z\s]', '', word)
+    word = re.sub(r'\s+', ' ', word).strip()
+    return word if word else None
+
+SYLLABLES = ["ra", "to", "mi", "ne", "lu", "ka", "sor", "ven", "dal", "pri", "ex", "ing", "er", "ly", "tion"]
+NAMES = ["get_value", "setName", "HTTPServer", "load_data", "os", "path", "join", "self", "parse_args", "config"]
+
+def recursive_metadata(example_json):
+    """
+    The recursive walker that ast_walker replaced, kept as the baseline.
+    """
+    calls, vars_, keywords = set(), set(), set()
+    doc, param_count, return_type, max_depth, total_children = "", 0, "", 0, 0
+
+    def recurse(node, depth=1):
+        nonlocal doc, param_count, return_type, max_depth, total_children
+        max_depth = max(max_depth, depth)
+        if isinstance(node, dict):
+            total_children += 1
+            typ = node.get("type")
+            if typ == "Call":
+                for c in node.get("children", []):
+                    if isinstance(c, dict) and c.get("type") in {"NameLoad", "AttributeLoad"}:
+                        if isinstance(c.get("value"), str):
+                            calls.add(c["value"])
+            elif typ in {"NameStore", "NameLoad", "arg"}:
+                if isinstance(node.get("value"), str):
+                    vars_.add(node["value"])
+            elif typ == "keyword":
+                if isinstance(node.get("value"), str):
+                    keywords.add(node["value"])
+            elif typ == "arguments":
+                param_count += sum(1 for arg in node.get("children", []) if isinstance(arg, dict) and arg.get("type") == "arg")
+            elif typ == "Return":
+                for c in node.get("children", []):
+                    if isinstance(c, dict):
+                        return_type = c.get("type", "")
+            elif typ == "Expr":
+                for gc in node.get("children", []):
+                    if isinstance(gc, dict) and gc.get("type") == "Str":
+                        val = gc.get("value")
+                        if isinstance(val, str) and len(val.strip()) > 10:
+                            doc = val.strip()
+            for child in node.values():
+                if isinstance(child, (list, dict)):
+                    recurse(child, depth + 1)
+        elif isinstance(node, list):
+            for item in node:
+                recurse(item, depth)
+
+    recurse(example_json)
+    return {
+        "type": example_json.get("type", ""),
+        "value": example_json.get("value", ""),
+        "doc": doc,
+        "calls": sorted(calls),
+        "vars": sorted(vars_),
+        "keywords": sorted(keywords),
+        "param_count": param_count,
+        "return_type": return_type,
+        "depth": max_depth,
+        "child_count": total_children,
+        "complexity_score": len(calls) + len(vars_) + len(keywords) + param_count + max_depth
+    }
+
+def synthetic_call(rng, depth):
+    children = [{"type": rng.choice(["NameLoad", "AttributeLoad"]), "value": rng.choice(NAMES)}]
+    if depth < 4 and rng.random() < 0.6:
+        children.append(synthetic_call(rng, depth + 1))
+    if rng.random() < 0.3:
+        children.append({"type": "keyword", "value": rng.choice(NAMES), "children": [{"type": "Num", "value": "1"}]})
+    return {"type": "Call", "children": children}
+
+def synthetic_function(rng, index):
+    """
+    A FunctionDef node shaped like the nested-dict examples of the extractor.
+    """
+    body = []
+    if rng.random() < 0.5:
+        body.append({"type": "Expr", "children": [{"type": "Str", "value": f"Docstring explaining function {index}"}]})
+    for _ in range(rng.randint(1, 6)):
+        body.append({"type": "Assign", "children": [{"type": "NameStore", "value": rng.choice(NAMES)}, synthetic_call(rng, 0)]})
+    body.append({"type": "Return", "children": [synthetic_call(rng, 0)]})
+    return {
+        "type": "FunctionDef",
+        "value": f"{rng.choice(NAMES)}_{index}",
+        "children": [
+            {"type": "arguments", "children": [{"type": "arg", "value": "a"}, {"type": "arg", "value": "b"}]},
+            {"type": "body", "children": body}
+        ]
+    }
+
+def flatten(root: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Nested-dict AST -> py150 node list (pre-order, index children)."""
+    nodes, stack = [], [(root, None)]
+    while stack:
+        node, parent = stack.pop()
+        index = len(nodes)
+        json_node = {"type": node["type"]}
+        if "value" in node:
+            json_node["value"] = node["value"]
+        nodes.append(json_node)
+        if parent is not None:
+            nodes[parent].setdefault("children", []).append(index)
+        for child in reversed(node.get("children", [])):
+            stack.append((child, index))
+    return nodes
+
+def example_bank(count: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """
+    {eid: metadata} bank like the extractor's, without raws.
+    """
+    rng = random.Random(seed)
+    return {f"E{i + 1:05}": collect_metadata(synthetic_function(rng, i), include_raw=False) for i in range(count)}
+
+def bank_terms(count: int, seed: int = 0) -> List[str]:
+    """
+    Terms to match against an example bank: identifiers, parts of them and misses.
+    """
+    rng = random.Random(seed)
+    parts = [part for name in NAMES for part in name.lower().split("_")]
+    terms = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            terms.append(rng.choice(NAMES).lower())
+        elif kind < 0.8:
+            terms.append(rng.choice(parts))
+        else:
+            terms.append("".join(rng.choice(SYLLABLES) for _ in range(3)))
+    return terms
+
+def linear_match(term, bank):
+    """
+    The linear scan match_examples did before ExampleIndex.
+    """
+    matches, t = [], term.lower()
+    for eid, meta in bank.items():
+        if t in meta["value"].lower() or t in " ".join(meta["calls"]).lower() or t in " ".join(meta["vars"]).lower():
+            matches.append(eid)
+        elif SequenceMatcher(None, t, meta["value"].lower()).ratio() > 0.7:
+            matches.append(eid)
+        if len(matches) >= 3:
+            break
+    return matches
+
+FILLER = ["small", "large", "used", "for", "with", "that", "which", "made", "from", "water", "energy",
+          "person", "part", "having", "body", "light", "plane", "wings", "data", "river"]
+
+def legacy_extract_concept(definitions: List[str], compound: bool = True) -> str:
+    """
+    The per-definition findall/filter implementation extract_concept replaced, kept as the reference.
+    """
+    if not definitions:
+        return "unknown"
+
+    for definition in definitions[:3]:
+        words = re.findall(r'\b\w+\b', definition.lower())
+        filtered = [w for w in words if w not in NON_CONCEPTS]
+
+        for word in filtered:
+            if word in PRIORITY_KEYWORDS:
+                return word
+
+        if compound and len(filtered) >= 2:
+            return f"{filtered[0]} {filtered[1]}"
+        elif filtered:
+            return filtered[0]
+
+    return "unknown"
+
+def definition_lists(count: int, seed: int = 0) -> List[List[str]]:
+    """
+    1-3 WordNet-like definitions per word, mixing stopwords, priority
+    keywords (about one definition in three), capitals and punctuation.
+    Definitions come from a pool of 0.7 per word, since WordNet shares a
+    synset's definition between its lemmas.
+    """
+    rng = random.Random(seed)
+    vocabulary = FILLER + sorted(NON_CONCEPTS)
+    keywords = sorted(PRIORITY_KEYWORDS)
+    pool = []
+    for _ in range(max(1, count * 7 // 10)):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(3, 14))]
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        if rng.random() < 0.1:
+            words = [rng.choice(sorted(NON_CONCEPTS)) for _ in words]
+        text = " ".join(words)
+        pool.append((text.capitalize() if rng.random() < 0.2 else text) + rng.choice(["", ".", ";"]))
+    return [[rng.choice(pool) for _ in range(rng.randint(1, 3))] for _ in range(count)]
@@ -0,0 +1,25 @@
+# tests/test_concept_extractor.py
+
+import pytest
+
+from core.concept_extractor import ConceptExtractor, extract_concept, extract_concepts
+from tests.legacy import definition_lists, legacy_extract_concept
+
+@pytest.mark.parametrize("compound", [True, False])
+def test_extract_concepts_matches_legacy(compound):
+    lists = definition_lists(5000, seed=11)
+    assert extract_concepts(lists, compound) == [legacy_extract_concept(definitions, compound) for definitions in lists]
+
+@pytest.mark.parametrize("definitions", [
+    [], [""], ["the of a"], ["A tool_like, device-ish thing."], ["naïve café structure"],
+    ["a type of", "an electronic device that stores data."], ["x\ty\nz"], ["one two three four"]
+])
+def test_edge_cases_match_legacy(definitions):
+    for compound in (True, False):
+        assert extract_concept(definitions, compound) == legacy_extract_concept(definitions, compound)
+
+def test_cache_does_not_change_results():
+    extractor = ConceptExtractor(cache_size=8)
+    lists = definition_lists(500, seed=12)
+    assert extractor.extract_many(lists) == extractor.extract_many(lists) == \
+           [legacy_extract_concept(definitions) for definitions in lists]
@@ -0,0 +1,30 @@
+# tests/test_example_index.py
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from SmartCodeLex.builder.example_index import ExampleIndex
+from tests.legacy import bank_terms, example_bank, linear_match
+
+@pytest.fixture(scope="module")
+def bank():
+    return example_bank(400, seed=3)
+
+def test_match_equals_linear_scan(bank):
+    index = ExampleIndex(bank)
+    terms = bank_terms(300, seed=4) + ["", "a", "ab", "GET_VALUE", "x" * 40]
+    for term in terms:
+        assert index.match(term) == linear_match(term, bank), term
+
+def test_match_on_hand_written_bank():
+    bank = {
+        "E00001": {"value": "load_data", "calls": ["open", "json.load"], "vars": ["path"]},
+        "E00002": {"value": "loader", "calls": [], "vars": []},
+        "E00003": {"value": "", "calls": ["load"], "vars": ["data"]},
+        "E00004": {"value": "save_data", "calls": [], "vars": ["load_path"]},
+        "E00005": {"value": "lode", "calls": [], "vars": []}
+    }
+    index = ExampleIndex(bank)
+    for term in ("load", "data", "lode", "path", "saved", "missing", "lo"):
+        assert index.match(term) == linear_match(term, bank), term
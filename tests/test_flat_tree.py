@@ -0,0 +1,33 @@
+# tests/test_flat_tree.py
+
+import json
+import random
+
+import pytest
+
+from SmartCodeLex.builder.ast_walker import collect_metadata
+from SmartCodeLex.builder.flat_tree import FlatTree, collect_flat_metadata, json_default
+from tests.legacy import flatten, recursive_metadata, synthetic_function
+
+def without_raw(metadata):
+    return {key: value for key, value in metadata.items() if key != "raw"}
+
+@pytest.fixture(scope="module")
+def functions():
+    rng = random.Random(7)
+    return [synthetic_function(rng, i) for i in range(200)]
+
+def test_flat_metadata_equals_dict_metadata(functions):
+    for function in functions:
+        tree = FlatTree.from_nodes(flatten(function))
+        assert collect_flat_metadata(tree, 0, include_raw=False) == collect_metadata(function, include_raw=False)
+
+def test_dict_metadata_equals_recursive_walker(functions):
+    for function in functions:
+        assert without_raw(collect_metadata(function)) == without_raw(recursive_metadata(function))
+
+def test_flat_raw_expands_to_the_subtree(functions):
+    for function in functions[:20]:
+        nodes = flatten(function)
+        raw = collect_flat_metadata(FlatTree.from_nodes(nodes), 0)["raw"]
+        assert json.loads(json.dumps(raw, default=json_default)) == nodes
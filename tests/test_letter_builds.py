@@ -0,0 +1,75 @@
+# tests/test_letter_builds.py
+
+import io
+import json
+
+import pytest
+
+import main
+from core import lookup
+from db.database import create_database
+
+@pytest.fixture
+def build(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "CORE_DIR", str(tmp_path))
+    monkeypatch.setattr(lookup, "_provider", lookup.StubProvider())
+    lookup.clear_caches()
+    conn = create_database(db_path=str(tmp_path / "core.db"))
+    seen = set()
+
+    def run(letter, words):
+        (tmp_path / f"{letter}.json").write_text(json.dumps(words))
+        return main.process_letter(letter, conn, seen, io.StringIO(), io.StringIO())
+
+    yield conn, seen, run
+    conn.close()
+    lookup.clear_caches()
+
+def unit_count(conn):
+    return conn.execute("SELECT COUNT(*) FROM core_units").fetchone()[0]
+
+def test_emptied_letter_removes_its_units(build):
+    conn, seen, run = build
+    run("a", ["apple", "anchor", "arrow", "atlas", "amber", "acorn"])
+    assert unit_count(conn) > 0
+    run("a", [])
+    assert unit_count(conn) == 0 and not seen
+    assert conn.execute("SELECT COUNT(*) FROM letter_words").fetchone()[0] == 0
+
+def unit_rows(conn):
+    rows = conn.execute("SELECT * FROM core_units ORDER BY id")
+    columns = [c[0] for c in rows.description]
+    return [{k: v for k, v in zip(columns, row) if k != "last_updated"} for row in rows]
+
+def fresh_rows(tmp_path, words):
+    fresh = tmp_path / "fresh"
+    fresh.mkdir()
+    (fresh / "a.json").write_text(json.dumps(words))
+    conn = create_database(db_path=str(fresh / "core.db"))
+    try:
+        main.CORE_DIR = str(fresh)
+        main.process_letter("a", conn, set(), io.StringIO(), io.StringIO())
+        return unit_rows(conn)
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize("before, after", [
+    # The word a shared unit was built from is removed
+    (["arrow", "arrows", "apple"], ["arrows", "apple"]),
+    # A word with the same unit ID is added in front of its builder
+    (["arrows", "apple"], ["arrow", "arrows", "apple"]),
+    (["apple", "anchor", "arrow", "atlas", "amber", "acorn"], ["apple"]),
+])
+def test_incremental_edit_matches_fresh_build(build, tmp_path, before, after):
+    conn, seen, run = build
+    run("a", before)
+    run("a", after)
+    assert unit_rows(conn) == fresh_rows(tmp_path, after)
+
+def test_unreadable_letter_keeps_its_units(build, tmp_path):
+    conn, seen, run = build
+    run("a", ["apple", "anchor", "arrow", "atlas", "amber", "acorn"])
+    before = unit_count(conn)
+    (tmp_path / "a.json").write_text("[not json")
+    main.process_letter("a", conn, seen, io.StringIO(), io.StringIO())
+    assert unit_count(conn) == before
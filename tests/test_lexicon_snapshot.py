@@ -0,0 +1,112 @@
+# tests/test_lexicon_snapshot.py
+
+import random
+
+import pytest
+
+from core.lexicon_snapshot import LexiconSnapshot, export_snapshot, synset_record
+
+reader = pytest.importorskip("nltk.corpus.reader.wordnet")
+WordNetCorpusReader = reader.WordNetCorpusReader
+
+class FixtureLemma:
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        return self._name
+
+class FixtureSynset:
+    def __init__(self, pos, definition, examples, lemmas):
+        self._pos, self._definition, self._examples, self._lemmas = pos, definition, examples, lemmas
+
+    def pos(self):
+        return self._pos
+
+    def definition(self):
+        return self._definition
+
+    def examples(self):
+        return self._examples
+
+    def lemmas(self):
+        return [FixtureLemma(name) for name in self._lemmas]
+
+class FixtureWordNet:
+    """
+    A small WordNet in memory, read through NLTK's own _morphy and synsets:
+    made-up lemmas (many ending like inflections), satellite adjectives and
+    exception lists, so every rule of morphy is exercised.
+    """
+    MORPHOLOGICAL_SUBSTITUTIONS = WordNetCorpusReader.MORPHOLOGICAL_SUBSTITUTIONS
+    _morphy = WordNetCorpusReader._morphy
+    synsets = WordNetCorpusReader.synsets
+
+    def __init__(self, seed=0):
+        rng = random.Random(seed)
+        syllables = ["ra", "to", "mi", "ne", "ka", "y", "es", "e", "ing", "ed", "ch", "sh", "x"]
+        self.words = sorted({"".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))) for _ in range(3000)})
+        self._lemma_pos_offset_map = {}
+        self._data = {}
+        offsets = dict.fromkeys("nvar", 0)
+        for word in self.words:
+            entry = self._lemma_pos_offset_map.setdefault(word, {})
+            for pos in "nvar":
+                if rng.random() < 0.35:
+                    entry[pos] = []
+                    for _ in range(rng.randint(1, 3)):
+                        offsets[pos] += rng.randint(1, 50)
+                        offset = offsets[pos]
+                        synset_pos = "s" if pos == "a" and rng.random() < 0.4 else pos
+                        examples = [f"a {word} example"] if rng.random() < 0.5 else []
+                        self._data[(pos, offset)] = FixtureSynset(synset_pos, f"{word} sense {offset} é", examples,
+                                                                  [word, f"{word}_x"])
+                        entry[pos].append(offset)
+                    if pos == "a":
+                        entry["s"] = [o for o in entry["a"] if self._data[("a", o)].pos() == "s"]
+        self._exception_map = {pos: {rng.choice(self.words) + "zz": rng.sample(self.words, rng.randint(1, 2))
+                                     for _ in range(50)} for pos in "nvar"}
+        self._exception_map["s"] = self._exception_map["a"]
+
+    def ensure_loaded(self):
+        pass
+
+    def get_version(self):
+        return "fixture"
+
+    def synset_from_pos_and_offset(self, pos, offset):
+        return self._data[(pos, offset)]
+
+@pytest.fixture(scope="module")
+def wordnet():
+    return FixtureWordNet()
+
+@pytest.fixture(scope="module")
+def snapshot(wordnet, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("snapshot") / "wordnet.snapshot")
+    export_snapshot(path, wordnet)
+    snapshot = LexiconSnapshot(path)
+    yield snapshot
+    snapshot.close()
+
+def probes(wordnet):
+    inflected = [word + suffix for word in wordnet.words[::5] for suffix in ("s", "es", "ed", "ing", "er", "est", "ies")]
+    exceptions = [form for pos in "nvar" for form in wordnet._exception_map[pos]]
+    return wordnet.words[::2] + inflected + exceptions + ["Ra", "missing", "ra_x", ""]
+
+def test_synsets_match_nltk(wordnet, snapshot):
+    for word in probes(wordnet):
+        assert [synset_record(s) for s in snapshot.synsets(word)] == \
+               [synset_record(s) for s in wordnet.synsets(word)], word
+
+def test_lemmatize_matches_nltk_morphy(wordnet, snapshot):
+    for word in probes(wordnet):
+        for pos in "nvars":
+            # WordNetLemmatizer.lemmatize: the shortest of _morphy's forms, or the word itself
+            lemmas = wordnet._morphy(word, pos)
+            assert snapshot.lemmatize(word, pos) == (min(lemmas, key=len) if lemmas else word), (word, pos)
+
+def test_version_mismatch_is_refused(snapshot):
+    assert snapshot.wordnet_version == "fixture"
+    with pytest.raises(ValueError):
+        LexiconSnapshot(snapshot.path, wordnet_version="3.0")
@@ -0,0 +1,24 @@
+# tests/test_normalizer.py
+
+import sys
+
+from core.normalizer import clean_word, clean_words
+from tests.legacy import legacy_clean_word
+
+def code_points():
+    # Every BMP character except surrogates, and a sample of the other planes
+    for codepoint in range(0x10000):
+        if not 0xD800 <= codepoint <= 0xDFFF:
+            yield chr(codepoint)
+    for codepoint in range(0x10000, sys.maxunicode + 1, 97):
+        yield chr(codepoint)
+
+def test_clean_word_matches_legacy_on_every_code_point():
+    for char in code_points():
+        for word in (char, f"ab{char}cd", f"{char} x_{char}-Y ", char * 3):
+            assert clean_word(word) == legacy_clean_word(word), repr(word)
+
+def test_clean_words_matches_clean_word():
+    words = ["Cat", "  multiple   spaces ", "Café", "data-driven", "NAÏVE", "!!!", None, "this_is_clean",
+             "12345", "   ", "İstanbul", "ǅemal", "K", "tab\there", "snake_Case-ID2", 42]
+    assert clean_words(words) == [legacy_clean_word(word) for word in words] == [clean_word(word) for word in words]
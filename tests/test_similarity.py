@@ -0,0 +1,72 @@
+# tests/test_similarity.py
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from core.similarity import SimilarityIndex
+
+TEXTS = {
+    "DOG_N_CORE": "a domesticated carnivorous mammal kept as a pet",
+    "CAT_N_CORE": "a small domesticated feline mammal",
+    "ROUTER_N_CORE": "a device that forwards data packets between networks",
+    "MODEM_N_CORE": "an electronic device that converts signals for data transmission",
+    "RIVER_N_CORE": "a large natural stream of water flowing to the sea"
+}
+
+def make_index(compact=True):
+    index = SimilarityIndex(n_features=1 << 12)
+    index.add(list(TEXTS), list(TEXTS.values()))
+    if compact:
+        index.compact()
+    return index
+
+def ids(results):
+    return [unit_id for unit_id, _ in results]
+
+@pytest.mark.parametrize("compact_before", [True, False])
+@pytest.mark.parametrize("compact_after", [True, False])
+def test_readded_unit_replaces_its_vector(compact_before, compact_after):
+    index = make_index(compact_before)
+    # Re-adding the first unit moves every later unit up at the next compaction
+    index.add(["DOG_N_CORE"], ["a router forwarding packets between networks"])
+    if compact_after:
+        index.compact()
+
+    assert len(index) == len(TEXTS)
+    # The old vector no longer matches, the new one does, and only once
+    assert "DOG_N_CORE" not in ids(index.query(["carnivorous pet"], k=5)[0])
+    routers = ids(index.query(["router forwarding packets"], k=5)[0])
+    assert routers.count("DOG_N_CORE") == 1
+    assert ids(index.neighbours(["ROUTER_N_CORE"], k=1)[0]) == ["DOG_N_CORE"]
+    for unit_id, results in zip(TEXTS, index.neighbours(list(TEXTS), k=10)):
+        assert unit_id not in ids(results)
+
+def test_readded_within_one_batch_keeps_the_last_text():
+    index = SimilarityIndex(n_features=1 << 12)
+    index.add(["A", "B", "A"], ["feline mammal", "data packets", "water stream"])
+    index.compact()
+    assert len(index) == 2 and index.ids == ["B", "A"]
+    assert ids(index.query(["water stream"], k=1)[0]) == ["A"]
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_neighbours_exclude_the_unit_itself(compact):
+    index = make_index(compact)
+    index.add(["SWITCH_N_CORE"], ["a networking device connecting data segments"])
+    neighbours = index.neighbours(list(TEXTS) + ["SWITCH_N_CORE"], k=10)
+    for unit_id, results in zip(list(TEXTS) + ["SWITCH_N_CORE"], neighbours):
+        assert unit_id not in ids(results)
+    assert ids(neighbours[0])[0] == "CAT_N_CORE"
+    with pytest.raises(KeyError):
+        index.neighbours(["MISSING"])
+
+def test_save_load_round_trip(tmp_path):
+    index = make_index(compact=False)
+    index.add(["CAT_N_CORE"], ["a domesticated feline pet mammal"])
+    queries = ["pet mammal", "network data device", "water"]
+    expected = index.query(queries, k=3), index.neighbours(list(TEXTS), k=3)
+
+    index.save(str(tmp_path))
+    loaded = SimilarityIndex.load(str(tmp_path))
+    assert loaded.ids == index.ids
+    assert (loaded.query(queries, k=3), loaded.neighbours(list(TEXTS), k=3)) == expected
@@ -0,0 +1,109 @@
+# tests/test_stage_cache.py
+
+import json
+import random
+
+import pytest
+
+from SmartCodeLex.builder import shards, smartcodelex_extractor as extractor
+from SmartCodeLex.builder.stage_cache import StageCache, code_fingerprint
+from SmartCodeLex.languages.python import build_corpus
+from tests.legacy import flatten, synthetic_function
+
+DOWNSTREAM = {
+    "ingest": ["ingest", "normalize_terms", "classify", "link"],
+    "normalize_terms": ["normalize_terms", "classify", "link"],
+    "classify": ["classify", "link"],
+    "link": ["link"]
+}
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "ast.jsonl"
+    path.write_text('[{"type": "Module", "children": [1]}, {"type": "NameLoad", "value": "parser"}]\n')
+    return str(path)
+
+@pytest.fixture
+def cache(tmp_path):
+    return StageCache(str(tmp_path / "cache"))
+
+def replaced(stage, old, new):
+    return dict(extractor.STAGE_CODE, **{stage: tuple(new if obj is old else obj for obj in extractor.STAGE_CODE[stage])})
+
+def test_ingest_key_covers_its_helpers():
+    for helper in (extractor.extract_lines, extractor.ingest_ast, extractor.ingest_shard, extractor.example_id,
+                   extractor.TermExampleCollector, shards, build_corpus):
+        assert any(obj is helper for obj in extractor.STAGE_CODE["ingest"])
+
+@pytest.mark.parametrize("stage, helper", [
+    ("ingest", extractor.example_id),
+    ("ingest", shards),
+    ("normalize_terms", extractor.normalize_terms),
+    ("classify", extractor.classify_term),
+    ("link", extractor.match_examples)
+])
+def test_changed_helper_invalidates_downstream_keys(cache, corpus, stage, helper):
+    def edited(index):
+        return f"X{index:05}"
+
+    keys = extractor.stage_keys(cache, corpus)
+    assert extractor.stage_keys(cache, corpus) == keys
+    changed = extractor.stage_keys(cache, corpus, code=replaced(stage, helper, edited))
+    assert [name for name in keys if changed[name] != keys[name]] == DOWNSTREAM[stage]
+
+def test_changed_corpus_invalidates_every_key(cache, corpus):
+    keys = extractor.stage_keys(cache, corpus)
+    with open(corpus, 'a') as f:
+        f.write('[{"type": "Module"}]\n')
+    changed = extractor.stage_keys(cache, corpus)
+    assert all(changed[name] != keys[name] for name in keys)
+
+def test_module_fingerprint_follows_its_source(tmp_path, monkeypatch):
+    module = tmp_path / "stage_helper.py"
+    module.write_text("def helper():\n    return 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    before = code_fingerprint("stage_helper")
+    module.write_text("def helper():\n    return 2\n")
+    assert code_fingerprint("stage_helper") != before
+
+def test_run_reuses_stored_output(cache):
+    calls = []
+    def compute():
+        calls.append(1)
+        return {"values": {"a", "b"}}
+
+    key = cache.key("ingest", {"include_raw": True})
+    assert cache.run("ingest", key, compute) == cache.run("ingest", key, compute) == {"values": {"a", "b"}}
+    assert len(calls) == 1 and cache.hits == ["ingest"]
+    assert StageCache(cache.directory, enabled=False).load("ingest", key) == (False, None)
+
+def test_run_with_refresh_recomputes(cache):
+    key = cache.key("ingest", {"include_raw": True})
+    cache.run("ingest", key, lambda: 1)
+    assert cache.run("ingest", key, lambda: 2, refresh=True) == 2
+    assert cache.run("ingest", key, lambda: 3) == 2
+
+def test_example_bank_is_stored_once(cache, tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    pytest.importorskip("tqdm")
+    rng = random.Random(5)
+    corpus = tmp_path / "functions.jsonl"
+    corpus.write_text(json.dumps(flatten({"type": "Module", "children": [synthetic_function(rng, i) for i in range(3)]})) + "\n")
+    corpus = str(corpus)
+    bank_path = tmp_path / "example_bank_advanced.json"
+    monkeypatch.setattr(extractor, "EXAMPLE_ADVANCED_PATH", str(bank_path))
+    monkeypatch.setattr(extractor, "CORE_UNITS_PATH", str(tmp_path / "core_units.json"))
+    monkeypatch.setattr(extractor, "DB_PATH", str(tmp_path / "smartcodelex.db"))
+
+    extractor.run_pipeline(corpus, None, stage_cache=cache)
+    bank = bank_path.read_text()
+    key = extractor.stage_keys(cache, corpus)["ingest"]
+    hit, cached = cache.load("ingest", key)
+    assert hit and len(cached) == 2 and "E00001" in bank
+
+    # A cached ingestion reads the bank back; without its file it runs again
+    extractor.run_pipeline(corpus, None, stage_cache=cache)
+    assert cache.hits.count("ingest") == 1 and bank_path.read_text() == bank
+    bank_path.unlink()
+    extractor.run_pipeline(corpus, None, stage_cache=cache)
+    assert cache.misses.count("ingest") == 2 and bank_path.read_text() == bank